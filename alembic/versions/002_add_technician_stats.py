@@ -0,0 +1,39 @@
+"""Add technician_stats table (contadores materializados do dashboard)
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tabela de contadores por técnico (recalcule com scripts/rebuild_tech_stats.py)
+    op.create_table(
+        'technician_stats',
+        sa.Column('technician_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('total_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('open_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('pending_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('in_progress_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resolved_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('closed_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('overdue_tickets', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('overdue_refreshed_at', sa.DateTime(), nullable=True),
+        sa.Column('resolution_time_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('resolution_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('technician_stats')
@@ -0,0 +1,53 @@
+"""Add composite and partial indexes for the ticket filters
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# Predicados dos índices parciais (status armazena o nome do Enum)
+OPEN_QUEUE_WHERE = "status = 'open' AND assigned_technician_id IS NULL"
+ACTIVE_SLA_WHERE = "status IN ('pending', 'in_progress')"
+
+
+def upgrade():
+    # Tickets: filtros de técnico, admin, usuário e status do TicketService
+    op.create_index('ix_tickets_technician_status', 'tickets', ['assigned_technician_id', 'status'])
+    op.create_index('ix_tickets_technician_admin', 'tickets', ['assigned_technician_id', 'assigned_by_admin'])
+    op.create_index('ix_tickets_user_id', 'tickets', ['user_id', 'id'])
+    op.create_index('ix_tickets_status', 'tickets', ['status', 'id'])
+    op.create_index(
+        'ix_tickets_open_queue', 'tickets', ['id'],
+        postgresql_where=sa.text(OPEN_QUEUE_WHERE),
+        sqlite_where=sa.text(OPEN_QUEUE_WHERE),
+    )
+    op.create_index(
+        'ix_tickets_active_sla', 'tickets', ['assigned_technician_id', 'sla_deadline'],
+        postgresql_where=sa.text(ACTIVE_SLA_WHERE),
+        sqlite_where=sa.text(ACTIVE_SLA_WHERE),
+    )
+
+    # Chaves estrangeiras de comentários e histórico (selectinload / listagens ordenadas)
+    op.create_index('ix_comments_ticket_created', 'comments', ['ticket_id', 'created_at'])
+    op.create_index('ix_ticket_history_ticket_timestamp', 'ticket_history', ['ticket_id', 'timestamp'])
+
+
+def downgrade():
+    op.drop_index('ix_ticket_history_ticket_timestamp', table_name='ticket_history')
+    op.drop_index('ix_comments_ticket_created', table_name='comments')
+    op.drop_index('ix_tickets_active_sla', table_name='tickets')
+    op.drop_index('ix_tickets_open_queue', table_name='tickets')
+    op.drop_index('ix_tickets_status', table_name='tickets')
+    op.drop_index('ix_tickets_user_id', table_name='tickets')
+    op.drop_index('ix_tickets_technician_admin', table_name='tickets')
+    op.drop_index('ix_tickets_technician_status', table_name='tickets')
@@ -0,0 +1,73 @@
+"""Add ticket_attachments table (anexos normalizados, antes JSON em tickets.attachments)
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ticket_attachments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('ticket_id', sa.Integer(), sa.ForeignKey('tickets.id'), nullable=False),
+        sa.Column('stored_filename', sa.String(), nullable=False, unique=True),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('content_type', sa.String(), nullable=False, server_default='application/octet-stream'),
+        sa.Column('sha256', sa.String(64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_ticket_attachments_id', 'ticket_attachments', ['id'])
+    op.create_index('ix_ticket_attachments_sha256', 'ticket_attachments', ['sha256'])
+    op.create_index('ix_ticket_attachments_ticket_id', 'ticket_attachments', ['ticket_id', 'id'])
+
+    # Copiar os anexos do JSON legado (a coluna tickets.attachments é mantida para rollback)
+    bind = op.get_bind()
+    tickets = sa.table('tickets', sa.column('id', sa.Integer), sa.column('attachments', sa.JSON))
+    attachments = sa.table(
+        'ticket_attachments',
+        sa.column('ticket_id', sa.Integer),
+        sa.column('stored_filename', sa.String),
+        sa.column('filename', sa.String),
+        sa.column('size', sa.Integer),
+        sa.column('content_type', sa.String),
+        sa.column('sha256', sa.String),
+    )
+    rows = []
+    seen = set()
+    for ticket_id, data in bind.execute(
+        sa.select(tickets.c.id, tickets.c.attachments).where(tickets.c.attachments.isnot(None)).order_by(tickets.c.id)
+    ):
+        for att in data or []:
+            stored_filename = att.get("stored_filename")
+            if not stored_filename or stored_filename in seen:
+                continue
+            seen.add(stored_filename)
+            rows.append({
+                "ticket_id": ticket_id,
+                "stored_filename": stored_filename,
+                "filename": att.get("filename") or stored_filename,
+                "size": att.get("size") or 0,
+                "content_type": att.get("type") or "application/octet-stream",
+                "sha256": att.get("sha256"),
+            })
+    if rows:
+        op.bulk_insert(attachments, rows)
+
+
+def downgrade():
+    op.drop_index('ix_ticket_attachments_ticket_id', table_name='ticket_attachments')
+    op.drop_index('ix_ticket_attachments_sha256', table_name='ticket_attachments')
+    op.drop_index('ix_ticket_attachments_id', table_name='ticket_attachments')
+    op.drop_table('ticket_attachments')
@@ -0,0 +1,127 @@
+"""Add ticket_search full-text index (tsvector + GIN no PostgreSQL, FTS5 no SQLite)
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+# DDL congelado nesta revisão (não importar de app/: mudanças no app não podem alterar a 007)
+SQLITE_COMMENTS = "(SELECT coalesce(group_concat(text, ' '), '') FROM comments WHERE ticket_id = {ref})"
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS ticket_search USING fts5("
+    "title, description, location, problem_type, equipment_id, comments, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS ticket_search_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO ticket_search(rowid, title, description, location, problem_type, equipment_id, comments)
+        VALUES (new.id, new.title, new.description, new.location, new.problem_type, coalesce(new.equipment_id, ''), '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS ticket_search_update
+    AFTER UPDATE OF title, description, location, problem_type, equipment_id ON tickets BEGIN
+        UPDATE ticket_search SET title = new.title, description = new.description, location = new.location,
+            problem_type = new.problem_type, equipment_id = coalesce(new.equipment_id, '')
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS ticket_search_delete AFTER DELETE ON tickets BEGIN
+        DELETE FROM ticket_search WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_search_comment_insert AFTER INSERT ON comments BEGIN
+        UPDATE ticket_search SET comments = {SQLITE_COMMENTS.format(ref="new.ticket_id")} WHERE rowid = new.ticket_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_search_comment_update AFTER UPDATE OF text, ticket_id ON comments BEGIN
+        UPDATE ticket_search SET comments = {SQLITE_COMMENTS.format(ref="old.ticket_id")} WHERE rowid = old.ticket_id;
+        UPDATE ticket_search SET comments = {SQLITE_COMMENTS.format(ref="new.ticket_id")} WHERE rowid = new.ticket_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_search_comment_delete AFTER DELETE ON comments BEGIN
+        UPDATE ticket_search SET comments = {SQLITE_COMMENTS.format(ref="old.ticket_id")} WHERE rowid = old.ticket_id;
+    END""",
+    # Carga inicial (a tabela pode já existir se o startup criou o índice antes da migração)
+    "DELETE FROM ticket_search",
+    f"""INSERT INTO ticket_search(rowid, title, description, location, problem_type, equipment_id, comments)
+    SELECT t.id, t.title, t.description, t.location, t.problem_type, coalesce(t.equipment_id, ''),
+           {SQLITE_COMMENTS.format(ref="t.id")}
+    FROM tickets t""",
+]
+
+PG_DOCUMENT = """
+    setweight(to_tsvector('portuguese', coalesce(t.title, '')), 'A') ||
+    setweight(to_tsvector('portuguese', coalesce(t.problem_type, '') || ' ' || coalesce(t.equipment_id, '') || ' ' || coalesce(t.location, '')), 'B') ||
+    setweight(to_tsvector('portuguese', coalesce(t.description, '')), 'C') ||
+    setweight(to_tsvector('portuguese', coalesce((SELECT string_agg(c.text, ' ') FROM comments c WHERE c.ticket_id = t.id), '')), 'D')
+"""
+
+POSTGRES_UPGRADE = [
+    """CREATE TABLE IF NOT EXISTS ticket_search (
+        ticket_id integer PRIMARY KEY REFERENCES tickets(id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_ticket_search_document ON ticket_search USING gin (document)",
+    f"""CREATE OR REPLACE FUNCTION ticket_search_refresh(tid integer) RETURNS void LANGUAGE sql AS $$
+        INSERT INTO ticket_search (ticket_id, document)
+        SELECT t.id, {PG_DOCUMENT} FROM tickets t WHERE t.id = tid
+        ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document;
+    $$""",
+    """CREATE OR REPLACE FUNCTION ticket_search_ticket_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM ticket_search_refresh(NEW.id);
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE FUNCTION ticket_search_comment_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM ticket_search_refresh(OLD.ticket_id);
+        END IF;
+        IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR OLD.ticket_id IS DISTINCT FROM NEW.ticket_id) THEN
+            PERFORM ticket_search_refresh(NEW.ticket_id);
+        END IF;
+        RETURN NULL;
+    END $$""",
+    "DROP TRIGGER IF EXISTS ticket_search_ticket ON tickets",
+    """CREATE TRIGGER ticket_search_ticket
+    AFTER INSERT OR UPDATE OF title, description, location, problem_type, equipment_id ON tickets
+    FOR EACH ROW EXECUTE FUNCTION ticket_search_ticket_trigger()""",
+    "DROP TRIGGER IF EXISTS ticket_search_comment ON comments",
+    """CREATE TRIGGER ticket_search_comment
+    AFTER INSERT OR UPDATE OF text, ticket_id OR DELETE ON comments
+    FOR EACH ROW EXECUTE FUNCTION ticket_search_comment_trigger()""",
+    # Carga inicial
+    f"""INSERT INTO ticket_search (ticket_id, document)
+    SELECT t.id, {PG_DOCUMENT} FROM tickets t
+    ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document""",
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        statements = POSTGRES_UPGRADE
+    elif bind.dialect.name == "sqlite":
+        statements = SQLITE_UPGRADE
+    else:
+        return
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS ticket_search_comment ON comments")
+        op.execute("DROP TRIGGER IF EXISTS ticket_search_ticket ON tickets")
+        op.execute("DROP FUNCTION IF EXISTS ticket_search_comment_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS ticket_search_ticket_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS ticket_search_refresh(integer)")
+    elif bind.dialect.name == "sqlite":
+        for trigger in ("insert", "update", "delete", "comment_insert", "comment_update", "comment_delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS ticket_search_{trigger}")
+    op.execute("DROP TABLE IF EXISTS ticket_search")
@@ -1,10 +1,16 @@
-from typing import List
+from typing import List, Optional, Type
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from pydantic import BaseModel
 from app.services.user_service import UserService
 from app.services.ticket_service import TicketService
+from app.services.unit_of_work import unit_of_work
 from app.models import User, StatusEnum
-from app.schemas import UserResponse, TicketResponse
+from app.schemas import (
+    UserResponse, TicketResponse, TicketBulkOperation, TicketBulkRequest, TicketBulkItemResult, TicketBulkResponse,
+    stream_json_array
+)
 from app.services.auth_service import AuthService
 
 class AdminController:
@@ -23,11 +29,37 @@ class AdminController:
         return UserResponse.from_orm(technician)
 
     @staticmethod
-    def get_all_tickets(db: Session, skip: int = 0, limit: int = 100) -> List[TicketResponse]:
+    def get_all_tickets(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[TicketResponse]:
         """Obtém todos os tickets (visão admin)"""
-        tickets = TicketService.get_all_tickets(db, skip, limit)
+        tickets = TicketService.get_all_tickets(db, skip, limit, after_id)
         return [TicketResponse.from_orm(ticket) for ticket in tickets]
 
+    @staticmethod
+    def stream_all_tickets(schema: Type[BaseModel] = TicketResponse) -> StreamingResponse:
+        """Todos os tickets num array JSON enviado em lotes (sessão própria, aberta durante o envio)"""
+        from app.dependencies.database import SessionLocal
+
+        def batches():
+            db = SessionLocal()
+            try:
+                yield from TicketService.stream_all_tickets(db, schema)
+            finally:
+                db.close()
+        return stream_json_array(batches(), schema)
+
+    @staticmethod
+    def stream_all_users() -> StreamingResponse:
+        """Todos os usuários num array JSON enviado em lotes (sessão própria, aberta durante o envio)"""
+        from app.dependencies.database import SessionLocal
+
+        def batches():
+            db = SessionLocal()
+            try:
+                yield from UserService.stream_all_users(db)
+            finally:
+                db.close()
+        return stream_json_array(batches(), UserResponse)
+
     @staticmethod
     def assign_ticket(db: Session, ticket_id: int, technician_id: int) -> TicketResponse:
         """Atribui ticket a um técnico"""
@@ -42,16 +74,16 @@ class AdminController:
             raise HTTPException(status_code=400, detail="Usuário não é um técnico ou admin")
         
         # Atribuir ticket
-        ticket = TicketService.assign_ticket_to_technician(db, ticket_id, technician_id)
-        if not ticket:
-            raise HTTPException(status_code=404, detail="Ticket não encontrado")
-        
-        return TicketResponse.from_orm(ticket)
+        with unit_of_work(db):
+            ticket = TicketService.assign_ticket_to_technician(db, ticket_id, technician_id)
+            if not ticket:
+                raise HTTPException(status_code=404, detail="Ticket não encontrado")
+            return TicketResponse.from_orm(ticket)
 
     @staticmethod
-    def list_users(db: Session) -> List[UserResponse]:
+    def list_users(db: Session, skip: int = 0, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[UserResponse]:
         """Lista todos os usuários (sem senha)"""
-        users = db.query(User).all()
+        users = UserService.get_all_users(db, skip, limit, after_id)
         return [UserResponse.from_orm(u) for u in users]
 
     @staticmethod
@@ -90,8 +122,64 @@ class AdminController:
             raise HTTPException(status_code=400, detail="Usuário não é um técnico ou admin")
         
         # Atribuir ticket
-        ticket = TicketService.assign_ticket_to_technician(db, ticket_id, technician_id, assigned_by_admin=True)
-        if not ticket:
-            raise HTTPException(status_code=404, detail="Ticket não encontrado")
-        
-        return TicketResponse.from_orm(ticket)
\ No newline at end of file
+        with unit_of_work(db):
+            ticket = TicketService.assign_ticket_to_technician(db, ticket_id, technician_id, assigned_by_admin=True)
+            if not ticket:
+                raise HTTPException(status_code=404, detail="Ticket não encontrado")
+            return TicketResponse.from_orm(ticket)
+
+    @staticmethod
+    def bulk_update_tickets(db: Session, request: TicketBulkRequest, admin: User) -> TicketBulkResponse:
+        """Atribui, muda status ou fecha vários tickets numa única transação"""
+        if request.operation == TicketBulkOperation.assign:
+            if request.technician_id is None:
+                raise HTTPException(status_code=400, detail="technician_id é obrigatório")
+            technician = UserService.get_user_by_id(db, request.technician_id)
+            if not technician:
+                raise HTTPException(status_code=404, detail="Técnico não encontrado")
+            role_str = str(technician.role.value) if hasattr(technician.role, 'value') else str(technician.role)
+            if role_str not in ["technician", "admin"]:
+                raise HTTPException(status_code=400, detail="Usuário não é um técnico ou admin")
+            values = {
+                "assigned_technician_id": request.technician_id,
+                "status": StatusEnum.in_progress,
+                "assigned_by_admin": True,
+            }
+            action = "admin_assigned"
+            description = f"Ticket atribuído pelo admin ao técnico ID {request.technician_id}"
+        elif request.operation == TicketBulkOperation.status:
+            if request.status is None:
+                raise HTTPException(status_code=400, detail="status é obrigatório")
+            values = {"status": StatusEnum(request.status.value)}
+            action = "status_change"
+            description = f"Status alterado para {request.status.value}"
+        else:
+            values = {"status": StatusEnum.closed}
+            action = "status_change"
+            description = f"Status alterado para {StatusEnum.closed.value}"
+
+        with unit_of_work(db):
+            updated_ids, missing_ids = TicketService.bulk_update_tickets(
+                db, request.ticket_ids, values, action, description, admin.full_name or admin.username
+            )
+
+        missing = set(missing_ids)
+        results = [
+            TicketBulkItemResult(ticket_id=ticket_id, success=False, detail="Ticket não encontrado")
+            if ticket_id in missing else TicketBulkItemResult(ticket_id=ticket_id, success=True)
+            for ticket_id in dict.fromkeys(request.ticket_ids)
+        ]
+        return TicketBulkResponse(operation=request.operation, updated=len(updated_ids), results=results)
+
+    @staticmethod
+    def import_users(body: bytes, content_type: str, approve: bool = False) -> StreamingResponse:
+        """Importa usuários de um CSV/JSON e devolve o status de cada linha em NDJSON"""
+        from app.dependencies.database import SessionLocal
+        from app.services.user_import import UserImportError, import_users, parse_import_rows
+        try:
+            rows = parse_import_rows(body, content_type)
+        except UserImportError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not rows:
+            raise HTTPException(status_code=400, detail="Nenhuma linha para importar")
+        return StreamingResponse(import_users(SessionLocal, rows, approve), media_type="application/x-ndjson")
@@ -1,12 +1,15 @@
 """
 Controller para gerenciamento de anexos de tickets
 """
-from fastapi import UploadFile, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import UploadFile, HTTPException, Request
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.models import Ticket
+from app.services.file_storage import FileTooLargeError
+from app.services.blob_store import BlobStore
+from app.services.attachment_service import AttachmentService
+from app.services.http_cache import cached_file_response, strong_etag
 import os
-import shutil
 from pathlib import Path
 from uuid import uuid4
 from typing import List
@@ -28,12 +31,12 @@ ALLOWED_EXTENSIONS = {
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 
-def upload_ticket_attachments(ticket_id: int, files: List[UploadFile], db: Session, user_id: int):
+async def upload_ticket_attachments(ticket_id: int, files: List[UploadFile], db: Session, user_id: int):
     """
-    Upload de anexos para um ticket
+    Upload de anexos para um ticket (gravação em streaming, sem bloquear o event loop)
     """
     # Buscar ticket
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await run_in_threadpool(lambda: db.query(Ticket).filter(Ticket.id == ticket_id).first())
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket não encontrado")
     
@@ -41,113 +44,129 @@ def upload_ticket_attachments(ticket_id: int, files: List[UploadFile], db: Sessi
     if ticket.user_id != user_id and ticket.assigned_technician_id != user_id:
         raise HTTPException(status_code=403, detail="Sem permissão para adicionar anexos neste ticket")
     
-    # Lista atual de anexos
-    current_attachments = ticket.attachments or []
-    
-    uploaded_files = []
-    
+    # Validar extensões antes de gravar qualquer arquivo
     for file in files:
-        # Validar extensão
         file_ext = Path(file.filename).suffix.lower()
         if file_ext not in ALLOWED_EXTENSIONS:
             raise HTTPException(
                 status_code=400,
                 detail=f"Extensão não permitida: {file_ext}. Use: {', '.join(ALLOWED_EXTENSIONS)}"
             )
-        
-        # Validar tamanho
-        if file.size and file.size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Arquivo {file.filename} muito grande. Máximo: 10MB"
-            )
-        
-        # Gerar nome único
-        unique_filename = f"{uuid4()}{file_ext}"
-        file_path = ATTACHMENT_DIR / unique_filename
-        
-        # Salvar arquivo
-        try:
-            with file_path.open("wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Erro ao salvar arquivo: {str(e)}")
-        
-        # Adicionar à lista de anexos
-        attachment_info = {
-            "filename": file.filename,
-            "stored_filename": unique_filename,
-            "url": f"/static/attachments/{unique_filename}",
-            "size": file.size or 0,
-            "type": file.content_type or "application/octet-stream"
-        }
-        current_attachments.append(attachment_info)
-        uploaded_files.append(attachment_info)
     
-    # Atualizar ticket
-    ticket.attachments = current_attachments
-    db.commit()
-    db.refresh(ticket)
+    uploaded_files = []
+    stored_files = []
+    
+    try:
+        for file in files:
+            file_ext = Path(file.filename).suffix.lower()
+            
+            # Validar tamanho declarado (o real é validado durante o streaming)
+            if file.size and file.size > MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Arquivo {file.filename} muito grande. Máximo: 10MB"
+                )
+            
+            # Nome único do anexo (referência); o conteúdo vai para o blob do seu hash
+            unique_filename = f"{uuid4()}{file_ext}"
+            
+            # Salvar arquivo (conteúdo repetido reaproveita o blob existente); a referência
+            # do blob já sai reservada e é contada pelo anexo inserido abaixo
+            try:
+                stored = await BlobStore.store_upload(db, file, MAX_FILE_SIZE)
+            except FileTooLargeError:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Arquivo {file.filename} muito grande. Máximo: 10MB"
+                )
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Erro ao salvar arquivo: {str(e)}")
+            stored_files.append(stored)
+            
+            uploaded_files.append((unique_filename, file, stored))
+    except HTTPException:
+        # Não deixar blobs órfãos de uploads anteriores do mesmo lote
+        await _release_stored(db, stored_files)
+        raise
+    
+    # Inserir anexos na mesma transação (append, sem reescrever o ticket)
+    def _commit():
+        attachments = []
+        for unique_filename, file, stored in uploaded_files:
+            attachments.append(AttachmentService.add_attachment(
+                db, ticket_id, unique_filename, file.filename,
+                stored.size, file.content_type, stored.sha256
+            ))
+        db.commit()
+        return [AttachmentService.to_dict(att) for att in attachments], AttachmentService.count_attachments(db, ticket_id)
+    try:
+        uploaded_info, total = await run_in_threadpool(_commit)
+    except Exception:
+        # Falha ao gravar os anexos: devolver as referências reservadas e os blobs sem uso
+        await run_in_threadpool(db.rollback)
+        await _release_stored(db, stored_files)
+        raise
     
     return {
-        "message": f"{len(uploaded_files)} arquivo(s) enviado(s) com sucesso",
-        "uploaded_files": uploaded_files,
-        "total_attachments": len(current_attachments)
+        "message": f"{len(uploaded_info)} arquivo(s) enviado(s) com sucesso",
+        "uploaded_files": uploaded_info,
+        "total_attachments": total
     }
 
 
+async def _release_stored(db: Session, stored_files) -> None:
+    """Libera as referências reservadas por store_upload (e remove blobs que ficaram sem uso)"""
+    for stored in stored_files:
+        try:
+            await run_in_threadpool(BlobStore.release_and_purge, db, stored.sha256)
+        except Exception as e:
+            print(f"⚠️ Erro ao liberar blob {stored.sha256}: {e}")
+
+
 def get_ticket_attachments(ticket_id: int, db: Session):
     """
     Obter lista de anexos de um ticket
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = db.query(Ticket.id).filter(Ticket.id == ticket_id).first()
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket não encontrado")
     
+    attachments = [AttachmentService.to_dict(att) for att in AttachmentService.get_attachments_by_ticket(db, ticket_id)]
     return {
         "ticket_id": ticket_id,
-        "attachments": ticket.attachments or [],
-        "total": len(ticket.attachments or [])
+        "attachments": attachments,
+        "total": len(attachments)
     }
 
 
-def download_attachment(ticket_id: int, filename: str, db: Session):
+def download_attachment(ticket_id: int, filename: str, db: Session, request: Request):
     """
-    Download de um anexo específico
+    Download de um anexo específico (ETag pelo SHA-256, 304 condicional e Range/206)
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
-        raise HTTPException(status_code=404, detail="Ticket não encontrado")
-    
-    if not ticket.attachments:
-        raise HTTPException(status_code=404, detail="Ticket não possui anexos")
-    
-    # Procurar anexo
-    attachment = None
-    for att in ticket.attachments:
-        if att.get("stored_filename") == filename:
-            attachment = att
-            break
-    
+    # Uma leitura pelo índice único de stored_filename
+    attachment = AttachmentService.get_attachment(db, ticket_id, filename)
     if not attachment:
         raise HTTPException(status_code=404, detail="Anexo não encontrado")
     
-    file_path = ATTACHMENT_DIR / filename
+    file_path = BlobStore.resolve_path(attachment.sha256, attachment.stored_filename)
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Arquivo não encontrado no servidor")
     
-    return FileResponse(
-        path=file_path,
-        filename=attachment["filename"],
-        media_type=attachment.get("type", "application/octet-stream")
+    # Anexo legado sem hash usa ETag fraca (tamanho + mtime)
+    return cached_file_response(
+        request,
+        file_path,
+        etag=strong_etag(attachment.sha256) if attachment.sha256 else None,
+        media_type=attachment.content_type,
+        filename=attachment.filename
     )
 
 
-def delete_attachment(ticket_id: int, filename: str, db: Session, user_id: int):
+async def delete_attachment(ticket_id: int, filename: str, db: Session, user_id: int):
     """
     Deletar um anexo de um ticket
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await run_in_threadpool(lambda: db.query(Ticket).filter(Ticket.id == ticket_id).first())
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket não encontrado")
     
@@ -155,38 +174,40 @@ def delete_attachment(ticket_id: int, filename: str, db: Session, user_id: int):
     if ticket.user_id != user_id and ticket.assigned_technician_id != user_id:
         raise HTTPException(status_code=403, detail="Sem permissão para deletar anexos deste ticket")
     
-    if not ticket.attachments:
-        raise HTTPException(status_code=404, detail="Ticket não possui anexos")
-    
-    # Procurar e remover anexo
-    attachment_to_remove = None
-    new_attachments = []
+    # Procurar anexo
+    attachment = await run_in_threadpool(AttachmentService.get_attachment, db, ticket_id, filename)
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Anexo não encontrado")
     
-    for att in ticket.attachments:
-        if att.get("stored_filename") == filename:
-            attachment_to_remove = att
-        else:
-            new_attachments.append(att)
+    sha256 = attachment.sha256
+    deleted_filename = attachment.filename
     
-    if not attachment_to_remove:
-        raise HTTPException(status_code=404, detail="Anexo não encontrado")
+    # Remover o anexo e liberar a referência do blob
+    def _commit():
+        BlobStore.release(db, sha256)
+        db.delete(attachment)
+        db.commit()
+        return AttachmentService.count_attachments(db, ticket_id)
+    remaining = await run_in_threadpool(_commit)
     
-    # Deletar arquivo físico
-    file_path = ATTACHMENT_DIR / filename
+    # Deletar arquivo físico (blob só quando era a última referência; legado sempre)
     try:
-        if file_path.exists():
-            file_path.unlink()
+        if sha256:
+            await run_in_threadpool(BlobStore.purge_unreferenced, db, sha256)
+        else:
+            await run_in_threadpool(_delete_legacy_file, ATTACHMENT_DIR / filename)
     except Exception as e:
         print(f"Erro ao deletar arquivo: {e}")
     
-    # Atualizar ticket
-    ticket.attachments = new_attachments if new_attachments else None
-    db.commit()
-    db.refresh(ticket)
-    
     return {
         "message": "Anexo deletado com sucesso",
-        "deleted_file": attachment_to_remove["filename"],
-        "remaining_attachments": len(new_attachments)
+        "deleted_file": deleted_filename,
+        "remaining_attachments": remaining
     }
 
+
+
+def _delete_legacy_file(file_path: Path) -> None:
+    """Remove arquivo de anexo anterior ao blob store (sem hash)"""
+    if file_path.exists():
+        file_path.unlink()
@@ -1,9 +1,11 @@
 from datetime import timedelta
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.services.auth_service import AuthService, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.services.user_service import UserService
-from app.schemas import UserLogin, UserCreate, TechRegister, UserResponse, ServidorRegister, AdminRegister, RoleEnum
+from app.services.refresh_token_service import RefreshTokenService
+from app.schemas import UserLogin, UserCreate, TechRegister, UserResponse, ServidorRegister, AdminRegister, RoleEnum, RefreshTokenRequest
 
 class AuthController:
     @staticmethod
@@ -19,10 +21,20 @@ class AuthController:
         return UserResponse.from_orm(db_user)
 
     @staticmethod
-    def register_servidor(db: Session, payload: ServidorRegister) -> UserResponse:
+    async def _create_user(db: Session, user_data: UserCreate) -> UserResponse:
+        """Hash aguardado no pool de bcrypt (sem ocupar thread); só o INSERT vai para o threadpool"""
+        hashed_password = await AuthService.get_password_hash_async(user_data.password)
+
+        def _insert() -> UserResponse:
+            return UserResponse.from_orm(UserService.create_user(db, user_data, hashed_password))
+
+        return await run_in_threadpool(_insert)
+
+    @staticmethod
+    async def register_servidor(db: Session, payload: ServidorRegister) -> UserResponse:
         """Registra um novo servidor com campos mínimos"""
         # Verificar existência por username (email é opcional)
-        exists, error_msg = UserService.check_user_exists(db, payload.username, None)
+        exists, error_msg = await run_in_threadpool(UserService.check_user_exists, db, payload.username, None)
         if exists:
             raise HTTPException(status_code=400, detail=error_msg)
 
@@ -34,14 +46,13 @@ class AuthController:
             role=RoleEnum.servidor,
             phone=payload.phone,
         )
-        db_user = UserService.create_user(db, user_data)
-        return UserResponse.from_orm(db_user)
+        return await AuthController._create_user(db, user_data)
 
     @staticmethod
-    def register_technician(db: Session, tech: TechRegister) -> UserResponse:
+    async def register_technician(db: Session, tech: TechRegister) -> UserResponse:
         """Registra um novo técnico"""
         # Verificar se usuário já existe
-        exists, error_msg = UserService.check_user_exists(db, tech.username, tech.email)
+        exists, error_msg = await run_in_threadpool(UserService.check_user_exists, db, tech.username, tech.email)
         if exists:
             raise HTTPException(status_code=400, detail=error_msg)
         
@@ -64,38 +75,68 @@ class AuthController:
         )
         
         # Criar usuário
-        db_user = UserService.create_user(db, user_data)
-        return UserResponse.from_orm(db_user)
+        return await AuthController._create_user(db, user_data)
 
     @staticmethod
-    def login(db: Session, user_login: UserLogin) -> dict:
+    async def login(db: Session, user_login: UserLogin) -> dict:
         """Realiza login e retorna token"""
-        # Autenticar usuário
-        user = AuthService.authenticate_user(db, user_login.username, user_login.password)
+        # Autenticar usuário (bcrypt aguardado sem ocupar thread do servidor)
+        user = await AuthService.authenticate_user(db, user_login.username, user_login.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuário ou senha incorretos"
             )
-        
-        # Criar token
-        token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+        def _issue() -> dict:
+            # Criar sessão (refresh token) e access token vinculado a ela
+            refresh = RefreshTokenService.issue(db, user.id)
+            db.commit()
+            return {
+                **AuthController._token_pair(user, refresh),
+                "user": UserResponse.from_orm(user)
+            }
+
+        # Depois do commit os atributos do usuário expiram e são recarregados: fica no threadpool
+        return await run_in_threadpool(_issue)
+
+    @staticmethod
+    def refresh_token(db: Session, payload: RefreshTokenRequest) -> dict:
+        """Troca o refresh token por um novo par de tokens (rotação)"""
+        result = RefreshTokenService.rotate(db, payload.refresh_token)
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token inválido ou expirado"
+            )
+        user, refresh = result
+        return AuthController._token_pair(user, refresh)
+
+    @staticmethod
+    def logout(db: Session, payload: RefreshTokenRequest) -> dict:
+        """Encerra a sessão: revoga o refresh token e os access tokens emitidos com ele"""
+        if not RefreshTokenService.revoke(db, payload.refresh_token):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token inválido")
+        return {"detail": "Sessão encerrada"}
+
+    @staticmethod
+    def _token_pair(user, refresh) -> dict:
         token = AuthService.create_access_token(
-            data={"sub": user.username, "user_id": user.id}, 
-            expires_delta=token_expires
+            data={"sub": user.username, "user_id": user.id, "sid": refresh.family_id},
+            expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         )
-        
         return {
             "access_token": token,
             "token_type": "bearer",
-            "user": UserResponse.from_orm(user)
+            "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            "refresh_token": refresh.token
         }
 
     @staticmethod
-    def register_admin(db: Session, admin: AdminRegister) -> UserResponse:
+    async def register_admin(db: Session, admin: AdminRegister) -> UserResponse:
         """Registra um novo administrador"""
         # Verificar se usuário já existe
-        exists, error_msg = UserService.check_user_exists(db, admin.username, admin.email)
+        exists, error_msg = await run_in_threadpool(UserService.check_user_exists, db, admin.username, admin.email)
         if exists:
             raise HTTPException(status_code=400, detail=error_msg)
         
@@ -107,8 +148,7 @@ class AuthController:
             password=admin.password,
             role=RoleEnum.admin,
         )
-        db_user = UserService.create_user(db, user_data)
-        return UserResponse.from_orm(db_user)
+        return await AuthController._create_user(db, user_data)
 
     @staticmethod
     def get_current_user_info(user) -> UserResponse:
@@ -3,11 +3,14 @@ Controller para gerenciamento de avatares de usuários
 """
 from fastapi import UploadFile, HTTPException
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.models import User
-import os
-import shutil
+from app.services.file_storage import save_upload, delete_file, FileTooLargeError
+from app.services.avatar_images import process_avatar, delete_thumbnails, InvalidImageError
 from pathlib import Path
 from uuid import uuid4
+from typing import Optional
+from app.services.pagination import paginate_query
 
 
 # Diretório para salvar avatares
@@ -19,12 +22,12 @@ ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
 
-def upload_avatar(user_id: int, file: UploadFile, db: Session):
+async def upload_avatar(user_id: int, file: UploadFile, db: Session):
     """
-    Upload de avatar para um usuário
+    Upload de avatar para um usuário (gravação em streaming, sem bloquear o event loop)
     """
     # Buscar usuário
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.id == user_id).first())
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
@@ -43,26 +46,44 @@ def upload_avatar(user_id: int, file: UploadFile, db: Session):
             detail="Arquivo muito grande. Tamanho máximo: 5MB"
         )
     
-    # Deletar avatar antigo se existir
-    if user.avatar_url:
-        delete_avatar_file(user.avatar_url)
-    
-    # Gerar nome único para o arquivo
-    unique_filename = f"{uuid4()}{file_ext}"
-    file_path = AVATAR_DIR / unique_filename
-    
-    # Salvar arquivo
+    # Salvar arquivo (o tamanho real é validado durante o streaming)
+    temp_path = AVATAR_DIR / f".{uuid4().hex}.upload"
     try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        stored = await save_upload(file, temp_path, MAX_FILE_SIZE)
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Arquivo muito grande. Tamanho máximo: 5MB"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao salvar arquivo: {str(e)}")
     
-    # Atualizar URL do avatar no banco
+    # Nome endereçado por conteúdo: a URL muda junto com a imagem, então pode ser
+    # servida com Cache-Control imutável (ver CachedStaticFiles)
+    unique_filename = avatar_filename(user_id, stored.sha256, ".webp")
+    avatar_path = AVATAR_DIR / unique_filename
     avatar_url = f"/static/avatars/{unique_filename}"
-    user.avatar_url = avatar_url
-    db.commit()
-    db.refresh(user)
+    
+    # Avatar publicado = WebP reprocessado sem metadados (EXIF/GPS) + miniaturas 32/64/256,
+    # no pool de processos; também valida que é uma imagem. O upload original é descartado.
+    try:
+        await process_avatar(stored.path, avatar_path)
+    except InvalidImageError:
+        raise HTTPException(status_code=400, detail="Arquivo não é uma imagem válida")
+    finally:
+        await run_in_threadpool(stored.path.unlink, True)
+    
+    # Deletar avatar antigo só depois que o novo foi gravado (mesma imagem = mesmo arquivo)
+    old_avatar_url = user.avatar_url
+    if old_avatar_url and old_avatar_url != avatar_url:
+        await run_in_threadpool(delete_avatar_file, old_avatar_url)
+    
+    # Atualizar URL do avatar no banco
+    def _commit():
+        user.avatar_url = avatar_url
+        db.commit()
+        db.refresh(user)
+    await run_in_threadpool(_commit)
     
     return {
         "message": "Avatar atualizado com sucesso",
@@ -71,11 +92,17 @@ def upload_avatar(user_id: int, file: UploadFile, db: Session):
             "id": user.id,
             "username": user.username,
             "full_name": user.full_name,
-            "avatar_url": user.avatar_url
+            "avatar_url": user.avatar_url,
+            "avatar_urls": user.avatar_urls
         }
     }
 
 
+def avatar_filename(user_id: int, sha256: str, file_ext: str) -> str:
+    """Nome do arquivo de avatar: <user_id>-<sha256><ext>"""
+    return f"{user_id}-{sha256}{file_ext}"
+
+
 def get_avatar(user_id: int, db: Session):
     """
     Obter informações do avatar de um usuário
@@ -99,6 +126,7 @@ def get_avatar(user_id: int, db: Session):
         "user_id": user.id,
         "username": user.username,
         "avatar_url": user.avatar_url,
+        "avatar_urls": user.avatar_urls,
         "file_size": avatar_path.stat().st_size,
         "file_exists": True
     }
@@ -140,6 +168,7 @@ def delete_avatar_file(avatar_url: str) -> bool:
     """
     try:
         avatar_path = Path(avatar_url.lstrip("/"))
+        delete_thumbnails(avatar_path)
         if avatar_path.exists():
             avatar_path.unlink()
             return True
@@ -149,20 +178,18 @@ def delete_avatar_file(avatar_url: str) -> bool:
         return False
 
 
-def get_user_avatars_list(db: Session, skip: int = 0, limit: int = 100):
+def get_user_avatars_list(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
     """
     Listar todos os usuários com seus avatares
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    users = paginate_query(db.query(User), User.id, skip, limit, after_id)
     
-    return [
-        {
-            "id": user.id,
-            "username": user.username,
-            "full_name": user.full_name,
-            "avatar_url": user.avatar_url,
-            "has_avatar": user.avatar_url is not None
-        }
-        for user in users
-    ]
+    return users.map(lambda user: {
+        "id": user.id,
+        "username": user.username,
+        "full_name": user.full_name,
+        "avatar_url": user.avatar_url,
+        "avatar_urls": user.avatar_urls,
+        "has_avatar": user.avatar_url is not None
+    })
 
@@ -2,6 +2,7 @@ from typing import List
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from app.services.ticket_service import TicketService
+from app.services.unit_of_work import unit_of_work
 from app.models import User
 from app.schemas import (
     TicketResponse, TicketWithHistory, TechDashboardStats,
@@ -36,15 +37,16 @@ class TechController:
     @staticmethod
     def take_ticket(db: Session, ticket_id: int, technician: User) -> TicketResponse:
         """Permite que técnico pegue um ticket não atribuído"""
-        ticket = TicketService.assign_ticket_to_self(db, ticket_id, technician.id)
-        if not ticket:
-            raise HTTPException(status_code=400, detail="Ticket não encontrado ou já atribuído")
-        return TicketResponse.from_orm(ticket)
+        with unit_of_work(db):
+            ticket = TicketService.assign_ticket_to_self(db, ticket_id, technician.id)
+            if not ticket:
+                raise HTTPException(status_code=400, detail="Ticket não encontrado ou já atribuído")
+            return TicketResponse.from_orm(ticket)
 
     @staticmethod
     def get_ticket_details(db: Session, ticket_id: int, technician: User) -> TicketWithHistory:
         """Obtém detalhes completos do ticket"""
-        ticket = TicketService.get_ticket_by_id(db, ticket_id)
+        ticket = TicketService.get_ticket_by_id(db, ticket_id, schema=TicketWithHistory)
         if not ticket:
             raise HTTPException(status_code=404, detail="Ticket não encontrado")
         
@@ -65,16 +67,14 @@ class TechController:
         if not TicketService.technician_has_access_to_ticket(ticket, technician):
             raise HTTPException(status_code=403, detail="Acesso negado")
         
-        # Atualizar status
-        updated_ticket = TicketService.update_ticket(db, ticket_id, status_update)
-        
-        # Adicionar ao histórico
-        TicketService.create_ticket_history(db, TicketHistoryCreate(
-            action="status_change",
-            description=f"Status alterado para {status_update.get('status', 'N/A')}"
-        ), ticket_id, technician.full_name)
-        
-        return TicketResponse.from_orm(updated_ticket)
+        # Atualizar status e registrar no histórico (um único commit)
+        with unit_of_work(db):
+            updated_ticket = TicketService.update_ticket(db, ticket_id, status_update)
+            TicketService.create_ticket_history(db, TicketHistoryCreate(
+                action="status_change",
+                description=f"Status alterado para {status_update.get('status', 'N/A')}"
+            ), ticket_id, technician.full_name)
+            return TicketResponse.from_orm(updated_ticket)
 
     @staticmethod
     def add_ticket_history(db: Session, ticket_id: int, history: TicketHistoryCreate, technician: User) -> TicketHistoryResponse:
@@ -88,5 +88,6 @@ class TechController:
             raise HTTPException(status_code=403, detail="Acesso negado")
         
         # Criar entrada no histórico
-        db_history = TicketService.create_ticket_history(db, history, ticket_id, technician.full_name)
-        return TicketHistoryResponse.from_orm(db_history)
+        with unit_of_work(db):
+            db_history = TicketService.create_ticket_history(db, history, ticket_id, technician.full_name)
+            return TicketHistoryResponse.from_orm(db_history)
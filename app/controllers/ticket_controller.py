@@ -1,51 +1,83 @@
-from typing import List
+from typing import List, Optional, Type
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
+from pydantic import BaseModel
 from app.services.ticket_service import TicketService
-from app.models import User, Comment
+from app.services.unit_of_work import unit_of_work
+from app.services.ticket_search import TicketSearchService
+from app.models import User, Comment, StatusEnum, PriorityEnum
 from app.schemas import (
     TicketCreate, TicketUpdate, TicketResponse, TicketWithComments, 
-    CommentCreate, CommentResponse
+    CommentCreate, CommentResponse, TicketSearchHit, FacetCount, TicketSearchResponse
 )
 
 class TicketController:
     @staticmethod
     def create_ticket(db: Session, ticket: TicketCreate, user: User) -> TicketResponse:
         """Cria um novo ticket"""
-        # Se não há usuário autenticado, usar usuário padrão (ID 1) ou criar um
-        if user is None:
-            default_user = db.query(User).filter(User.id == 1).first()
-            if not default_user:
-                # Criar usuário padrão se não existir
-                default_user = User(
-                    username="sistema",
-                    full_name="Sistema",
-                    role="servidor",
-                    is_active=True,
-                    is_approved=True
-                )
-                db.add(default_user)
-                db.commit()
-                db.refresh(default_user)
-            user_id = default_user.id
-        else:
-            user_id = user.id
-            
-        db_ticket = TicketService.create_ticket(db, ticket, user_id)
-        return TicketResponse.from_orm(db_ticket)
+        with unit_of_work(db):
+            # Se não há usuário autenticado, usar usuário padrão (ID 1) ou criar um
+            if user is None:
+                default_user = db.query(User).filter(User.id == 1).first()
+                if not default_user:
+                    # Criar usuário padrão se não existir
+                    default_user = User(
+                        username="sistema",
+                        full_name="Sistema",
+                        role="servidor",
+                        is_active=True,
+                        is_approved=True
+                    )
+                    db.add(default_user)
+                    db.flush()
+                user_id = default_user.id
+            else:
+                user_id = user.id
+                
+            db_ticket = TicketService.create_ticket(db, ticket, user_id)
+            return TicketResponse.from_orm(db_ticket)
 
     @staticmethod
-    def get_user_tickets(db: Session, user: User, skip: int = 0, limit: int = 100) -> List[TicketWithComments]:
-        """Obtém tickets do usuário"""
+    def get_user_tickets(
+        db: Session, user: User, skip: int = 0, limit: int = 100, after_id: Optional[int] = None,
+        schema: Type[BaseModel] = TicketWithComments
+    ) -> List[BaseModel]:
+        """Obtém tickets do usuário (no schema pedido em ?fields=, por padrão com comentários)"""
         if user is None:
             return []
-        tickets = TicketService.get_tickets_by_user(db, user.id, skip, limit)
-        return [TicketWithComments.from_orm(ticket) for ticket in tickets]
+        tickets = TicketService.get_tickets_by_user(db, user.id, skip, limit, after_id, schema=schema)
+        return tickets.map(schema.from_orm)
+
+    @staticmethod
+    def search_tickets(
+        db: Session, q: str, status_filter: Optional[str] = None, priority: Optional[str] = None,
+        technician_id: Optional[int] = None, skip: int = 0, limit: int = 20, facets: bool = True
+    ) -> TicketSearchResponse:
+        """Busca textual de tickets com ranking, trechos destacados e facetas"""
+        if not TicketSearchService.is_supported(db):
+            raise HTTPException(status_code=503, detail="Busca indisponível neste banco de dados")
+        result = TicketSearchService.search(
+            db, q,
+            status=StatusEnum(status_filter) if status_filter else None,
+            priority=PriorityEnum(priority) if priority else None,
+            technician_id=technician_id, skip=skip, limit=limit, with_facets=facets
+        )
+        return TicketSearchResponse(
+            total=result["total"],
+            items=[
+                TicketSearchHit(ticket=TicketResponse.from_orm(ticket), rank=rank, highlights=highlights)
+                for ticket, rank, highlights in result["hits"]
+            ],
+            facets={
+                name: [FacetCount(value=value, count=count) for value, count in counts]
+                for name, counts in result["facets"].items()
+            }
+        )
 
     @staticmethod
     def get_ticket_details(db: Session, ticket_id: int, user: User) -> TicketWithComments:
         """Obtém detalhes de um ticket específico"""
-        ticket = TicketService.get_ticket_by_id(db, ticket_id)
+        ticket = TicketService.get_ticket_by_id(db, ticket_id, schema=TicketWithComments)
         if not ticket:
             raise HTTPException(status_code=404, detail="Ticket não encontrado")
         
@@ -60,8 +92,9 @@ class TicketController:
             raise HTTPException(status_code=404, detail="Ticket não encontrado")
         
         # Sem autenticação, permitir atualização
-        updated_ticket = TicketService.update_ticket(db, ticket_id, ticket_update.dict(exclude_unset=True))
-        return TicketResponse.from_orm(updated_ticket)
+        with unit_of_work(db):
+            updated_ticket = TicketService.update_ticket(db, ticket_id, ticket_update.dict(exclude_unset=True))
+            return TicketResponse.from_orm(updated_ticket)
 
     @staticmethod
     def delete_ticket(db: Session, ticket_id: int, user: User) -> dict:
@@ -71,9 +104,10 @@ class TicketController:
             raise HTTPException(status_code=404, detail="Ticket não encontrado")
         
         # Sem autenticação, permitir deleção
-        success = TicketService.delete_ticket(db, ticket_id)
-        if not success:
-            raise HTTPException(status_code=500, detail="Erro ao deletar ticket")
+        with unit_of_work(db):
+            success = TicketService.delete_ticket(db, ticket_id)
+            if not success:
+                raise HTTPException(status_code=500, detail="Erro ao deletar ticket")
         
         return {"message": "Ticket deletado com sucesso"}
 
@@ -88,8 +122,9 @@ class TicketController:
         author_name = user.full_name if user else "Usuário Anônimo"
         
         # Criar comentário
-        db_comment = TicketService.create_comment(db, comment, ticket_id, author_name)
-        return CommentResponse.from_orm(db_comment)
+        with unit_of_work(db):
+            db_comment = TicketService.create_comment(db, comment, ticket_id, author_name)
+            return CommentResponse.from_orm(db_comment)
 
     @staticmethod
     def get_ticket_comments(db: Session, ticket_id: int, user: User) -> List[CommentResponse]:
@@ -110,8 +145,9 @@ class TicketController:
             raise HTTPException(status_code=404, detail="Comentário não encontrado")
         
         # Sem autenticação, permitir deleção
-        success = TicketService.delete_comment(db, comment_id)
-        if not success:
-            raise HTTPException(status_code=500, detail="Erro ao deletar comentário")
+        with unit_of_work(db):
+            success = TicketService.delete_comment(db, comment_id)
+            if not success:
+                raise HTTPException(status_code=500, detail="Erro ao deletar comentário")
         
         return {"message": "Comentário deletado com sucesso"}
@@ -29,7 +29,11 @@ class UserController:
     @staticmethod
     def change_password(db: Session, user: User, current_password: str, new_password: str):
         """Altera a senha do usuário após validar a senha atual"""
-        if not AuthService.verify_password(current_password, user.hashed_password):
+        # O usuário autenticado é um Principal (sem hash de senha): buscar a linha
+        db_user = UserService.get_user_by_id(db, user.id)
+        if not db_user:
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+        if not AuthService.verify_password(current_password, db_user.hashed_password):
             raise HTTPException(status_code=400, detail="Senha atual incorreta")
 
         new_hash = AuthService.get_password_hash(new_password)
@@ -1,7 +1,13 @@
-from .database import get_db
-from .auth_dependencies import get_current_user
+from .database import get_db, get_async_db
+from .auth_dependencies import get_current_user, get_async_current_user
+from .pagination import PageParams
+from .fields import TicketFields
 
 __all__ = [
     "get_db",
-    "get_current_user"
+    "get_async_db",
+    "get_current_user",
+    "get_async_current_user",
+    "PageParams",
+    "TicketFields"
 ]
@@ -1,24 +1,41 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.dependencies.database import get_db
+from app.dependencies.database import get_db, get_async_db
 from app.services.auth_service import AuthService
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """
-    Dependency para obter usuário atual a partir do token JWT
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Dependency para obter usuário atual a partir do token JWT
+
+    Retorna um Principal (id, username, role, is_active, is_approved, full_name) vindo
+    do cache; rotas que precisam da linha completa devem buscá-la pelo id.
+    """
     user = AuthService.get_current_user_from_token(db, token)
     
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    return user
+
+async def get_async_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    Como get_current_user, para rotas async: usa a mesma AsyncSession da rota e não
+    ocupa thread do threadpool (nem para a sessão síncrona nem no cache miss).
+    """
+    user = await AuthService.get_current_user_from_token_async(db, token)
+    
+    if user is None:
+        raise _credentials_exception()
     
-    return user
\ No newline at end of file
+    return user
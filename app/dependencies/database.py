@@ -1,5 +1,7 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from app.models import Base
 import os
 from dotenv import load_dotenv
@@ -33,6 +35,45 @@ else:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_database_url(url: str):
+    """Converte DATABASE_URL para o driver assíncrono (aiosqlite / asyncpg)"""
+    async_url = make_url(url)
+    connect_args = {}
+    if async_url.drivername.startswith("sqlite"):
+        async_url = async_url.set(drivername="sqlite+aiosqlite")
+    elif async_url.drivername in ("postgres", "postgresql") or async_url.drivername.startswith("postgresql+"):
+        async_url = async_url.set(drivername="postgresql+asyncpg")
+        # asyncpg não entende sslmode (comum nas URLs do Neon/Supabase)
+        query = dict(async_url.query)
+        sslmode = query.pop("sslmode", None)
+        query.pop("channel_binding", None)
+        async_url = async_url.set(query=query)
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = "require"
+    return async_url, connect_args
+
+# Engine assíncrono (mesmo banco, drivers aiosqlite/asyncpg) para rotas async def
+try:
+    ASYNC_DATABASE_URL, async_connect_args = get_async_database_url(DATABASE_URL)
+    if DATABASE_URL.startswith("sqlite"):
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=async_connect_args)
+    else:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            pool_pre_ping=True,
+            pool_size=5,
+            max_overflow=10,
+            connect_args=async_connect_args
+        )
+except Exception as e:
+    print(f"⚠️ AVISO: Engine assíncrono indisponível ({e}); rotas async usarão erro 503")
+    async_engine = None
+
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    if async_engine is not None else None
+)
+
 def get_db():
     """Dependência para obter sessão do banco de dados"""
     import logging
@@ -49,3 +90,21 @@ def get_db():
     finally:
         logger.debug("🔌 Fechando sessão do banco de dados")
         db.close()
+
+
+async def get_async_db():
+    """Dependência para obter sessão assíncrona do banco de dados"""
+    import logging
+    from fastapi import HTTPException
+    logger = logging.getLogger(__name__)
+    
+    if AsyncSessionLocal is None:
+        raise HTTPException(status_code=503, detail="Banco de dados assíncrono indisponível")
+    
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"❌ Erro na sessão assíncrona do banco: {e}")
+            await db.rollback()
+            raise
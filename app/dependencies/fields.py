@@ -0,0 +1,49 @@
+from functools import lru_cache
+from typing import FrozenSet, Optional, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+from app.schemas import TicketSummary, TicketSummaryBase
+
+SUMMARY = "summary"
+
+
+@lru_cache(maxsize=128)
+def ticket_fields_schema(fields: FrozenSet[str]) -> Type[TicketSummaryBase]:
+    """Schema só com os campos pedidos de TicketSummary (id sempre incluído, para o cursor)"""
+    names = fields | {"id"}
+    definitions = {
+        name: (field.annotation, field)
+        for name, field in TicketSummary.model_fields.items() if name in names
+    }
+    return create_model("TicketFields", __base__=TicketSummaryBase, **definitions)
+
+
+class TicketFields:
+    """
+    Dependency `?fields=` das listagens de ticket.
+
+    Sem o parâmetro a listagem devolve o schema completo de sempre. `fields=summary` usa
+    TicketSummary (usuários resumidos em id/full_name/avatar_url, sem descrição nem anexos);
+    uma lista separada por vírgulas (ex.: `fields=id,title,status,assigned_technician`)
+    devolve só esses campos. O SELECT usa load_only com as mesmas colunas.
+    """
+
+    def __init__(self, fields: Optional[str] = None):
+        self.schema: Optional[Type[BaseModel]] = None
+        if fields is None or fields.strip() == "":
+            return
+        if fields.strip() == SUMMARY:
+            self.schema = TicketSummary
+            return
+        names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        unknown = names - TicketSummary.model_fields.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Campos inválidos: {', '.join(sorted(unknown))}. Disponíveis: {', '.join(TicketSummary.model_fields)}"
+            )
+        self.schema = ticket_fields_schema(names)
+
+    def resolve(self, default: Type[BaseModel]) -> Type[BaseModel]:
+        """Schema da resposta: o pedido em ?fields= ou o padrão da rota"""
+        return self.schema or default
@@ -0,0 +1,37 @@
+from typing import List, Optional
+from fastapi import HTTPException
+from app.services.pagination import DEFAULT_PAGE_SIZE, encode_cursor, decode_cursor
+
+
+class PageParams:
+    """
+    Dependency de paginação das listagens.
+
+    Sem `cursor` a listagem funciona como antes (skip/limit, resposta em lista).
+    Com `cursor` (vazio na primeira página) a paginação é por keyset e a resposta
+    vira {"items": [...], "next_cursor": "..."}; next_cursor é None na última página.
+    """
+
+    def __init__(self, skip: int = 0, limit: Optional[int] = None, cursor: Optional[str] = None):
+        if skip < 0 or (limit is not None and limit < 1):
+            raise HTTPException(status_code=400, detail="Parâmetros de paginação inválidos")
+        self.skip = 0 if cursor is not None else skip
+        self.limit_given = limit is not None
+        self.limit = limit if limit is not None else DEFAULT_PAGE_SIZE
+        self.cursor_mode = cursor is not None
+        self.after_id = None
+        if cursor:
+            try:
+                self.after_id = decode_cursor(cursor)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+
+    def page(self, items: List, key=lambda item: item.id):
+        """Monta a resposta no formato do modo de paginação em uso"""
+        if not self.cursor_mode:
+            return items
+        # has_more vem de paginate_query/paginate_select (PageList), que buscam limit + 1 linhas
+        next_cursor = None
+        if items and getattr(items, "has_more", False):
+            next_cursor = encode_cursor(key(items[-1]))
+        return {"items": items, "next_cursor": next_cursor}
@@ -1,4 +1,4 @@
-from .models import Base, User, Ticket, Comment, TicketHistory, PriorityEnum, StatusEnum, RoleEnum
+from .models import Base, User, Ticket, Comment, TicketHistory, TechnicianStats, AttachmentBlob, TicketAttachment, RefreshToken, PriorityEnum, StatusEnum, RoleEnum
 
 __all__ = [
     "Base",
@@ -6,6 +6,10 @@ __all__ = [
     "Ticket",
     "Comment",
     "TicketHistory",
+    "TechnicianStats",
+    "AttachmentBlob",
+    "TicketAttachment",
+    "RefreshToken",
     "PriorityEnum",
     "StatusEnum", 
     "RoleEnum"
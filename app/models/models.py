@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum, Boolean, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum, Boolean, JSON, Float, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Dict, Optional
 import enum
+import re
 
 Base = declarative_base()
 
@@ -24,6 +26,16 @@ class RoleEnum(enum.Enum):
     technician = "technician"
     admin = "admin"
 
+# Miniaturas WebP geradas no upload do avatar (ver app/services/avatar_images.py)
+AVATAR_THUMBNAIL_SIZES = (32, 64, 256)
+# Avatar endereçado por conteúdo: <user_id>-<sha256>.<ext>
+AVATAR_FILENAME = re.compile(r"^\d+-[0-9a-f]{64}\.[a-z0-9]+$")
+
+def avatar_thumbnail_url(avatar_url: str, size: int) -> str:
+    """URL da miniatura: /static/avatars/<user_id>-<sha256>-<size>.webp"""
+    base = avatar_url.rsplit(".", 1)[0]
+    return f"{base}-{size}.webp"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -52,6 +64,13 @@ class User(Base):
     # Relacionamento com tickets
     tickets = relationship("Ticket", back_populates="user", foreign_keys="Ticket.user_id")
     assigned_tickets = relationship("Ticket", back_populates="assigned_technician", foreign_keys="Ticket.assigned_technician_id")
+    
+    @property
+    def avatar_urls(self) -> Optional[Dict[str, str]]:
+        """URLs das miniaturas por tamanho (None para avatar legado ainda sem miniaturas)"""
+        if not self.avatar_url or not AVATAR_FILENAME.match(self.avatar_url.rsplit("/", 1)[-1]):
+            return None
+        return {str(size): avatar_thumbnail_url(self.avatar_url, size) for size in AVATAR_THUMBNAIL_SIZES}
 
 class Ticket(Base):
     __tablename__ = "tickets"
@@ -70,7 +89,7 @@ class Ticket(Base):
     equipment_id = Column(String, nullable=True)
     sla_deadline = Column(DateTime, nullable=True)
     estimated_time = Column(Integer, nullable=True)  # em minutos
-    attachments = Column(JSON, nullable=True)  # Lista de anexos
+    legacy_attachments = Column("attachments", JSON, nullable=True)  # Lista de anexos (legado, ver TicketAttachment)
     assigned_by_admin = Column(Boolean, default=False)  # Indica se foi atribuído pelo admin
     
     # Relacionamento com usuário
@@ -84,6 +103,31 @@ class Ticket(Base):
     # Relacionamento com comentários e histórico
     comments = relationship("Comment", back_populates="ticket", cascade="all, delete-orphan")
     history = relationship("TicketHistory", back_populates="ticket", cascade="all, delete-orphan")
+    attachments = relationship(
+        "TicketAttachment", back_populates="ticket", cascade="all, delete-orphan",
+        order_by="TicketAttachment.id"
+    )
+    
+    # Índices dos filtros do TicketService (ver alembic/versions/003_add_ticket_indexes.py).
+    # Os valores de status nos predicados são os nomes do Enum, que é o que o banco armazena.
+    __table_args__ = (
+        Index("ix_tickets_technician_status", "assigned_technician_id", "status"),
+        Index("ix_tickets_technician_admin", "assigned_technician_id", "assigned_by_admin"),
+        Index("ix_tickets_user_id", "user_id", "id"),
+        Index("ix_tickets_status", "status", "id"),
+        # Fila de tickets abertos sem técnico
+        Index(
+            "ix_tickets_open_queue", "id",
+            postgresql_where=text("status = 'open' AND assigned_technician_id IS NULL"),
+            sqlite_where=text("status = 'open' AND assigned_technician_id IS NULL"),
+        ),
+        # Tickets ativos com SLA (contagem de atrasados)
+        Index(
+            "ix_tickets_active_sla", "assigned_technician_id", "sla_deadline",
+            postgresql_where=text("status IN ('pending', 'in_progress')"),
+            sqlite_where=text("status IN ('pending', 'in_progress')"),
+        ),
+    )
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -97,6 +141,10 @@ class Comment(Base):
     # Relacionamento com ticket
     ticket_id = Column(Integer, ForeignKey("tickets.id"))
     ticket = relationship("Ticket", back_populates="comments")
+    
+    __table_args__ = (
+        Index("ix_comments_ticket_created", "ticket_id", "created_at"),
+    )
 
 class TicketHistory(Base):
     __tablename__ = "ticket_history"
@@ -111,3 +159,77 @@ class TicketHistory(Base):
     # Relacionamento com ticket
     ticket_id = Column(Integer, ForeignKey("tickets.id"))
     ticket = relationship("Ticket", back_populates="history")
+    
+    __table_args__ = (
+        Index("ix_ticket_history_ticket_timestamp", "ticket_id", "timestamp"),
+    )
+
+class TechnicianStats(Base):
+    """Contadores materializados do dashboard do técnico (mantidos pelo TicketService)"""
+    __tablename__ = "technician_stats"
+    
+    technician_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_tickets = Column(Integer, nullable=False, default=0)
+    open_tickets = Column(Integer, nullable=False, default=0)
+    pending_tickets = Column(Integer, nullable=False, default=0)
+    in_progress_tickets = Column(Integer, nullable=False, default=0)
+    resolved_tickets = Column(Integer, nullable=False, default=0)
+    closed_tickets = Column(Integer, nullable=False, default=0)
+    overdue_tickets = Column(Integer, nullable=False, default=0)
+    overdue_refreshed_at = Column(DateTime, nullable=True)  # None = precisa recalcular
+    resolution_time_sum = Column(Float, nullable=False, default=0.0)  # em segundos
+    resolution_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class AttachmentBlob(Base):
+    """Conteúdo de anexo endereçado por SHA-256 (um arquivo físico por conteúdo)"""
+    __tablename__ = "attachment_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # anexos que apontam para o blob
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class TicketAttachment(Base):
+    """Anexo de ticket (uma linha por arquivo enviado)"""
+    __tablename__ = "ticket_attachments"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
+    stored_filename = Column(String, nullable=False, unique=True)  # nome usado nas URLs
+    filename = Column(String, nullable=False)  # nome original
+    size = Column(Integer, nullable=False, default=0)
+    content_type = Column(String, nullable=False, default="application/octet-stream")
+    sha256 = Column(String(64), nullable=True, index=True)  # blob em attachment_blobs
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    ticket = relationship("Ticket", back_populates="attachments")
+    
+    __table_args__ = (
+        Index("ix_ticket_attachments_ticket_id", "ticket_id", "id"),
+    )
+    
+    @property
+    def type(self) -> str:
+        return self.content_type
+    
+    @property
+    def url(self) -> str:
+        return f"/tickets/{self.ticket_id}/attachments/download/{self.stored_filename}"
+
+class RefreshToken(Base):
+    """Refresh token (só o SHA-256 é armazenado); tokens da mesma sessão formam uma família"""
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    family_id = Column(String(32), nullable=False, index=True)  # "sid" dos access tokens da sessão
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    rotated_at = Column(DateTime, nullable=True)  # trocado por um novo em /token/refresh
+    revoked_at = Column(DateTime, nullable=True)  # logout ou reutilização detectada (revoga a sessão)
+    
+    __table_args__ = (
+        Index("ix_refresh_tokens_revoked_at", "revoked_at"),
+    )
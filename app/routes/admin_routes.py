@@ -1,12 +1,18 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.dependencies import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db, get_async_db, PageParams, TicketFields
 from app.dependencies.auth_dependencies import get_current_user
 from app.controllers import AdminController
 from app.models import User
-from app.schemas import UserResponse, TicketResponse
+from app.schemas import (
+    UserResponse, TicketResponse, UserPage, TicketPage, TicketSummary, TicketSummaryPage,
+    TicketBulkRequest, TicketBulkResponse, schema_response
+)
 from app.services.user_service import UserService
+from app.services.async_services import AsyncTicketService, AsyncUserService
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -30,10 +36,20 @@ def approve_technician(
     
     return AdminController.approve_technician(db, technician_id)
 
-@router.get("/tickets", response_model=List[TicketResponse])
-def get_all_tickets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/tickets", response_model=Union[List[TicketResponse], TicketPage, List[TicketSummary], TicketSummaryPage])
+async def get_all_tickets(page: PageParams = Depends(), fields: TicketFields = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Obter todos os tickets (visão admin)"""
-    return AdminController.get_all_tickets(db, skip, limit)
+    schema = fields.resolve(TicketResponse)
+    tickets = await AsyncTicketService.get_all_tickets(db, page.skip, page.limit, page.after_id, schema=schema)
+    return schema_response(page.page(tickets.map(schema.from_orm)))
+
+@router.get("/tickets/export", response_model=Union[List[TicketResponse], List[TicketSummary]])
+def export_tickets(fields: TicketFields = Depends(), current_user: User = Depends(get_current_user)):
+    """Todos os tickets num único array JSON, enviado em streaming (requer autenticação de admin)"""
+    role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
+    if role_str != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado: apenas administradores")
+    return AdminController.stream_all_tickets(fields.resolve(TicketResponse))
 
 @router.post("/tickets/{ticket_id}/assign/{technician_id}", response_model=TicketResponse)
 def assign_ticket(ticket_id: int, technician_id: int, db: Session = Depends(get_db)):
@@ -43,16 +59,35 @@ def assign_ticket(ticket_id: int, technician_id: int, db: Session = Depends(get_
 class ResetPasswordPayload(BaseModel):
     new_password: str
 
-@router.get('/usuarios', response_model=List[UserResponse])
-def list_users(db: Session = Depends(get_db)):
+@router.get('/usuarios', response_model=Union[List[UserResponse], UserPage])
+async def list_users(page: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Lista todos os usuários (sem senhas)"""
-    return AdminController.list_users(db)
+    # Sem cursor nem limit, mantém o comportamento legado de listar todos (em streaming)
+    if not (page.cursor_mode or page.limit_given or page.skip):
+        return AdminController.stream_all_users()
+    limit = page.limit if page.cursor_mode or page.limit_given else None
+    users = await AsyncUserService.get_all_users(db, page.skip, limit, page.after_id)
+    return schema_response(page.page(users.map(UserResponse.from_orm)))
+
+@router.post('/users/import')
+async def import_users(request: Request, approve: bool = False, current_user: User = Depends(get_current_user)):
+    """
+    Importação em massa de usuários (requer autenticação de admin).
+    Corpo: CSV com cabeçalho (text/csv) ou array JSON (application/json) com os campos de
+    UserCreate. Resposta: NDJSON com o status de cada linha, enviado conforme os lotes gravam.
+    """
+    role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
+    if role_str != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado: apenas administradores")
+    body = await request.body()
+    content_type = request.headers.get("content-type", "text/csv")
+    return await run_in_threadpool(AdminController.import_users, body, content_type, approve)
 
 @router.get('/servidores', response_model=List[UserResponse])
 def list_servidores(db: Session = Depends(get_db)):
     """Lista apenas usuários com role=servidor"""
     users = UserService.get_users_by_role(db, "servidor")
-    return [UserResponse.from_orm(u) for u in users]
+    return schema_response([UserResponse.from_orm(u) for u in users])
 
 @router.get('/tecnicos', response_model=List[UserResponse])
 def list_technicians(
@@ -66,19 +101,19 @@ def list_technicians(
         raise HTTPException(status_code=403, detail="Acesso negado: apenas administradores")
     
     users = UserService.get_users_by_role(db, "technician")
-    return [UserResponse.from_orm(u) for u in users]
+    return schema_response([UserResponse.from_orm(u) for u in users])
 
 @router.get('/admins', response_model=List[UserResponse])
 def list_admins(db: Session = Depends(get_db)):
     """Lista apenas admins"""
     users = UserService.get_users_by_role(db, "admin")
-    return [UserResponse.from_orm(u) for u in users]
+    return schema_response([UserResponse.from_orm(u) for u in users])
 
 @router.get('/todos', response_model=List[UserResponse])
 def list_all_admins(db: Session = Depends(get_db)):
     """Lista apenas administradores (role=admin)"""
     users = UserService.get_users_by_role(db, "admin")
-    return [UserResponse.from_orm(u) for u in users]
+    return schema_response([UserResponse.from_orm(u) for u in users])
 
 @router.post('/users/{user_id}/reset-password')
 def reset_user_password(user_id: int, payload: ResetPasswordPayload, db: Session = Depends(get_db)):
@@ -106,23 +141,54 @@ def assign_ticket(ticket_id: int, payload: dict, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="technician_id é obrigatório")
     return AdminController.assign_ticket_to_technician(db, ticket_id, technician_id)
 
+@router.post('/tickets/bulk', response_model=TicketBulkResponse)
+def bulk_update_tickets(
+    request: TicketBulkRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Operação em massa sobre tickets: assign, status ou close (requer autenticação de admin)"""
+    role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
+    if role_str != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado: apenas administradores")
+    return AdminController.bulk_update_tickets(db, request, current_user)
+
 # === NOVOS ENDPOINTS PARA O SISTEMA DE ADMIN ===
 
-@router.get('/tickets/open', response_model=List[TicketResponse])
-def get_open_tickets_for_admin(db: Session = Depends(get_db)):
+@router.get('/tickets/open', response_model=Union[List[TicketResponse], List[TicketSummary]])
+def get_open_tickets_for_admin(fields: TicketFields = Depends(), db: Session = Depends(get_db)):
     """Obtém tickets abertos não atribuídos para o admin gerenciar"""
     from app.services.ticket_service import TicketService
-    tickets = TicketService.get_open_tickets_for_admin(db)
-    return [TicketResponse.from_orm(ticket) for ticket in tickets]
+    schema = fields.resolve(TicketResponse)
+    tickets = TicketService.get_open_tickets_for_admin(db, schema=schema)
+    return schema_response([schema.from_orm(ticket) for ticket in tickets])
 
 @router.get('/technicians', response_model=List[UserResponse])
 def get_technicians_for_assignment(db: Session = Depends(get_db)):
     """Obtém técnicos disponíveis para atribuição"""
     return AdminController.get_technicians(db)
 
-@router.get('/tickets/assigned', response_model=List[TicketResponse])
-def get_assigned_tickets_for_admin(db: Session = Depends(get_db)):
+@router.get('/tickets/assigned', response_model=Union[List[TicketResponse], List[TicketSummary]])
+def get_assigned_tickets_for_admin(fields: TicketFields = Depends(), db: Session = Depends(get_db)):
     """Obtém tickets que já foram atribuídos a técnicos"""
     from app.services.ticket_service import TicketService
-    tickets = TicketService.get_all_assigned_tickets(db)
-    return [TicketResponse.from_orm(ticket) for ticket in tickets]
\ No newline at end of file
+    schema = fields.resolve(TicketResponse)
+    tickets = TicketService.get_all_assigned_tickets(db, schema=schema)
+    return schema_response([schema.from_orm(ticket) for ticket in tickets])
+
+@router.get('/auth-cache/stats')
+def get_auth_cache_stats(current_user: User = Depends(get_current_user)):
+    """Contadores dos caches de autenticação: usuários e tokens (requer autenticação de admin)"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado: apenas administradores")
+    from app.services.principal_cache import principal_cache
+    from app.services.token_cache import token_cache
+    return {"principals": principal_cache.stats(), "tokens": token_cache.stats()}
+
+@router.get('/password-hasher/stats')
+def get_password_hasher_stats(current_user: User = Depends(get_current_user)):
+    """Fila e histograma de latência do pool de bcrypt (requer autenticação de admin)"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=403, detail="Acesso negado: apenas administradores")
+    from app.services.password_hasher import password_hasher
+    return password_hasher.stats()
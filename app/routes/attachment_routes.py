@@ -1,7 +1,7 @@
 """
 Rotas para gerenciamento de anexos de tickets
 """
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.dependencies import get_db, get_current_user
 from app.controllers import attachment_controller
@@ -25,13 +25,13 @@ async def upload_attachments(
     - **files**: Lista de arquivos (imagens, PDFs, documentos)
     - Tamanho máximo por arquivo: 10MB
     """
-    return attachment_controller.upload_ticket_attachments(
+    return await attachment_controller.upload_ticket_attachments(
         ticket_id, files, db, current_user.id
     )
 
 
 @router.get("/")
-async def get_attachments(
+def get_attachments(
     ticket_id: int,
     db: Session = Depends(get_db)
 ):
@@ -42,9 +42,10 @@ async def get_attachments(
 
 
 @router.get("/download/{filename}")
-async def download_attachment(
+def download_attachment(
     ticket_id: int,
     filename: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
@@ -52,8 +53,9 @@ async def download_attachment(
     
     - **ticket_id**: ID do ticket
     - **filename**: Nome do arquivo armazenado
+    - Suporta `Range` (download retomável) e `If-None-Match`/`If-Modified-Since` (304)
     """
-    return attachment_controller.download_attachment(ticket_id, filename, db)
+    return attachment_controller.download_attachment(ticket_id, filename, db, request)
 
 
 @router.delete("/{filename}")
@@ -68,7 +70,7 @@ async def delete_attachment(
     
     - Apenas o dono do ticket ou técnico atribuído podem deletar
     """
-    return attachment_controller.delete_attachment(
+    return await attachment_controller.delete_attachment(
         ticket_id, filename, db, current_user.id
     )
 
@@ -4,29 +4,39 @@ from app.dependencies import get_db
 from app.controllers import AuthController
 from app.schemas import ServidorRegister, AdminRegister
 from app.models import User
-from app.schemas import     UserCreate, UserLogin, TechRegister, UserResponse
+from app.schemas import     UserCreate, UserLogin, TechRegister, UserResponse, RefreshTokenRequest
 
 router = APIRouter(tags=["Authentication"])
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: ServidorRegister, db: Session = Depends(get_db)):
+async def register(user: ServidorRegister, db: Session = Depends(get_db)):
     """Registro de servidores (username, full_name, phone, password)"""
-    return AuthController.register_servidor(db, user)
+    return await AuthController.register_servidor(db, user)
 
 @router.post("/tech-register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_technician(tech: TechRegister, db: Session = Depends(get_db)):
+async def register_technician(tech: TechRegister, db: Session = Depends(get_db)):
     """Registro de técnicos"""
-    return AuthController.register_technician(db, tech)
+    return await AuthController.register_technician(db, tech)
 
 @router.post("/admin-register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_admin(admin: AdminRegister, db: Session = Depends(get_db)):
+async def register_admin(admin: AdminRegister, db: Session = Depends(get_db)):
     """Registro de administradores"""
-    return AuthController.register_admin(db, admin)
+    return await AuthController.register_admin(db, admin)
 
 @router.post("/login", include_in_schema=True)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: Session = Depends(get_db)):
     """Login de usuários"""
-    return AuthController.login(db, user)
+    return await AuthController.login(db, user)
+
+@router.post("/token/refresh")
+def refresh_token(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Troca o refresh token por um novo access token + refresh token (o anterior deixa de valer)"""
+    return AuthController.refresh_token(db, payload)
+
+@router.post("/logout")
+def logout(payload: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Encerra a sessão do refresh token informado"""
+    return AuthController.logout(db, payload)
 
 @router.get("/me")
 def get_me(username: str = None, db: Session = Depends(get_db)):
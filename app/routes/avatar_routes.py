@@ -3,7 +3,7 @@ Rotas para gerenciamento de avatares
 """
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
 from sqlalchemy.orm import Session
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_db, get_current_user, PageParams
 from app.controllers import avatar_controller
 from app.models import User
 
@@ -22,7 +22,7 @@ async def upload_avatar(
     - **file**: Arquivo de imagem (JPG, PNG, GIF, WEBP)
     - Tamanho máximo: 5MB
     """
-    return avatar_controller.upload_avatar(current_user.id, file, db)
+    return await avatar_controller.upload_avatar(current_user.id, file, db)
 
 
 @router.post("/{user_id}/upload")
@@ -42,11 +42,11 @@ async def upload_avatar_by_id(
     if current_user.role.value != "admin" and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Sem permissão para alterar avatar deste usuário")
     
-    return avatar_controller.upload_avatar(user_id, file, db)
+    return await avatar_controller.upload_avatar(user_id, file, db)
 
 
 @router.get("/me")
-async def get_my_avatar(
+def get_my_avatar(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -57,7 +57,7 @@ async def get_my_avatar(
 
 
 @router.get("/{user_id}")
-async def get_user_avatar(
+def get_user_avatar(
     user_id: int,
     db: Session = Depends(get_db)
 ):
@@ -68,7 +68,7 @@ async def get_user_avatar(
 
 
 @router.delete("/me")
-async def delete_my_avatar(
+def delete_my_avatar(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -79,7 +79,7 @@ async def delete_my_avatar(
 
 
 @router.delete("/{user_id}")
-async def delete_user_avatar(
+def delete_user_avatar(
     user_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -95,9 +95,8 @@ async def delete_user_avatar(
 
 
 @router.get("/")
-async def list_user_avatars(
-    skip: int = 0,
-    limit: int = 100,
+def list_user_avatars(
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -107,5 +106,8 @@ async def list_user_avatars(
     if current_user.role.value != "admin":
         raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
     
-    return avatar_controller.get_user_avatars_list(db, skip, limit)
+    return page.page(
+        avatar_controller.get_user_avatars_list(db, page.skip, page.limit, page.after_id),
+        key=lambda item: item["id"]
+    )
 
@@ -1,108 +1,105 @@
-from typing import List
+from typing import List, Union
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.dependencies import get_db
-from app.dependencies.auth_dependencies import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db, get_async_db, PageParams, TicketFields
+from app.dependencies.auth_dependencies import get_current_user, get_async_current_user
 from app.controllers import TechController
 from app.models import User
 from app.schemas import (
     TicketResponse, TicketWithHistory, TechDashboardStats,
-    TicketHistoryCreate, TicketHistoryResponse
+    TicketHistoryCreate, TicketHistoryResponse, TicketPage, TicketSummary, TicketSummaryPage
 )
-from app.schemas import UserResponse
+from app.schemas import UserResponse, schema_response
 from app.services.user_service import UserService
+from app.services.async_services import AsyncTicketService
+from app.services.unit_of_work import unit_of_work
 
 router = APIRouter(prefix="/tech", tags=["Técnico"])
 
 @router.get("/dashboard/stats", response_model=TechDashboardStats)
-def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_dashboard_stats(
+    current_user: User = Depends(get_async_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obter estatísticas do dashboard do técnico"""
-    from app.services.ticket_service import TicketService
-    
     # Verificar se é técnico ou admin
     role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
     if role_str not in ["technician", "admin"]:
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
-    stats = TicketService.get_tech_dashboard_stats(db, current_user.id)
+    stats = await AsyncTicketService.get_tech_dashboard_stats(db, current_user.id)
     return stats
 
-@router.get("/tickets", response_model=List[TicketResponse])
-def get_tech_tickets(
-    current_user: User = Depends(get_current_user),
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+@router.get("/tickets", response_model=Union[List[TicketResponse], TicketPage, List[TicketSummary], TicketSummaryPage])
+async def get_tech_tickets(
+    current_user: User = Depends(get_async_current_user),
+    page: PageParams = Depends(),
+    fields: TicketFields = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obter tickets disponíveis (atribuídos ao técnico + não atribuídos)"""
-    from app.services.ticket_service import TicketService
-    
     # Verificar se é técnico ou admin
     role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
     if role_str not in ["technician", "admin"]:
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
-    tickets = TicketService.get_available_tickets_for_technician(db, current_user.id, skip, limit)
-    return [TicketResponse.from_orm(ticket) for ticket in tickets]
+    schema = fields.resolve(TicketResponse)
+    tickets = await AsyncTicketService.get_available_tickets_for_technician(db, current_user.id, page.skip, page.limit, page.after_id, schema=schema)
+    return schema_response(page.page(tickets.map(schema.from_orm)))
 
-@router.get("/tickets/assigned", response_model=List[TicketResponse])
-def get_assigned_tickets(
-    current_user: User = Depends(get_current_user),
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+@router.get("/tickets/assigned", response_model=Union[List[TicketResponse], TicketPage, List[TicketSummary], TicketSummaryPage])
+async def get_assigned_tickets(
+    current_user: User = Depends(get_async_current_user),
+    page: PageParams = Depends(),
+    fields: TicketFields = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obter apenas tickets já atribuídos ao técnico logado"""
-    from app.services.ticket_service import TicketService
-    
     # Verificar se é técnico ou admin
     role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
     if role_str not in ["technician", "admin"]:
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
-    tickets = TicketService.get_technician_assigned_tickets(db, current_user.id, skip, limit)
-    return [TicketResponse.from_orm(ticket) for ticket in tickets]
+    schema = fields.resolve(TicketResponse)
+    tickets = await AsyncTicketService.get_technician_assigned_tickets(db, current_user.id, page.skip, page.limit, page.after_id, schema=schema)
+    return schema_response(page.page(tickets.map(schema.from_orm)))
 
-@router.get("/tickets/available", response_model=List[TicketResponse])
-def get_available_tickets(
-    current_user: User = Depends(get_current_user),
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+@router.get("/tickets/available", response_model=Union[List[TicketResponse], TicketPage, List[TicketSummary], TicketSummaryPage])
+async def get_available_tickets(
+    current_user: User = Depends(get_async_current_user),
+    page: PageParams = Depends(),
+    fields: TicketFields = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obter tickets não atribuídos (disponíveis para pegar)"""
-    from app.services.ticket_service import TicketService
-    
     # Verificar se é técnico ou admin
     role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
     if role_str not in ["technician", "admin"]:
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
-    tickets = TicketService.get_available_tickets_for_tech_queue(db, skip, limit)
-    return [TicketResponse.from_orm(ticket) for ticket in tickets]
+    schema = fields.resolve(TicketResponse)
+    tickets = await AsyncTicketService.get_available_tickets_for_tech_queue(db, page.skip, page.limit, page.after_id, schema=schema)
+    return schema_response(page.page(tickets.map(schema.from_orm)))
 
 # === NOVOS ENDPOINTS PARA TÉCNICOS ===
 
-@router.get("/tickets/admin-assigned", response_model=List[TicketResponse])
-def get_admin_assigned_tickets(
-    current_user: User = Depends(get_current_user),
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db)
+@router.get("/tickets/admin-assigned", response_model=Union[List[TicketResponse], TicketPage, List[TicketSummary], TicketSummaryPage])
+async def get_admin_assigned_tickets(
+    current_user: User = Depends(get_async_current_user),
+    page: PageParams = Depends(),
+    fields: TicketFields = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtém tickets atribuídos pelo admin ao técnico logado"""
-    from app.services.ticket_service import TicketService
-    
     # Verificar se é técnico ou admin
     role_str = str(current_user.role.value) if hasattr(current_user.role, 'value') else str(current_user.role)
     if role_str not in ["technician", "admin"]:
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
-    tickets = TicketService.get_tickets_assigned_by_admin(db, current_user.id, skip, limit)
-    return [TicketResponse.from_orm(ticket) for ticket in tickets]
+    schema = fields.resolve(TicketResponse)
+    tickets = await AsyncTicketService.get_tickets_assigned_by_admin(db, current_user.id, page.skip, page.limit, page.after_id, schema=schema)
+    return schema_response(page.page(tickets.map(schema.from_orm)))
 
 @router.post("/tickets/{ticket_id}/take", response_model=TicketResponse)
 def take_ticket(
@@ -118,10 +115,11 @@ def take_ticket(
     if role_str not in ["technician", "admin"]:
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
-    ticket = TicketService.assign_ticket_to_self(db, ticket_id, current_user.id)
-    if not ticket:
-        raise HTTPException(status_code=400, detail="Ticket não encontrado ou já atribuído")
-    return TicketResponse.from_orm(ticket)
+    with unit_of_work(db):
+        ticket = TicketService.assign_ticket_to_self(db, ticket_id, current_user.id)
+        if not ticket:
+            raise HTTPException(status_code=400, detail="Ticket não encontrado ou já atribuído")
+        return TicketResponse.from_orm(ticket)
 
 @router.get("/usuarios", response_model=List[UserResponse])
 def list_users_by_role(
@@ -135,13 +133,13 @@ def list_users_by_role(
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
     users = UserService.get_users_by_role(db, "servidor") + UserService.get_users_by_role(db, "technician") + UserService.get_users_by_role(db, "admin")
-    return [UserResponse.from_orm(u) for u in users]
+    return schema_response([UserResponse.from_orm(u) for u in users])
 
 @router.get("/todos", response_model=List[UserResponse])
 def list_all_tecnicos(db: Session = Depends(get_db)):
     """Lista apenas técnicos (role=technician)"""
     users = UserService.get_users_by_role(db, "technician")
-    return [UserResponse.from_orm(u) for u in users]
+    return schema_response([UserResponse.from_orm(u) for u in users])
 
 @router.get("/tickets/{ticket_id}", response_model=TicketWithHistory)
 def get_tech_ticket_details(
@@ -157,7 +155,7 @@ def get_tech_ticket_details(
     if role_str not in ["technician", "admin"]:
         raise HTTPException(status_code=403, detail="Acesso negado: apenas técnicos e admins")
     
-    ticket = TicketService.get_ticket_by_id(db, ticket_id)
+    ticket = TicketService.get_ticket_by_id(db, ticket_id, schema=TicketWithHistory)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket não encontrado")
     
@@ -191,8 +189,9 @@ def update_ticket_status(
     if not TicketService.technician_has_access_to_ticket(ticket, current_user):
         raise HTTPException(status_code=403, detail="Acesso negado a este ticket")
     
-    updated_ticket = TicketService.update_ticket(db, ticket_id, status_update)
-    return TicketResponse.from_orm(updated_ticket)
+    with unit_of_work(db):
+        updated_ticket = TicketService.update_ticket(db, ticket_id, status_update)
+        return TicketResponse.from_orm(updated_ticket)
 
 @router.post("/tickets/{ticket_id}/history", response_model=TicketHistoryResponse)
 def add_ticket_history(
@@ -217,7 +216,8 @@ def add_ticket_history(
     if not TicketService.technician_has_access_to_ticket(ticket, current_user):
         raise HTTPException(status_code=403, detail="Acesso negado a este ticket")
     
-    history_entry = TicketService.create_ticket_history(
-        db, history, ticket_id, current_user.full_name
-    )
-    return TicketHistoryResponse.from_orm(history_entry)
+    with unit_of_work(db):
+        history_entry = TicketService.create_ticket_history(
+            db, history, ticket_id, current_user.full_name
+        )
+        return TicketHistoryResponse.from_orm(history_entry)
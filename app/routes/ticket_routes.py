@@ -1,13 +1,14 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from app.dependencies import get_db
+from app.dependencies import get_db, PageParams, TicketFields
 from app.controllers import TicketController
 from app.models import User
 from app.schemas import (
     TicketCreate, TicketUpdate, TicketResponse, TicketWithComments,
-    CommentCreate, CommentResponse
+    CommentCreate, CommentResponse, TicketWithCommentsPage, TicketSummary, TicketSummaryPage, TicketSearchResponse,
+    StatusEnum, PriorityEnum, schema_response
 )
 
 class TicketCreateWithUser(TicketCreate):
@@ -27,20 +28,37 @@ def create_ticket(ticket: TicketCreateWithUser, db: Session = Depends(get_db)):
     
     return TicketController.create_ticket(db, ticket, user)
 
-@router.get("/me/{username}", response_model=List[TicketWithComments])
-def get_my_tickets_by_username(username: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/me/{username}", response_model=Union[List[TicketWithComments], TicketWithCommentsPage, List[TicketSummary], TicketSummaryPage])
+def get_my_tickets_by_username(username: str, page: PageParams = Depends(), fields: TicketFields = Depends(), db: Session = Depends(get_db)):
     """Obter tickets do usuário logado por username"""
     from app.services.user_service import UserService
     user = UserService.get_user_by_username(db, username)
     if not user:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
-    return TicketController.get_user_tickets(db, user, skip, limit)
+    return schema_response(page.page(TicketController.get_user_tickets(db, user, page.skip, page.limit, page.after_id, fields.resolve(TicketWithComments))))
 
-@router.get("", response_model=List[TicketWithComments])
-def get_my_tickets(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("", response_model=Union[List[TicketWithComments], TicketWithCommentsPage, List[TicketSummary], TicketSummaryPage])
+def get_my_tickets(page: PageParams = Depends(), fields: TicketFields = Depends(), db: Session = Depends(get_db)):
     """Obter meus tickets"""
-    return TicketController.get_user_tickets(db, None, skip, limit)
+    return schema_response(page.page(TicketController.get_user_tickets(db, None, page.skip, page.limit, page.after_id, fields.resolve(TicketWithComments))))
+
+@router.get("/search", response_model=TicketSearchResponse)
+def search_tickets(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[StatusEnum] = None,
+    priority: Optional[PriorityEnum] = None,
+    technician_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    facets: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Busca textual em título, descrição, local, tipo, equipamento e comentários (ordenada por relevância)"""
+    return schema_response(TicketController.search_tickets(
+        db, q, status.value if status else None, priority.value if priority else None,
+        technician_id, skip, limit, facets
+    ))
 
 @router.get("/{ticket_id}", response_model=TicketWithComments)
 def get_ticket(ticket_id: int, db: Session = Depends(get_db)):
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from app.dependencies import get_db
 from app.controllers import UserController
 from app.models import User
-from app.schemas import UserResponse, UserUpdate
+from app.schemas import UserResponse, UserUpdate, schema_response
 from typing import List
 from app.services.user_service import UserService
 from pydantic import BaseModel
@@ -39,4 +39,4 @@ def upload_avatar(db: Session = Depends(get_db), file: UploadFile = File(...)):
 def list_all_servidores(db: Session = Depends(get_db)):
     """Lista apenas servidores (role=servidor)"""
     users = UserService.get_users_by_role(db, "servidor")
-    return [UserResponse.from_orm(u) for u in users]
+    return schema_response([UserResponse.from_orm(u) for u in users])
@@ -1,10 +1,16 @@
 from .schemas import *
+from .responses import schema_response, stream_json_array
 
 __all__ = [
     "PriorityEnum", "StatusEnum", "RoleEnum",
-    "UserBase", "UserCreate", "TechRegister", "UserLogin", "UserResponse", "UserUpdate",
+    "UserFields", "UserBase", "UserCreate", "TechRegister", "UserLogin", "RefreshTokenRequest", "UserResponse", "UserUpdate",
     "TicketBase", "TicketCreate", "TicketUpdate", "TicketResponse", "TicketWithComments", "TicketWithHistory",
+    "UserStub", "TicketSummaryBase", "TicketSummary",
     "CommentBase", "CommentCreate", "CommentResponse",
     "TicketHistoryBase", "TicketHistoryCreate", "TicketHistoryResponse",
-    "TechDashboardStats"
+    "TechDashboardStats",
+    "TicketSearchHit", "FacetCount", "TicketSearchResponse",
+    "TicketBulkOperation", "TicketBulkRequest", "TicketBulkItemResult", "TicketBulkResponse",
+    "UserPage", "TicketPage", "TicketWithCommentsPage", "TicketSummaryPage",
+    "schema_response", "stream_json_array"
 ]
@@ -0,0 +1,39 @@
+"""
+Resposta já serializada para schemas construídos na rota
+
+Quando a rota devolve um schema e declara response_model, o FastAPI converte o objeto em
+dict e valida de novo contra o response_model antes de serializar: cada ticket (e os
+usuários aninhados) é construído duas vezes. As listagens constroem os schemas uma única
+vez (from_orm) e devolvem schema_response(...), que serializa direto para JSON no
+pydantic-core. O response_model da rota continua valendo para a documentação, então o
+conteúdo passado aqui precisa ser exatamente do tipo declarado.
+
+Listagens sem limite usam stream_json_array: o array é enviado lote a lote conforme as
+linhas chegam do cursor, e a memória de pico fica no tamanho de um lote.
+"""
+from typing import Any, Iterable, Iterator, Type
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+def schema_response(content: Any, status_code: int = 200) -> Response:
+    """Serializa schemas (ou listas/dicts de schemas) sem a segunda validação do FastAPI"""
+    return Response(content=to_json(content), status_code=status_code, media_type="application/json")
+
+
+def json_array_chunks(batches: Iterable[Iterable[Any]], schema: Type[BaseModel]) -> Iterator[bytes]:
+    """Array JSON em pedaços: cada lote de objetos ORM vira um chunk com os itens no schema"""
+    yield b"["
+    separator = b""
+    for batch in batches:
+        items = [to_json(schema.from_orm(obj)) for obj in batch]
+        if items:
+            yield separator + b",".join(items)
+            separator = b","
+    yield b"]"
+
+
+def stream_json_array(batches: Iterable[Iterable[Any]], schema: Type[BaseModel]) -> StreamingResponse:
+    """Resposta em streaming com o mesmo JSON que schema_response([schema.from_orm(...), ...])"""
+    return StreamingResponse(json_array_chunks(batches, schema), media_type="application/json")
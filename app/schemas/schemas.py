@@ -1,6 +1,6 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from email_validator import validate_email, EmailNotValidError
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -23,11 +23,15 @@ class RoleEnum(str, Enum):
     admin = "admin"
 
 # Schemas de Usuário
-class UserBase(BaseModel):
+class UserFields(BaseModel):
+    """Campos comuns de usuário, sem validadores (base dos schemas de resposta)"""
     username: str
     email: Optional[str] = None
     full_name: str
 
+class UserBase(UserFields):
+    """Campos de usuário para entrada: normaliza e valida o email"""
+
     @field_validator("email")
     @classmethod
     def validate_email_relaxed(cls, value: Optional[str]) -> Optional[str]:
@@ -83,13 +87,18 @@ class UserLogin(BaseModel):
     username: str
     password: str
 
-class UserResponse(UserBase):
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+# Respostas não revalidam o email: ele já foi validado na entrada e vem do banco
+class UserResponse(UserFields):
     id: int
     role: RoleEnum
     is_active: bool
     is_approved: bool
     created_at: datetime
     avatar_url: Optional[str] = None
+    avatar_urls: Optional[Dict[str, str]] = None  # miniaturas WebP por tamanho ("32", "64", "256")
     # Campos específicos de técnico
     employee_id: Optional[str] = None
     department: Optional[str] = None
@@ -135,6 +144,9 @@ class AttachmentInfo(BaseModel):
     url: str
     size: int
     type: str
+    
+    class Config:
+        from_attributes = True
 
 # Schemas de Ticket
 class TicketBase(BaseModel):
@@ -174,9 +186,47 @@ class TicketResponse(TicketBase):
     sla_deadline: Optional[datetime] = None
     assigned_by_admin: Optional[bool] = False
     
+    @field_validator("attachments", mode="before")
+    @classmethod
+    def empty_attachments_as_none(cls, value):
+        # Mantém o contrato anterior: ticket sem anexos serializa como null
+        return list(value) if value else None
+    
+    class Config:
+        from_attributes = True
+
+# Representação enxuta para listagens (?fields=summary ou lista de campos)
+class UserStub(BaseModel):
+    id: int
+    full_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+
     class Config:
         from_attributes = True
 
+class TicketSummaryBase(BaseModel):
+    """Base dos schemas de listagem enxuta (o eager loading usa load_only com os campos declarados)"""
+
+    class Config:
+        from_attributes = True
+
+class TicketSummary(TicketSummaryBase):
+    id: int
+    title: str
+    status: StatusEnum
+    priority: PriorityEnum
+    problem_type: str
+    location: str
+    equipment_id: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    sla_deadline: Optional[datetime] = None
+    assigned_by_admin: Optional[bool] = False
+    user_id: int
+    assigned_technician_id: Optional[int] = None
+    user: Optional[UserStub] = None
+    assigned_technician: Optional[UserStub] = None
+
 # Schemas de Comentário
 class CommentBase(BaseModel):
     text: str
@@ -228,3 +278,59 @@ class TicketWithHistory(TicketResponse):
 # Schema completo de Ticket com comentários
 class TicketWithComments(TicketResponse):
     comments: List[CommentResponse] = []
+
+# Schemas de operações em massa (admin)
+BULK_MAX_TICKETS = 1000
+
+class TicketBulkOperation(str, Enum):
+    assign = "assign"
+    status = "status"
+    close = "close"
+
+class TicketBulkRequest(BaseModel):
+    operation: TicketBulkOperation
+    ticket_ids: List[int] = Field(..., min_length=1, max_length=BULK_MAX_TICKETS)
+    technician_id: Optional[int] = None  # obrigatório para assign
+    status: Optional[StatusEnum] = None  # obrigatório para status
+
+class TicketBulkItemResult(BaseModel):
+    ticket_id: int
+    success: bool
+    detail: Optional[str] = None
+
+class TicketBulkResponse(BaseModel):
+    operation: TicketBulkOperation
+    updated: int
+    results: List[TicketBulkItemResult]
+
+# Schemas de busca de tickets
+class TicketSearchHit(BaseModel):
+    ticket: TicketResponse
+    rank: float
+    highlights: Dict[str, str] = {}  # campo -> trecho com os termos em <mark>
+
+class FacetCount(BaseModel):
+    value: Optional[Union[int, str]] = None
+    count: int
+
+class TicketSearchResponse(BaseModel):
+    total: int
+    items: List[TicketSearchHit]
+    facets: Dict[str, List[FacetCount]] = {}
+
+# Schemas de página (paginação por cursor)
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+class TicketPage(BaseModel):
+    items: List[TicketResponse]
+    next_cursor: Optional[str] = None
+
+class TicketSummaryPage(BaseModel):
+    items: List[TicketSummary]
+    next_cursor: Optional[str] = None
+
+class TicketWithCommentsPage(BaseModel):
+    items: List[TicketWithComments]
+    next_cursor: Optional[str] = None
@@ -1,9 +1,12 @@
 from .auth_service import AuthService
 from .user_service import UserService
 from .ticket_service import TicketService
+from .async_services import AsyncTicketService, AsyncUserService
 
 __all__ = [
     "AuthService",
     "UserService", 
-    "TicketService"
+    "TicketService",
+    "AsyncTicketService",
+    "AsyncUserService"
 ]
@@ -0,0 +1,119 @@
+"""
+Variantes assíncronas do TicketService e UserService
+
+As listagens quentes (rotas async de /tech e /admin) têm implementação nativa:
+montam o select() com os mesmos critérios e opções de carregamento do serviço
+síncrono e executam com `await db.scalars(...)`, de modo que a espera pelo banco
+libera o event loop. Os demais métodos que recebem `db` ganham uma versão `async`
+que executa a implementação síncrona via AsyncSession.run_sync. Atenção: run_sync
+roda no próprio event loop (greenlet), então todo o trabalho do ORM daquele método
+bloqueia o loop; serve para chamadas raras, não para rotas quentes.
+
+Os objetos retornados não podem disparar lazy loading: use os métodos de listagem
+com `schema=` (eager loading) ou serialize dentro de `run`.
+"""
+import functools
+import inspect
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Type, TypeVar
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from app.models import Ticket, TechnicianStats, User
+from app.schemas import TicketResponse
+from app.services.pagination import PageList, page_rows, paginate_select
+from app.services.tech_stats_service import TechStatsService
+from app.services.ticket_service import TicketService
+from app.services.user_service import UserService
+
+T = TypeVar("T")
+
+
+async def run(db: AsyncSession, fn: Callable[[Session], T]) -> T:
+    """Executa `fn(session_sincrona)` na AsyncSession"""
+    return await db.run_sync(fn)
+
+
+def _async_method(method: Callable) -> Callable:
+    @functools.wraps(method)
+    async def wrapper(db: AsyncSession, *args: Any, **kwargs: Any):
+        return await db.run_sync(lambda session: method(session, *args, **kwargs))
+    return staticmethod(wrapper)
+
+
+async def _scalars(db: AsyncSession, statement: Select) -> List:
+    return list((await db.scalars(statement)).all())
+
+
+async def _tickets(db: AsyncSession, criteria, skip: int, limit: int, after_id: Optional[int], schema: Type[BaseModel]) -> PageList:
+    statement = TicketService.ticket_select(schema)
+    if criteria is not None:
+        statement = statement.where(criteria)
+    return page_rows(await _scalars(db, paginate_select(statement, Ticket.id, skip, limit, after_id)), limit)
+
+
+class _NativeTicketService:
+    """Listagens e dashboard com select() + await (sem run_sync)"""
+
+    @staticmethod
+    async def get_all_tickets(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
+        return await _tickets(db, None, skip, limit, after_id, schema)
+
+    @staticmethod
+    async def get_available_tickets_for_technician(db: AsyncSession, technician_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
+        criteria = TicketService.available_for_technician_criteria(technician_id)
+        return await _tickets(db, criteria, skip, limit, after_id, schema)
+
+    @staticmethod
+    async def get_technician_assigned_tickets(db: AsyncSession, technician_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
+        return await _tickets(db, Ticket.assigned_technician_id == technician_id, skip, limit, after_id, schema)
+
+    @staticmethod
+    async def get_available_tickets_for_tech_queue(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
+        return await _tickets(db, TicketService.tech_queue_criteria(), skip, limit, after_id, schema)
+
+    @staticmethod
+    async def get_tickets_assigned_by_admin(db: AsyncSession, technician_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
+        criteria = TicketService.assigned_by_admin_criteria(technician_id)
+        return await _tickets(db, criteria, skip, limit, after_id, schema)
+
+    @staticmethod
+    async def get_tech_dashboard_stats(db: AsyncSession, technician_id: int) -> dict:
+        stats = await db.get(TechnicianStats, technician_id)
+        if stats is None or TechStatsService.overdue_is_stale(stats, datetime.utcnow()):
+            # Primeira leitura (rebuild) ou recálculo dos atrasados: escrita rara, fica no run_sync
+            return await db.run_sync(TechStatsService.get_stats, technician_id)
+        return TechStatsService.as_dashboard(stats)
+
+
+class _NativeUserService:
+    """Listagem de usuários com select() + await (sem run_sync)"""
+
+    @staticmethod
+    async def get_all_users(db: AsyncSession, skip: int = 0, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[User]:
+        return page_rows(await _scalars(db, paginate_select(select(User), User.id, skip, limit, after_id)), limit)
+
+
+def _async_variant(service: type, name: str, native: Optional[type] = None) -> type:
+    """Cria a classe com as versões async dos métodos que recebem `db` (as de `native` têm prioridade)"""
+    namespace = {"__doc__": f"Versão assíncrona de {service.__name__}"}
+    for attr, value in vars(service).items():
+        if not isinstance(value, staticmethod):
+            continue
+        method = value.__func__
+        params = list(inspect.signature(method).parameters)
+        if params and params[0] == "db" and not inspect.isgeneratorfunction(method):
+            namespace[attr] = _async_method(method)
+        else:
+            # Funções puras (ex.: verificação de permissão) e geradores de streaming,
+            # que consomem a sessão aos poucos fora do run_sync, continuam síncronos
+            namespace[attr] = value
+    if native is not None:
+        namespace.update({attr: value for attr, value in vars(native).items() if isinstance(value, staticmethod)})
+    return type(name, (), namespace)
+
+
+AsyncTicketService = _async_variant(TicketService, "AsyncTicketService", _NativeTicketService)
+AsyncUserService = _async_variant(UserService, "AsyncUserService", _NativeUserService)
@@ -0,0 +1,78 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.models import Ticket, TicketAttachment
+
+
+class AttachmentService:
+    @staticmethod
+    def get_attachment(db: Session, ticket_id: int, stored_filename: str) -> Optional[TicketAttachment]:
+        """Busca anexo pelo nome armazenado (índice único) dentro do ticket"""
+        return db.query(TicketAttachment).filter(
+            TicketAttachment.stored_filename == stored_filename,
+            TicketAttachment.ticket_id == ticket_id
+        ).first()
+
+    @staticmethod
+    def get_attachments_by_ticket(db: Session, ticket_id: int) -> List[TicketAttachment]:
+        """Lista anexos de um ticket em ordem de envio"""
+        return db.query(TicketAttachment).filter(
+            TicketAttachment.ticket_id == ticket_id
+        ).order_by(TicketAttachment.id).all()
+
+    @staticmethod
+    def count_attachments(db: Session, ticket_id: int) -> int:
+        """Conta anexos de um ticket"""
+        return db.query(func.count(TicketAttachment.id)).filter(
+            TicketAttachment.ticket_id == ticket_id
+        ).scalar() or 0
+
+    @staticmethod
+    def add_attachment(db: Session, ticket_id: int, stored_filename: str, filename: str,
+                       size: int, content_type: Optional[str], sha256: Optional[str]) -> TicketAttachment:
+        """Insere anexo (append, sem reescrever os demais; não faz commit)"""
+        attachment = TicketAttachment(
+            ticket_id=ticket_id,
+            stored_filename=stored_filename,
+            filename=filename,
+            size=size or 0,
+            content_type=content_type or "application/octet-stream",
+            sha256=sha256
+        )
+        db.add(attachment)
+        return attachment
+
+    @staticmethod
+    def to_dict(attachment: TicketAttachment) -> dict:
+        """Formato de resposta dos endpoints de anexos"""
+        return {
+            "filename": attachment.filename,
+            "stored_filename": attachment.stored_filename,
+            "url": attachment.url,
+            "size": attachment.size,
+            "type": attachment.type,
+            "sha256": attachment.sha256
+        }
+
+    @staticmethod
+    def backfill_from_json(db: Session) -> int:
+        """Copia anexos do JSON legado (tickets.attachments) para ticket_attachments"""
+        existing = {row[0] for row in db.query(TicketAttachment.stored_filename)}
+        ticket_ids = [
+            row[0] for row in db.query(Ticket.id).filter(Ticket.legacy_attachments != None).order_by(Ticket.id)
+        ]
+        created = 0
+        for ticket_id in ticket_ids:
+            ticket = db.get(Ticket, ticket_id)
+            for att in ticket.legacy_attachments or []:
+                stored_filename = att.get("stored_filename")
+                if not stored_filename or stored_filename in existing:
+                    continue
+                AttachmentService.add_attachment(
+                    db, ticket_id, stored_filename, att.get("filename") or stored_filename,
+                    att.get("size") or 0, att.get("type"), att.get("sha256")
+                )
+                existing.add(stored_filename)
+                created += 1
+            db.commit()
+        return created
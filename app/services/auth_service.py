@@ -1,8 +1,12 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import time
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.models import User
 import os
 from dotenv import load_dotenv
@@ -26,28 +30,63 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fallback-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = get_int_env("ACCESS_TOKEN_EXPIRE_MINUTES", 30)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Backend de decodificação JWT: "jose" (padrão) ou "pyjwt" (mais rápido, requer PyJWT)
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose").lower()
+# Tokens decodificados ficam em cache (pelo SHA-256 do token) até o "exp"
+TOKEN_CACHE_SIZE = get_int_env("TOKEN_CACHE_SIZE", 10000)
+TOKEN_CACHE_MAX_TTL_SECONDS = 24 * 3600
+
+pyjwt = None
+if JWT_BACKEND == "pyjwt":
+    try:
+        import jwt as pyjwt
+    except ImportError:
+        print("⚠️ AVISO: JWT_BACKEND=pyjwt mas PyJWT não está instalado, usando python-jose")
+
+# Custo do bcrypt (2^rounds iterações). Calibre com scripts/calibrate_bcrypt.py; hashes com
+# custo diferente são refeitos no próximo login bem-sucedido (ver authenticate_user).
+BCRYPT_ROUNDS = min(max(get_int_env("BCRYPT_ROUNDS", 12), 4), 31)
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 class AuthService:
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verifica se a senha plana corresponde ao hash"""
-        # Bcrypt tem limite de 72 bytes - truncar se necessário
-        password_bytes = plain_password.encode('utf-8')
+    def _truncate_password(password: str) -> str:
+        """Bcrypt tem limite de 72 bytes - truncar se necessário"""
+        password_bytes = password.encode('utf-8')
         if len(password_bytes) > 72:
-            password_bytes = password_bytes[:72]
-            plain_password = password_bytes.decode('utf-8', errors='ignore')
-        return pwd_context.verify(plain_password, hashed_password)
+            password = password_bytes[:72].decode('utf-8', errors='ignore')
+        return password
+
+    @staticmethod
+    def verify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verifica se a senha plana corresponde ao hash (no pool de bcrypt, bloqueando a thread)"""
+        from app.services.password_hasher import password_hasher
+        return password_hasher.verify(AuthService._truncate_password(plain_password), hashed_password)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
-        """Gera hash da senha"""
-        # Bcrypt tem limite de 72 bytes - truncar se necessário
-        password_bytes = password.encode('utf-8')
-        if len(password_bytes) > 72:
-            password_bytes = password_bytes[:72]
-            password = password_bytes.decode('utf-8', errors='ignore')
-        return pwd_context.hash(password)
+        """Gera hash da senha (no pool de bcrypt, bloqueando a thread)"""
+        from app.services.password_hasher import password_hasher
+        return password_hasher.hash(AuthService._truncate_password(password))
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Como verify_password, mas aguarda o pool de bcrypt sem ocupar thread (rotas async)"""
+        from app.services.password_hasher import password_hasher
+        return await password_hasher.verify_async(AuthService._truncate_password(plain_password), hashed_password)
+
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Como get_password_hash, mas aguarda o pool de bcrypt sem ocupar thread (rotas async)"""
+        from app.services.password_hasher import password_hasher
+        return await password_hasher.hash_async(AuthService._truncate_password(password))
 
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -59,27 +98,68 @@ class AuthService:
 
     @staticmethod
     def decode_token(token: str) -> dict:
-        """Decodifica token JWT"""
+        """Decodifica token JWT (verifica a assinatura só na primeira vez que o token é visto)"""
+        from app.services.token_cache import token_cache
+        digest = hashlib.sha256(token.encode()).digest()
+        payload = token_cache.get(digest)
+        if payload is not None:
+            return dict(payload)
+        payload = AuthService._decode_jwt(token)
+        if payload is None:
+            return None
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            token_cache.put(digest, payload, exp - time.time())
+        return dict(payload)
+
+    @staticmethod
+    def _decode_jwt(token: str) -> Optional[dict]:
+        """Verificação completa (assinatura + exp) no backend configurado"""
+        if pyjwt is not None:
+            try:
+                return pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            except pyjwt.PyJWTError:
+                return None
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            return payload
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         except JWTError:
             return None
 
     @staticmethod
-    def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-        """Autentica usuário por username e senha"""
+    async def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+        """
+        Autentica usuário por username e senha
+
+        As consultas vão para o threadpool e o bcrypt é aguardado com await: durante a
+        verificação nenhuma thread do servidor fica presa.
+        """
         from app.services.user_service import UserService
-        user = UserService.get_user_by_username(db, username)
+        user = await run_in_threadpool(UserService.get_user_by_username, db, username)
         if not user:
             return None
-        if not AuthService.verify_password(password, user.hashed_password):
+        if not await AuthService.verify_password_async(password, user.hashed_password):
             return None
+        await AuthService.rehash_if_needed(db, user, password)
         return user
 
     @staticmethod
-    def get_current_user_from_token(db: Session, token: str) -> Optional[User]:
-        """Obtém usuário atual a partir do token"""
+    async def rehash_if_needed(db: Session, user: User, password: str) -> bool:
+        """Refaz o hash com o custo atual se o armazenado usa outro custo/esquema"""
+        if not pwd_context.needs_update(user.hashed_password):
+            return False
+        from app.services.password_hasher import PasswordHashQueueFull
+        from app.services.user_service import UserService
+        try:
+            new_hash = await AuthService.get_password_hash_async(password)
+        except PasswordHashQueueFull:
+            # Pool cheio: o login segue e a atualização fica para o próximo
+            return False
+        await run_in_threadpool(UserService.update_user_password, db, user.id, new_hash)
+        return True
+
+    @staticmethod
+    def _token_claims(token: str) -> Optional[tuple]:
+        """(user_id, sid) do token válido, ou None"""
         payload = AuthService.decode_token(token)
         if not payload:
             return None
@@ -88,19 +168,73 @@ class AuthService:
         user_id: int = payload.get("user_id")
         if username is None or user_id is None:
             return None
+        return user_id, payload.get("sid")
 
-        from app.services.user_service import UserService
-        user = UserService.get_user_by_id(db, user_id)
-        if user is None:
-            return None
-        
+    @staticmethod
+    def _authorized(user):
+        """Devolve o Principal se ele pode usar a API, senão None"""
         # Verificar se o usuário está ativo
         if not user.is_active:
             return None
         
         # Verificar se técnicos estão aprovados
-        role_str = str(user.role.value) if hasattr(user.role, 'value') else str(user.role)
-        if role_str == "technician" and not user.is_approved:
+        if user.role.value == "technician" and not user.is_approved:
             return None
         
         return user
+
+    @staticmethod
+    def get_current_user_from_token(db: Session, token: str):
+        """
+        Obtém o usuário atual (Principal) a partir do token
+
+        Consulta o banco apenas quando o usuário não está no principal_cache.
+        """
+        claims = AuthService._token_claims(token)
+        if claims is None:
+            return None
+        user_id, session_id = claims
+
+        # Sessão revogada (logout/reutilização de refresh token): checagem em memória
+        if session_id:
+            from app.services.refresh_token_service import revoked_sessions
+            revoked_sessions.maybe_sync(db)
+            if revoked_sessions.is_revoked(session_id):
+                return None
+
+        from app.services.principal_cache import Principal, principal_cache
+        user = principal_cache.get(user_id)
+        if user is None:
+            from app.services.user_service import UserService
+            db_user = UserService.get_user_by_id(db, user_id)
+            if db_user is None:
+                return None
+            user = Principal.from_user(db_user)
+            principal_cache.put(user.id, user)
+        
+        return AuthService._authorized(user)
+
+    @staticmethod
+    async def get_current_user_from_token_async(db: AsyncSession, token: str):
+        """Como get_current_user_from_token, com AsyncSession (rotas async, sem threadpool)"""
+        claims = AuthService._token_claims(token)
+        if claims is None:
+            return None
+        user_id, session_id = claims
+
+        if session_id:
+            from app.services.refresh_token_service import revoked_sessions
+            await revoked_sessions.maybe_sync_async(db)
+            if revoked_sessions.is_revoked(session_id):
+                return None
+
+        from app.services.principal_cache import Principal, principal_cache
+        user = principal_cache.get(user_id)
+        if user is None:
+            db_user = await db.get(User, user_id)
+            if db_user is None:
+                return None
+            user = Principal.from_user(db_user)
+            principal_cache.put(user.id, user)
+
+        return AuthService._authorized(user)
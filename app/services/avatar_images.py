@@ -0,0 +1,116 @@
+"""
+Pipeline de imagens de avatar: decodifica o upload, remove metadados (EXIF/GPS) e grava
+o avatar reprocessado em WebP (até AVATAR_MAX_SIZE px) mais miniaturas quadradas para
+cada tamanho de AVATAR_THUMBNAIL_SIZES. O arquivo enviado nunca é publicado.
+
+A decodificação/redimensionamento é CPU-bound e roda num ProcessPoolExecutor, então
+não ocupa o event loop nem o threadpool que atende as requisições.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from uuid import uuid4
+from PIL import Image, ImageOps
+from app.models.models import AVATAR_THUMBNAIL_SIZES
+from app.services.auth_service import get_int_env
+
+AVATAR_PROCESS_WORKERS = get_int_env("AVATAR_PROCESS_WORKERS", 2)
+WEBP_QUALITY = 80
+# Maior lado do avatar publicado (a imagem original é reduzida, nunca ampliada)
+AVATAR_MAX_SIZE = 1024
+# Limite de pixels para recusar "bombas de descompressão" (5MB comprimidos podem virar GBs)
+MAX_IMAGE_PIXELS = 40_000_000
+# Sem fork: o pool nasce com o servidor já cheio de threads (ver password_hasher.POOL_MP_CONTEXT)
+POOL_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class InvalidImageError(ValueError):
+    """Upload não pôde ser decodificado como imagem"""
+
+
+def thumbnail_path(source: Path, size: int) -> Path:
+    return source.with_name(f"{source.stem}-{size}.webp")
+
+
+def _decode(source: Path) -> Image.Image:
+    """Decodifica só os pixels (orientação do EXIF aplicada; metadados descartados)"""
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        with Image.open(source) as image:
+            image.seek(0)  # GIF/WebP animado: primeiro quadro
+            image = ImageOps.exif_transpose(image)
+            return image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise InvalidImageError(str(e)) from e
+
+
+def _save_webp(image: Image.Image, dest: Path) -> None:
+    """Grava num temporário e renomeia, então o arquivo nunca fica parcial"""
+    tmp = dest.with_name(f".{dest.name}.{uuid4().hex}.part")
+    image.save(tmp, "WEBP", quality=WEBP_QUALITY, method=4)
+    os.replace(tmp, dest)
+
+
+def _write_thumbnails(image: Image.Image, source_path: Path) -> Dict[int, str]:
+    generated = {}
+    for size in sorted(AVATAR_THUMBNAIL_SIZES, reverse=True):
+        dest = thumbnail_path(source_path, size)
+        _save_webp(ImageOps.fit(image, (size, size), method=Image.LANCZOS), dest)
+        generated[size] = str(dest)
+    return generated
+
+
+def render_avatar(upload: str, dest: str) -> Dict[int, str]:
+    """
+    Reprocessa o upload em `dest` (WebP, até AVATAR_MAX_SIZE px) e gera as miniaturas ao
+    lado dele (executa no processo worker). Só os pixels são regravados: EXIF (inclusive
+    GPS), ICC e demais metadados do arquivo enviado não chegam a nenhum arquivo publicado.
+    """
+    image = _decode(Path(upload))
+    dest_path = Path(dest)
+    avatar = image.copy()
+    avatar.thumbnail((AVATAR_MAX_SIZE, AVATAR_MAX_SIZE), Image.LANCZOS)
+    _save_webp(avatar, dest_path)
+    return _write_thumbnails(image, dest_path)
+
+
+def render_thumbnails(source: str) -> Dict[int, str]:
+    """Gera (ou refaz) só as miniaturas de um avatar já reprocessado (executa no processo worker)"""
+    source_path = Path(source)
+    return _write_thumbnails(_decode(source_path), source_path)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Pool de processos criado sob demanda (um por worker do servidor)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(AVATAR_PROCESS_WORKERS, 1), mp_context=POOL_MP_CONTEXT)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def process_avatar(upload: Path, dest: Path) -> Dict[int, str]:
+    """Gera avatar sem metadados e miniaturas no pool de processos (InvalidImageError se não for imagem)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), render_avatar, str(upload), str(dest))
+
+
+def delete_thumbnails(source: Path) -> None:
+    for size in AVATAR_THUMBNAIL_SIZES:
+        try:
+            thumbnail_path(source, size).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,148 @@
+"""
+Armazenamento de anexos endereçado por conteúdo (SHA-256) com contagem de referências
+
+Cada conteúdo distinto é gravado uma única vez em
+static/attachments/blobs/<aa>/<bb>/<sha256>; os anexos dos tickets apontam para o blob
+pelo hash. O arquivo físico só é removido quando a última referência é liberada.
+
+Ordem que evita apagar um blob em uso por outra requisição:
+- upload: a referência é incrementada e confirmada (commit) ANTES de o arquivo ser
+  colocado no caminho do blob;
+- remoção: o registro com ref_count = 0 é apagado com DELETE condicional (que trava a
+  linha até o commit) e o arquivo é removido ainda dentro dessa transação. Um upload
+  concorrente do mesmo conteúdo espera o lock e recria o registro depois; sem registro,
+  nada é apagado.
+"""
+import os
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models import AttachmentBlob
+from app.services.file_storage import StoredFile, save_upload
+
+ATTACHMENT_DIR = Path("static/attachments")
+BLOB_DIR = ATTACHMENT_DIR / "blobs"
+STAGING_DIR = ATTACHMENT_DIR / "tmp"
+
+
+class BlobStore:
+    @staticmethod
+    def blob_path(sha256: str) -> Path:
+        """Caminho físico do blob (diretórios fragmentados pelos 4 primeiros dígitos)"""
+        return BLOB_DIR / sha256[:2] / sha256[2:4] / sha256
+
+    @staticmethod
+    def place_file(source: Path, sha256: str) -> Path:
+        """
+        Move um arquivo já hasheado para o blob store (conteúdo idêntico é sobrescrito
+        atomicamente). Só chame com a referência do blob já confirmada no banco.
+        """
+        dest = BlobStore.blob_path(sha256)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, dest)
+        return dest
+
+    @staticmethod
+    def reserve(db: Session, sha256: str, size: int) -> None:
+        """Incrementa a referência do blob e confirma (commit) antes de o arquivo ser colocado"""
+        try:
+            BlobStore.add_ref(db, sha256, size)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def release_and_purge(db: Session, sha256: str) -> None:
+        """Desfaz uma reserva (upload que falhou depois do reserve) e remove o blob se ficou sem uso"""
+        try:
+            BlobStore.release(db, sha256)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        BlobStore.purge_unreferenced(db, sha256)
+
+    @staticmethod
+    async def store_upload(db: Session, file: UploadFile, max_size: int) -> StoredFile:
+        """
+        Grava o upload em streaming, reserva a referência do blob do seu hash e só então
+        move o arquivo para o blob. Em caso de sucesso o chamador fica com uma referência
+        (conte-a no anexo ou libere com release_and_purge).
+        """
+        STAGING_DIR.mkdir(parents=True, exist_ok=True)
+        staged = await save_upload(file, STAGING_DIR / uuid4().hex, max_size)
+        try:
+            await run_in_threadpool(BlobStore.reserve, db, staged.sha256, staged.size)
+        except BaseException:
+            await run_in_threadpool(staged.path.unlink, True)
+            raise
+        try:
+            path = await run_in_threadpool(BlobStore.place_file, staged.path, staged.sha256)
+        except BaseException:
+            await run_in_threadpool(staged.path.unlink, True)
+            await run_in_threadpool(BlobStore.release_and_purge, db, staged.sha256)
+            raise
+        return StoredFile(path, staged.size, staged.sha256)
+
+    @staticmethod
+    def add_ref(db: Session, sha256: str, size: int) -> None:
+        """Incrementa a referência do blob, criando o registro se necessário (não faz commit)"""
+        increment = {AttachmentBlob.ref_count: AttachmentBlob.ref_count + 1}
+        if db.query(AttachmentBlob).filter(AttachmentBlob.sha256 == sha256).update(increment, synchronize_session=False):
+            return
+        try:
+            with db.begin_nested():
+                db.add(AttachmentBlob(sha256=sha256, size=size, ref_count=1))
+        except IntegrityError:
+            # Outro upload do mesmo conteúdo criou o registro primeiro
+            db.query(AttachmentBlob).filter(AttachmentBlob.sha256 == sha256).update(increment, synchronize_session=False)
+
+    @staticmethod
+    def release(db: Session, sha256: Optional[str]) -> None:
+        """Libera uma referência do blob (não faz commit; use purge_unreferenced depois)"""
+        if not sha256:
+            return
+        db.query(AttachmentBlob).filter(
+            AttachmentBlob.sha256 == sha256, AttachmentBlob.ref_count > 0
+        ).update({AttachmentBlob.ref_count: AttachmentBlob.ref_count - 1}, synchronize_session=False)
+
+    @staticmethod
+    def purge_unreferenced(db: Session, sha256: Optional[str]) -> bool:
+        """
+        Remove registro e arquivo do blob se não houver mais referências (chame após o
+        commit que liberou a referência). Sem registro não apaga nada: o arquivo pode
+        pertencer a um upload em andamento.
+        """
+        if not sha256:
+            return False
+        try:
+            # DELETE condicional: decide e trava a linha no mesmo comando (sem janela entre
+            # ler ref_count e apagar); o lock segue até o commit, depois do unlink
+            deleted = db.query(AttachmentBlob).filter(
+                AttachmentBlob.sha256 == sha256, AttachmentBlob.ref_count <= 0
+            ).delete(synchronize_session=False)
+            if deleted:
+                try:
+                    BlobStore.blob_path(sha256).unlink()
+                except FileNotFoundError:
+                    pass
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Erro ao deletar blob {sha256}: {e}")
+            return False
+        return bool(deleted)
+
+    @staticmethod
+    def resolve_path(sha256: Optional[str], stored_filename: str) -> Path:
+        """Caminho físico de um anexo (blob por hash ou arquivo legado por stored_filename)"""
+        if sha256:
+            path = BlobStore.blob_path(sha256)
+            if path.exists():
+                return path
+        return ATTACHMENT_DIR / stored_filename
@@ -0,0 +1,74 @@
+"""
+Gravação de uploads em streaming, fora do event loop
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import NamedTuple
+from uuid import uuid4
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 256 * 1024  # 256KB
+
+
+class FileTooLargeError(ValueError):
+    """Upload excedeu o tamanho máximo durante o streaming"""
+
+
+class StoredFile(NamedTuple):
+    path: Path
+    size: int
+    sha256: str
+
+
+def _open_for_write(path: Path):
+    return path.open("wb")
+
+
+def _discard(path: Path) -> None:
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(file: UploadFile, dest: Path, max_size: int) -> StoredFile:
+    """
+    Grava o UploadFile em `dest` lendo em chunks, calculando o SHA-256 no caminho
+    e validando `max_size` pelo número real de bytes (não pelo `file.size` declarado).
+
+    Leituras usam a API async do UploadFile; escritas rodam no threadpool. O arquivo
+    é gravado num temporário e renomeado no final, então `dest` nunca fica parcial.
+    """
+    tmp_path = dest.with_name(f".{dest.name}.{uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    buffer = await run_in_threadpool(_open_for_write, tmp_path)
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise FileTooLargeError(f"Arquivo {file.filename} excede {max_size // (1024 * 1024)}MB")
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.replace, tmp_path, dest)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_discard, tmp_path)
+        raise
+    return StoredFile(dest, size, digest.hexdigest())
+
+
+async def delete_file(path: Path) -> bool:
+    """Remove o arquivo no threadpool (False se não existia)"""
+    def _unlink() -> bool:
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+    return await run_in_threadpool(_unlink)
@@ -0,0 +1,190 @@
+"""
+Respostas de arquivo com cache HTTP: ETag forte, GET condicional (304) e Range (206)
+
+Usado no download de anexos (ETag = SHA-256 do blob) e no mount /static, onde avatares
+com nome endereçado por conteúdo recebem Cache-Control imutável.
+"""
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.types import Scope
+
+CHUNK_SIZE = 256 * 1024  # 256KB
+
+# Conteúdo nunca muda para a mesma URL (nome contém o hash)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Sempre revalida com o servidor (respondido com 304 quando não mudou)
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+# Avatares gravados como <user_id>-<sha256>.<ext> e miniaturas <user_id>-<sha256>-<tamanho>.webp
+CONTENT_ADDRESSED_NAME = re.compile(r"^\d+-(?P<sha256>[0-9a-f]{64})(?P<variant>-\d+)?\.[a-z0-9]+$")
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def strong_etag(sha256: str) -> str:
+    return f'"{sha256}"'
+
+
+def stat_etag(stat_result: os.stat_result) -> str:
+    """ETag fraca para arquivos sem hash conhecido (tamanho + mtime)"""
+    return f'W/"{stat_result.st_size:x}-{int(stat_result.st_mtime):x}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110 13.1.2)"""
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """If-None-Match tem precedência; If-Modified-Since só é avaliado sem ele"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Intervalo único `bytes=início-fim` (inclusivo). Retorna None para cabeçalho ausente,
+    inválido ou com múltiplos intervalos (serve o arquivo inteiro, como permite a RFC);
+    ValueError quando o intervalo não é satisfazível.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Sufixo: últimos N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("intervalo vazio")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("intervalo fora do arquivo")
+    return start, end
+
+
+def _iter_file(path: Path, start: int, end: int) -> Iterator[bytes]:
+    # Iterador síncrono: o StreamingResponse o consome no threadpool
+    with path.open("rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _content_disposition(filename: str) -> str:
+    # Mesmo formato do FileResponse, para o cliente retomar com o mesmo nome
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def cached_file_response(
+    request: Request,
+    path: Path,
+    etag: Optional[str] = None,
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    cache_control: str = REVALIDATE_CACHE_CONTROL,
+    stat_result: Optional[os.stat_result] = None,
+) -> Response:
+    """
+    Serve `path` respeitando If-None-Match/If-Modified-Since (304), Range/If-Range (206/416)
+    e os cabeçalhos de cache informados
+    """
+    stat_result = stat_result or os.stat(path)
+    size = stat_result.st_size
+    etag = etag or stat_etag(stat_result)
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+    }
+
+    if is_not_modified(request, etag, stat_result.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    # If-Range: só honra o Range se a versão do cliente ainda for a atual (ETag forte)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range is not None and (etag.startswith("W/") or if_range.strip() != etag):
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return FileResponse(
+            path=path, filename=filename, media_type=media_type, headers=headers, stat_result=stat_result
+        )
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    headers["content-length"] = str(end - start + 1)
+    if filename:
+        headers["content-disposition"] = _content_disposition(filename)
+    return StreamingResponse(
+        _iter_file(path, start, end),
+        status_code=206,
+        media_type=media_type or mimetypes.guess_type(str(path))[0] or "application/octet-stream",
+        headers=headers
+    )
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles com as mesmas regras de cache dos downloads: arquivos com nome endereçado
+    por conteúdo (avatares) usam o hash como ETag forte e Cache-Control imutável
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        if status_code != 200:
+            # Página 404/HTML customizada: comportamento padrão
+            return super().file_response(full_path, stat_result, scope, status_code)
+        match = CONTENT_ADDRESSED_NAME.match(Path(full_path).name)
+        if match:
+            etag = strong_etag(match.group("sha256") + (match.group("variant") or ""))
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            etag, cache_control = stat_etag(stat_result), REVALIDATE_CACHE_CONTROL
+        return cached_file_response(
+            Request(scope), Path(full_path), etag=etag, cache_control=cache_control, stat_result=stat_result
+        )
@@ -0,0 +1,162 @@
+"""
+Métricas em processo (contadores e histogramas de latência)
+
+RequestMetrics guarda as métricas HTTP coletadas pelo MetricsMiddleware
+(app/services/request_metrics.py) e as exporta no formato texto do Prometheus (/metrics).
+"""
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Limites superiores dos buckets em milissegundos
+DEFAULT_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Limites superiores dos buckets de tamanho de resposta em bytes
+DEFAULT_SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Histograma cumulativo de valores (formato dos buckets do Prometheus)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def cumulative(self) -> Tuple[List[int], float, int]:
+        """(contagens cumulativas por bucket, com +Inf no fim; soma; total)"""
+        with self._lock:
+            counts, total_sum, count = list(self._counts), self._sum, self._count
+        cumulative, running = [], 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total_sum, count
+
+
+class LatencyHistogram(Histogram):
+    """Histograma de latências: observa segundos, guarda em milissegundos"""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        super().__init__(buckets_ms)
+        self.buckets_ms = self.buckets
+
+    def observe(self, seconds: float) -> None:
+        super().observe(seconds * 1000)
+
+    def snapshot(self) -> dict:
+        cumulative, sum_ms, count = self.cumulative()
+        buckets = {str(bound): value for bound, value in zip(self.buckets_ms, cumulative)}
+        buckets["+Inf"] = cumulative[-1]
+        return {
+            "count": count,
+            "sum_ms": round(sum_ms, 3),
+            "avg_ms": round(sum_ms / count, 3) if count else 0.0,
+            "buckets_ms": buckets
+        }
+
+
+def _label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_label_value(value)}"' for name, value in labels.items())
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram, scale: float = 1.0) -> List[str]:
+    """Linhas _bucket/_sum/_count; `scale` converte a unidade interna (ex.: ms -> s)"""
+    cumulative, total_sum, count = histogram.cumulative()
+    prefix = f"{labels}," if labels else ""
+    lines = [
+        f'{name}_bucket{{{prefix}le="{_format_number(bound * scale)}"}} {value}'
+        for bound, value in zip(histogram.buckets, cumulative)
+    ]
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative[-1]}')
+    lines.append(f"{name}_sum{{{labels}}} {_format_number(total_sum * scale)}")
+    lines.append(f"{name}_count{{{labels}}} {count}")
+    return lines
+
+
+class RequestMetrics:
+    """
+    Métricas HTTP por rota: latência, tamanho da resposta, contagem por status e
+    requisições em andamento. A rota é o template (ex.: /tickets/{ticket_id}), nunca o
+    caminho bruto, para que o número de séries fique limitado às rotas declaradas.
+    """
+
+    def __init__(self):
+        self._latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._size: Dict[Tuple[str, str], Histogram] = {}
+        self._status: Dict[Tuple[str, str, int], int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def request_started(self, method: str) -> None:
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def request_finished(self, method: str, route: str, status_code: int, seconds: float, size: int) -> None:
+        key = (method, route)
+        with self._lock:
+            self._in_flight[method] -= 1
+            status_key = (method, route, status_code)
+            self._status[status_key] = self._status.get(status_key, 0) + 1
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = LatencyHistogram()
+                self._size[key] = Histogram(DEFAULT_SIZE_BUCKETS_BYTES)
+            size_histogram = self._size[key]
+        latency.observe(seconds)
+        size_histogram.observe(size)
+
+    def render_prometheus(self) -> str:
+        """Exposição no formato texto do Prometheus (version 0.0.4)"""
+        with self._lock:
+            latency = sorted(self._latency.items())
+            sizes = sorted(self._size.items())
+            status = sorted(self._status.items())
+            in_flight = sorted(self._in_flight.items())
+
+        lines = [
+            "# HELP http_requests_total Requisições HTTP concluídas por rota e status.",
+            "# TYPE http_requests_total counter",
+        ]
+        lines += [
+            f"http_requests_total{{{_labels(method=method, route=route, status=str(code))}}} {count}"
+            for (method, route, code), count in status
+        ]
+        lines += [
+            "# HELP http_requests_in_flight Requisições HTTP em andamento.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        lines += [f"http_requests_in_flight{{{_labels(method=method)}}} {count}" for method, count in in_flight]
+        lines += [
+            "# HELP http_request_duration_seconds Latência das requisições HTTP por rota.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in latency:
+            lines += _histogram_lines("http_request_duration_seconds", _labels(method=method, route=route), histogram, 0.001)
+        lines += [
+            "# HELP http_response_size_bytes Tamanho do corpo das respostas HTTP por rota.",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for (method, route), histogram in sizes:
+            lines += _histogram_lines("http_response_size_bytes", _labels(method=method, route=route), histogram)
+        return "\n".join(lines) + "\n"
+
+
+# Instância do processo (cada worker do uvicorn expõe as próprias métricas)
+request_metrics = RequestMetrics()
@@ -0,0 +1,86 @@
+"""
+Paginação de listagens: offset (legado) ou keyset por cursor opaco
+"""
+import base64
+import json
+from typing import Callable, Iterable, Iterator, List, Optional
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import Select
+
+DEFAULT_PAGE_SIZE = 100
+# Linhas por lote nas listagens em streaming (cursor no servidor)
+STREAM_BATCH_SIZE = 500
+
+
+class PageList(list):
+    """Itens de uma página; has_more indica se a consulta tinha mais linhas depois dela"""
+
+    def __init__(self, items: Iterable = (), has_more: bool = False):
+        super().__init__(items)
+        self.has_more = has_more
+
+    def map(self, fn: Callable) -> "PageList":
+        """Converte os itens (ex.: schema.from_orm) mantendo has_more"""
+        return PageList((fn(item) for item in self), self.has_more)
+
+
+def page_rows(rows: List, limit: Optional[int]) -> PageList:
+    """Corta a linha extra pedida por paginate_query/paginate_select (limit + 1)"""
+    if limit is None or len(rows) <= limit:
+        return PageList(rows)
+    return PageList(rows[:limit], has_more=True)
+
+
+def paginate_query(query: Query, key_column, skip: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE, after_id: Optional[int] = None) -> PageList:
+    """Aplica ORDER BY na chave e pagina por offset (skip) ou keyset (after_id)"""
+    query = query.order_by(key_column)
+    if after_id is not None:
+        # Keyset: usa o índice da chave em vez de percorrer e descartar `skip` linhas
+        query = query.filter(key_column > after_id)
+    elif skip:
+        query = query.offset(skip)
+    if limit is not None:
+        # Uma linha a mais só para saber se existe próxima página
+        query = query.limit(limit + 1)
+    return page_rows(query.all(), limit)
+
+
+def paginate_select(statement: Select, key_column, skip: int = 0, limit: Optional[int] = DEFAULT_PAGE_SIZE, after_id: Optional[int] = None) -> Select:
+    """Como paginate_query, mas monta o SELECT (para executar com AsyncSession); passe as linhas por page_rows"""
+    statement = statement.order_by(key_column)
+    if after_id is not None:
+        statement = statement.where(key_column > after_id)
+    elif skip:
+        statement = statement.offset(skip)
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+    return statement
+
+
+def stream_query(db: Session, statement: Select, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List]:
+    """
+    Percorre o SELECT em lotes de `batch_size` objetos, sem carregar o resultado inteiro.
+
+    yield_per usa cursor no servidor (stream_results) no PostgreSQL. Cada lote é tirado
+    do identity map quando o consumidor pede o próximo, então serialize o lote antes.
+    """
+    result = db.scalars(statement.execution_options(yield_per=batch_size))
+    for batch in result.partitions():
+        yield batch
+        db.expunge_all()
+
+
+def encode_cursor(last_id: int) -> str:
+    """Gera cursor opaco a partir da chave do último item da página"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decodifica cursor gerado por encode_cursor (ValueError se inválido)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(data["id"])
+    except Exception:
+        raise ValueError("Cursor inválido")
@@ -0,0 +1,170 @@
+"""
+Pool dedicado para hash/verificação de senha (bcrypt)
+
+bcrypt é propositalmente lento (~100ms+ por operação). Rodando nas rotas síncronas, uma
+rajada de logins ocupa o threadpool inteiro e as demais rotas esperam na fila. Aqui o
+trabalho vai para um ProcessPoolExecutor de tamanho fixo e o número de operações em
+andamento é limitado: acima de PASSWORD_HASH_MAX_PENDING a requisição falha na hora com
+PasswordHashQueueFull (429).
+
+Login e registro (rotas async) usam hash_async/verify_async: a espera pelo pool é um
+await no event loop e não segura thread nenhuma. As chamadas síncronas (troca de senha,
+reset pelo admin) bloqueiam uma thread do threadpool cada; essas ficam limitadas a
+PASSWORD_HASH_MAX_BLOCKING (padrão workers * 2) para não esgotar as ~40 threads do servidor.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional
+from app.services.auth_service import get_int_env
+from app.services.metrics import LatencyHistogram
+
+PASSWORD_HASH_WORKERS = get_int_env("PASSWORD_HASH_WORKERS", min(os.cpu_count() or 2, 4))
+PASSWORD_HASH_MAX_PENDING = get_int_env("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_WORKERS * 8)
+PASSWORD_HASH_MAX_BLOCKING = get_int_env("PASSWORD_HASH_MAX_BLOCKING", PASSWORD_HASH_WORKERS * 2)
+# "process" (padrão) ou "thread" (ambientes sem fork/multiprocessing)
+PASSWORD_HASH_POOL = os.getenv("PASSWORD_HASH_POOL", "process").lower()
+# O pool é criado sob demanda, com o servidor já rodando threads (threadpool, QueueListener
+# do logging): um fork nesse estado pode herdar um lock travado. forkserver/spawn começam
+# de um processo limpo.
+POOL_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class PasswordHashQueueFull(Exception):
+    """Fila de hash de senha cheia (o handler responde 429)"""
+
+
+def _hash(password: str) -> str:
+    from app.services.auth_service import pwd_context
+    return pwd_context.hash(password)
+
+
+def _hash_many(passwords: List[str]) -> List[str]:
+    from app.services.auth_service import pwd_context
+    return [pwd_context.hash(password) for password in passwords]
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    from app.services.auth_service import pwd_context
+    return pwd_context.verify(password, hashed_password)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, pool: str = "process", max_blocking: Optional[int] = None):
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, 1)
+        self.max_blocking = max(max_blocking if max_blocking is not None else self.workers * 2, 1)
+        self.pool = pool
+        self.latency = LatencyHistogram()
+        self.rejected = 0
+        self._pending = 0
+        self._blocking = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.pool == "thread":
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+                else:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=POOL_MP_CONTEXT)
+            return self._executor
+
+    def _admit(self, blocking: bool) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending or (blocking and self._blocking >= self.max_blocking):
+                self.rejected += 1
+                raise PasswordHashQueueFull()
+            self._pending += 1
+            if blocking:
+                self._blocking += 1
+
+    def _finish(self, start: float, blocking: bool) -> None:
+        # Latência vista pela requisição: espera na fila + bcrypt
+        self.latency.observe(time.perf_counter() - start)
+        with self._lock:
+            self._pending -= 1
+            if blocking:
+                self._blocking -= 1
+
+    def _run(self, fn: Callable, *args):
+        """Execução síncrona: a thread chamadora fica bloqueada até o resultado"""
+        self._admit(blocking=True)
+        start = time.perf_counter()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._finish(start, blocking=True)
+
+    async def _run_async(self, fn: Callable, *args):
+        """Execução com await: nenhuma thread do servidor fica esperando pelo pool"""
+        self._admit(blocking=False)
+        start = time.perf_counter()
+        try:
+            # Se a requisição for cancelada, a tarefa ainda na fila do pool é cancelada junto
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            self._finish(start, blocking=False)
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(_verify, password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(_hash, password)
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return await self._run_async(_verify, password, hashed_password)
+
+    def hash_many(self, passwords: List[str], chunksize: int = 16) -> List[str]:
+        """
+        Hash em lote (importação de usuários), na ordem de entrada.
+        As senhas vão em blocos de `chunksize` por tarefa e no máximo workers - 1 blocos ficam
+        em andamento, deixando um worker livre para os logins. Não conta em max_pending.
+        """
+        executor = self._get_executor()
+        slots = threading.BoundedSemaphore(max(self.workers - 1, 1))
+        futures = []
+        try:
+            for i in range(0, len(passwords), chunksize):
+                slots.acquire()
+                future = executor.submit(_hash_many, passwords[i:i + chunksize])
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+            return [hashed for future in futures for hashed in future.result()]
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending, blocking = self._pending, self._blocking
+        return {
+            "pool": self.pool,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "max_blocking": self.max_blocking,
+            "pending": pending,
+            "blocking": blocking,
+            "rejected": self.rejected,
+            "latency": self.latency.snapshot()
+        }
+
+
+password_hasher = PasswordHasher(
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_POOL, PASSWORD_HASH_MAX_BLOCKING
+)
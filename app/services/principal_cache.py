@@ -0,0 +1,33 @@
+"""
+Cache em processo do usuário autenticado (principal), com TTL e descarte LRU
+
+get_current_user só precisa de id/role/flags para autorizar a requisição; com o cache,
+requisições autenticadas deixam de consultar a tabela users enquanto a entrada é válida.
+As alterações feitas por UserService invalidam a entrada na hora; o TTL limita quanto
+tempo outros workers (que têm o próprio cache) podem enxergar dados antigos.
+"""
+from typing import NamedTuple, Optional
+from app.models import User, RoleEnum
+from app.services.auth_service import get_int_env
+from app.services.ttl_cache import TTLCache
+
+PRINCIPAL_CACHE_TTL_SECONDS = get_int_env("PRINCIPAL_CACHE_TTL_SECONDS", 60)
+PRINCIPAL_CACHE_SIZE = get_int_env("PRINCIPAL_CACHE_SIZE", 10000)
+
+
+class Principal(NamedTuple):
+    """Dados imutáveis do usuário autenticado usados na autorização"""
+    id: int
+    username: str
+    role: RoleEnum
+    is_active: bool
+    is_approved: bool
+    full_name: Optional[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        role = user.role if isinstance(user.role, RoleEnum) else RoleEnum(user.role)
+        return cls(user.id, user.username, role, bool(user.is_active), bool(user.is_approved), user.full_name)
+
+
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
@@ -0,0 +1,167 @@
+"""
+Refresh tokens com rotação e revogação de sessão
+
+Cada login abre uma sessão (família); o access token carrega o id da família no claim
+"sid". /token/refresh troca o refresh token por um novo (o anterior fica marcado como
+rotacionado); apresentar de novo um token já rotacionado indica vazamento e revoga a
+família inteira. Sessões revogadas ficam num conjunto em memória consultado por
+get_current_user, sincronizado com o banco no máximo a cada REVOCATION_SYNC_SECONDS.
+"""
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+from uuid import uuid4
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import RefreshToken, User
+from app.services.auth_service import ACCESS_TOKEN_EXPIRE_MINUTES, get_int_env
+
+REFRESH_TOKEN_EXPIRE_DAYS = get_int_env("REFRESH_TOKEN_EXPIRE_DAYS", 30)
+REVOCATION_SYNC_SECONDS = get_int_env("REVOCATION_SYNC_SECONDS", 30)
+
+
+class IssuedRefreshToken(NamedTuple):
+    token: str
+    family_id: str
+    expires_at: datetime
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevokedSessions:
+    """
+    Conjunto de sessões (sid) revogadas, mantido até o último access token delas vencer.
+    Revogações de outros workers chegam pela sincronização periódica com refresh_tokens.
+    """
+
+    def __init__(self, retention_seconds: int, sync_seconds: int):
+        self.retention_seconds = retention_seconds
+        self.sync_seconds = sync_seconds
+        self._revoked: Dict[str, float] = {}
+        self._last_sync = float("-inf")
+        self._lock = threading.Lock()
+
+    def revoke(self, family_id: str) -> None:
+        with self._lock:
+            self._revoked[family_id] = time.monotonic() + self.retention_seconds
+
+    def is_revoked(self, family_id: str) -> bool:
+        with self._lock:
+            expires = self._revoked.get(family_id)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._revoked[family_id]
+                return False
+            return True
+
+    def _claim_sync(self) -> Optional[float]:
+        """Marca o início de uma sincronização; None se a última foi há menos de sync_seconds"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sync < self.sync_seconds:
+                return None
+            self._last_sync = now
+        return now
+
+    def _statement(self):
+        since = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        return select(RefreshToken.family_id, RefreshToken.revoked_at).where(
+            RefreshToken.revoked_at >= since
+        ).distinct()
+
+    def _apply(self, rows, now: float) -> None:
+        with self._lock:
+            for family_id, revoked_at in rows:
+                remaining = self.retention_seconds - (datetime.utcnow() - revoked_at).total_seconds()
+                self._revoked[family_id] = max(self._revoked.get(family_id, 0), now + remaining)
+
+    def maybe_sync(self, db: Session) -> None:
+        """Recarrega as revogações recentes do banco (uma query a cada sync_seconds)"""
+        now = self._claim_sync()
+        if now is not None:
+            self._apply(db.execute(self._statement()).all(), now)
+
+    async def maybe_sync_async(self, db: AsyncSession) -> None:
+        """Como maybe_sync, com AsyncSession (dependência get_async_current_user)"""
+        now = self._claim_sync()
+        if now is not None:
+            self._apply((await db.execute(self._statement())).all(), now)
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revoked_sessions = RevokedSessions(ACCESS_TOKEN_EXPIRE_MINUTES * 60, REVOCATION_SYNC_SECONDS)
+
+
+class RefreshTokenService:
+    @staticmethod
+    def issue(db: Session, user_id: int, family_id: Optional[str] = None) -> IssuedRefreshToken:
+        """Cria um refresh token (nova sessão se family_id for None; não faz commit)"""
+        token = secrets.token_urlsafe(48)
+        family_id = family_id or uuid4().hex
+        expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        db.add(RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(token),
+            family_id=family_id,
+            expires_at=expires_at
+        ))
+        return IssuedRefreshToken(token, family_id, expires_at)
+
+    @staticmethod
+    def rotate(db: Session, token: str) -> Optional[tuple]:
+        """
+        Troca o refresh token por um novo da mesma sessão.
+        Retorna (user, IssuedRefreshToken) ou None se o token for inválido, vencido ou revogado.
+        """
+        now = datetime.utcnow()
+        stored = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token)).first()
+        if stored is None or stored.revoked_at is not None:
+            return None
+        if stored.rotated_at is not None:
+            # Token já trocado sendo reutilizado: revoga a sessão inteira
+            RefreshTokenService.revoke_family(db, stored.family_id)
+            return None
+        if stored.expires_at <= now:
+            return None
+
+        user = db.query(User).filter(User.id == stored.user_id).first()
+        if user is None or not user.is_active:
+            return None
+
+        # UPDATE condicional: duas trocas simultâneas do mesmo token não geram dois sucessores
+        rotated = db.query(RefreshToken).filter(
+            RefreshToken.id == stored.id, RefreshToken.rotated_at == None
+        ).update({RefreshToken.rotated_at: now}, synchronize_session=False)
+        if not rotated:
+            db.rollback()
+            return None
+        issued = RefreshTokenService.issue(db, user.id, stored.family_id)
+        db.commit()
+        return user, issued
+
+    @staticmethod
+    def revoke_family(db: Session, family_id: str) -> None:
+        """Revoga todos os refresh tokens da sessão e seus access tokens (faz commit)"""
+        db.query(RefreshToken).filter(
+            RefreshToken.family_id == family_id, RefreshToken.revoked_at == None
+        ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        revoked_sessions.revoke(family_id)
+
+    @staticmethod
+    def revoke(db: Session, token: str) -> bool:
+        """Logout: revoga a sessão do refresh token informado"""
+        stored = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(token)).first()
+        if stored is None:
+            return False
+        RefreshTokenService.revoke_family(db, stored.family_id)
+        return True
@@ -0,0 +1,70 @@
+"""
+Middleware ASGI de métricas HTTP
+
+Substitui o LoggingMiddleware (BaseHTTPMiddleware): não cria task nem stream extra por
+requisição e não loga nada no caminho normal. Só intercepta o `send` para ler o status e
+somar o tamanho do corpo; a rota vem de scope["route"], preenchido pelo roteador.
+"""
+import logging
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.metrics import RequestMetrics, request_metrics
+
+logger = logging.getLogger(__name__)
+
+# Rótulo das requisições que não casaram com nenhuma rota (404, scans)
+UNMATCHED_ROUTE = "<unmatched>"
+SLOW_REQUEST_SECONDS = 5.0
+# O servidor aceita qualquer token como método; fora desta lista o rótulo vira OTHER,
+# senão cada método inventado pelo cliente criaria séries que nunca são removidas
+KNOWN_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+OTHER_METHOD = "OTHER"
+
+
+def method_label(method: str) -> str:
+    """Método HTTP como rótulo de métrica (cardinalidade fixa)"""
+    return method if method in KNOWN_METHODS else OTHER_METHOD
+
+
+def route_template(scope: Scope) -> str:
+    """Template da rota que atendeu a requisição (ex.: /tickets/{ticket_id})"""
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if path is None:
+        return UNMATCHED_ROUTE
+    # Mounts (ex.: /static) que se identificam no scope ficam agregados no prefixo
+    return path or "/"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = method_label(scope["method"])
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.request_started(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = route_template(scope)
+            self.metrics.request_finished(method, route, status_code, elapsed, size)
+            if elapsed > SLOW_REQUEST_SECONDS:
+                logger.warning("⚠️ Requisição lenta: %s %s levou %.3fs", method, route, elapsed)
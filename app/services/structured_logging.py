@@ -0,0 +1,192 @@
+"""
+Logging estruturado sem I/O no caminho da requisição
+
+Os registros vão para uma fila (QueueHandler) e uma thread em segundo plano
+(QueueListener) formata em JSON e escreve no stderr. Na thread da requisição sobra só
+montar a mensagem e, quando há exceção, formatar o traceback uma vez.
+
+Cada registro leva o request_id da requisição corrente (header X-Request-ID recebido ou
+gerado pelo RequestContextMiddleware). Logs INFO/DEBUG podem ser amostrados por
+requisição com LOG_INFO_SAMPLE_PERCENT: a requisição sorteada mantém todos os seus logs;
+WARNING ou acima nunca são descartados.
+
+Variáveis: LOG_LEVEL (INFO), LOG_FORMAT (json ou text), LOG_INFO_SAMPLE_PERCENT (100).
+"""
+import atexit
+import copy
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.auth_service import get_int_env
+from app.services.request_metrics import route_template
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_LENGTH = 128
+
+# Atributos padrão do LogRecord; o resto veio de extra={...} e entra no JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+access_logger = logging.getLogger("app.access")
+
+
+class RequestContextFilter(logging.Filter):
+    """Anota o registro com o request_id e aplica a amostragem de INFO/DEBUG"""
+
+    def __init__(self, sample_percent: int = 100):
+        super().__init__()
+        self.sample_percent = min(max(sample_percent, 0), 100)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        record.request_id = request_id
+        if self.sample_percent >= 100 or record.levelno >= logging.WARNING:
+            return True
+        # Mesmo request_id -> mesma decisão: a requisição sorteada fica com o log completo
+        bucket = zlib.crc32(request_id.encode()) % 100 if request_id else random.randrange(100)
+        return bucket < self.sample_percent
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha: ts, level, logger, message, request_id, extras e exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class _LocalQueueHandler(QueueHandler):
+    """
+    QueueHandler para fila no mesmo processo: resolve a mensagem e o traceback (que
+    referenciam objetos vivos da requisição), mas deixa a formatação final para o listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(
+    level: Optional[str] = None, log_format: Optional[str] = None,
+    sample_percent: Optional[int] = None, stream: Optional[TextIO] = None
+) -> QueueListener:
+    """Configura o logger raiz com fila + thread de escrita (idempotente)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    log_format = (log_format or os.getenv("LOG_FORMAT", "json")).lower()
+    if sample_percent is None:
+        sample_percent = get_int_env("LOG_INFO_SAMPLE_PERCENT", 100)
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if log_format == "text":
+        output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _LocalQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter(sample_percent))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging() -> None:
+    """Esvazia a fila e para a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _request_id_from(scope: Scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == REQUEST_ID_HEADER and value:
+            return value.decode("latin-1")[:MAX_REQUEST_ID_LENGTH]
+    return uuid.uuid4().hex
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI: define o request_id da requisição (devolvido em X-Request-ID) e
+    registra uma linha de acesso estruturada em app.access (sujeita à amostragem).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id_from(scope)
+        # Sem reset no fim: cada requisição roda na própria task (contexto próprio), e o
+        # handler de exceções do Starlette, por fora deste middleware, ainda vê o request_id
+        request_id_var.set(request_id)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(
+                    "request",
+                    extra={
+                        "method": scope["method"], "route": route_template(scope), "status": status_code,
+                        "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    },
+                )
@@ -0,0 +1,249 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+from app.models import Ticket, TicketHistory, TechnicianStats, StatusEnum
+from app.services.auth_service import get_int_env
+
+# Intervalo máximo entre recálculos do contador de tickets em atraso.
+# O atraso depende do relógio (SLA vence sem nenhuma alteração no ticket),
+# então esse contador não pode ser mantido só por eventos.
+OVERDUE_REFRESH_SECONDS = get_int_env("TECH_STATS_OVERDUE_REFRESH_SECONDS", 60)
+
+# Coluna de contador correspondente a cada status
+STATUS_COLUMNS = {
+    StatusEnum.open: "open_tickets",
+    StatusEnum.pending: "pending_tickets",
+    StatusEnum.in_progress: "in_progress_tickets",
+    StatusEnum.resolved: "resolved_tickets",
+    StatusEnum.closed: "closed_tickets",
+}
+
+ACTIVE_STATUSES = (StatusEnum.pending, StatusEnum.in_progress)
+DONE_STATUSES = (StatusEnum.resolved, StatusEnum.closed)
+
+
+class TicketSnapshot(NamedTuple):
+    """Estado de um ticket relevante para os contadores do técnico"""
+    technician_id: Optional[int]
+    status: Optional[StatusEnum]
+    created_at: Optional[datetime]
+    # Momento da resolução (última alteração) quando o ticket está resolvido/fechado
+    resolved_at: Optional[datetime] = None
+
+
+def _as_status(value) -> Optional[StatusEnum]:
+    """Normaliza status vindo do ORM, de schemas ou de strings"""
+    if value is None or isinstance(value, StatusEnum):
+        return value
+    value = value.value if hasattr(value, 'value') else value
+    if value in StatusEnum.__members__:
+        return StatusEnum[value]
+    return StatusEnum(value)
+
+
+class TechStatsService:
+    @staticmethod
+    def snapshot(ticket: Optional[Ticket]) -> TicketSnapshot:
+        """Captura o estado atual do ticket (None = ticket inexistente)"""
+        if ticket is None:
+            return TicketSnapshot(None, None, None)
+        # Ticket ainda não inserido não tem o default de status aplicado
+        status = _as_status(ticket.status) or StatusEnum.open
+        resolved_at = ticket.updated_at if status in DONE_STATUSES else None
+        return TicketSnapshot(ticket.assigned_technician_id, status, ticket.created_at, resolved_at)
+
+    @staticmethod
+    def record_change(db: Session, before: TicketSnapshot, after: TicketSnapshot) -> None:
+        """Aplica nos contadores a transição before -> after (não faz commit)"""
+        TechStatsService.record_changes(db, [(before, after)])
+
+    @staticmethod
+    def record_changes(db: Session, changes: Iterable[Tuple[TicketSnapshot, TicketSnapshot]]) -> None:
+        """
+        Aplica várias transições de uma vez (não faz commit).
+        Os deltas são somados por técnico: um UPDATE por técnico afetado, não por ticket.
+        """
+        deltas: Dict[int, Dict[str, float]] = {}
+
+        def add(technician_id: int, column: str, value: float):
+            columns = deltas.setdefault(technician_id, {})
+            columns[column] = columns.get(column, 0) + value
+
+        now = datetime.utcnow()
+        for before, after in changes:
+            if before[:3] == after[:3]:  # resolved_at sozinho não muda contador
+                continue
+            if before.technician_id is not None:
+                add(before.technician_id, "total_tickets", -1)
+                add(before.technician_id, STATUS_COLUMNS[before.status], -1)
+            if after.technician_id is not None:
+                add(after.technician_id, "total_tickets", 1)
+                add(after.technician_id, STATUS_COLUMNS[after.status], 1)
+
+            was_done = before.technician_id is not None and before.status in DONE_STATUSES
+            is_done = after.technician_id is not None and after.status in DONE_STATUSES
+            same_technician = before.technician_id == after.technician_id
+            if was_done and not (is_done and same_technician):
+                # Reaberto ou transferido: desconta o tempo somado na resolução, como o rebuild
+                # (que só conta tickets resolvidos/fechados). resolved_at é o updated_at do
+                # ticket; se ele foi editado depois de resolvido, a diferença fica até o rebuild.
+                created_at = before.created_at or now
+                resolved_at = before.resolved_at or now
+                add(before.technician_id, "resolution_time_sum", -(resolved_at - created_at).total_seconds())
+                add(before.technician_id, "resolution_count", -1)
+            if is_done and not (was_done and same_technician):
+                # Ticket passou a resolvido/fechado: acumula o tempo de resolução
+                created_at = after.created_at or now
+                add(after.technician_id, "resolution_time_sum", (now - created_at).total_seconds())
+                add(after.technician_id, "resolution_count", 1)
+
+        for technician_id, columns in deltas.items():
+            values = {
+                getattr(TechnicianStats, column): getattr(TechnicianStats, column) + value
+                for column, value in columns.items() if value
+            }
+            # Qualquer mudança pode alterar o atraso: força recálculo na próxima leitura
+            values[TechnicianStats.overdue_refreshed_at] = None
+            values[TechnicianStats.updated_at] = datetime.utcnow()
+            updated = db.query(TechnicianStats).filter(
+                TechnicianStats.technician_id == technician_id
+            ).update(values, synchronize_session=False)
+            if not updated:
+                # Primeira mudança do técnico: monta a linha a partir dos tickets
+                db.flush()
+                TechStatsService.rebuild(db, technician_id, commit=False)
+
+    @staticmethod
+    def _ensure_row(db: Session, technician_id: int) -> None:
+        """
+        Cria a linha do técnico (zerada) se não existir, sem falhar quando outra requisição
+        cria a mesma linha ao mesmo tempo: INSERT ... ON CONFLICT DO NOTHING.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            db.execute(
+                dialect_insert(TechnicianStats).values(technician_id=technician_id)
+                .on_conflict_do_nothing(index_elements=[TechnicianStats.technician_id])
+            )
+            return
+        # Outros bancos: tenta inserir num savepoint e ignora a chave duplicada
+        try:
+            with db.begin_nested():
+                db.execute(insert(TechnicianStats).values(technician_id=technician_id))
+        except IntegrityError:
+            pass
+
+    @staticmethod
+    def _count_overdue(db: Session, technician_id: int, now: datetime) -> int:
+        return db.query(func.count(Ticket.id)).filter(
+            and_(
+                Ticket.assigned_technician_id == technician_id,
+                Ticket.sla_deadline < now,
+                Ticket.status.in_(ACTIVE_STATUSES)
+            )
+        ).scalar() or 0
+
+    @staticmethod
+    def get_stats(db: Session, technician_id: int) -> dict:
+        """Lê as estatísticas do técnico (uma leitura por chave primária)"""
+        stats = db.get(TechnicianStats, technician_id)
+        if stats is None:
+            stats = TechStatsService.rebuild(db, technician_id)
+
+        now = datetime.utcnow()
+        if TechStatsService.overdue_is_stale(stats, now):
+            stats.overdue_tickets = TechStatsService._count_overdue(db, technician_id, now)
+            stats.overdue_refreshed_at = now
+            db.commit()
+
+        return TechStatsService.as_dashboard(stats)
+
+    @staticmethod
+    def overdue_is_stale(stats: TechnicianStats, now: datetime) -> bool:
+        """O contador de atrasados passou de OVERDUE_REFRESH_SECONDS e precisa ser recalculado"""
+        return stats.overdue_refreshed_at is None or now - stats.overdue_refreshed_at > timedelta(seconds=OVERDUE_REFRESH_SECONDS)
+
+    @staticmethod
+    def as_dashboard(stats: TechnicianStats) -> dict:
+        """Formato de TechDashboardStats a partir da linha de contadores"""
+        avg_resolution_time = 0.0
+        if stats.resolution_count:
+            # Tempo médio de resolução em horas
+            avg_resolution_time = round(stats.resolution_time_sum / stats.resolution_count / 3600, 2)
+
+        return {
+            "total_tickets": stats.total_tickets,
+            "pending_tickets": stats.pending_tickets,
+            "in_progress_tickets": stats.in_progress_tickets,
+            "resolved_tickets": stats.resolved_tickets,
+            "overdue_tickets": stats.overdue_tickets,
+            "avg_resolution_time": avg_resolution_time
+        }
+
+    @staticmethod
+    def rebuild(db: Session, technician_id: int, commit: bool = True) -> TechnicianStats:
+        """Recalcula os contadores de um técnico a partir de tickets e ticket_history"""
+        now = datetime.utcnow()
+        values = {column: 0 for column in STATUS_COLUMNS.values()}
+
+        rows = db.query(Ticket.status, func.count(Ticket.id)).filter(
+            Ticket.assigned_technician_id == technician_id
+        ).group_by(Ticket.status).all()
+        for status, count in rows:
+            if status is None:
+                continue
+            values[STATUS_COLUMNS[_as_status(status)]] = count
+        values["total_tickets"] = sum(count for status, count in rows if status is not None)
+
+        values["overdue_tickets"] = TechStatsService._count_overdue(db, technician_id, now)
+        values["overdue_refreshed_at"] = now
+
+        # Resolução = última mudança de status registrada no histórico (ou updated_at)
+        last_change = db.query(
+            TicketHistory.ticket_id, func.max(TicketHistory.timestamp).label("resolved_at")
+        ).filter(TicketHistory.action == "status_change").group_by(TicketHistory.ticket_id).subquery()
+        resolved = db.query(Ticket.created_at, Ticket.updated_at, last_change.c.resolved_at).outerjoin(
+            last_change, last_change.c.ticket_id == Ticket.id
+        ).filter(
+            and_(
+                Ticket.assigned_technician_id == technician_id,
+                Ticket.status.in_(DONE_STATUSES)
+            )
+        ).all()
+        durations = [
+            ((resolved_at or updated_at) - created_at).total_seconds()
+            for created_at, updated_at, resolved_at in resolved
+            if created_at and (resolved_at or updated_at)
+        ]
+        values["resolution_time_sum"] = float(sum(durations))
+        values["resolution_count"] = len(durations)
+        values["updated_at"] = now
+
+        # Upsert: leituras/escritas concorrentes do mesmo técnico não colidem na chave primária
+        TechStatsService._ensure_row(db, technician_id)
+        db.query(TechnicianStats).filter(
+            TechnicianStats.technician_id == technician_id
+        ).update(values, synchronize_session=False)
+        if commit:
+            db.commit()
+        return db.get(TechnicianStats, technician_id, populate_existing=True)
+
+    @staticmethod
+    def rebuild_all(db: Session) -> List[int]:
+        """Recalcula os contadores de todos os técnicos com tickets ou linha existente"""
+        technician_ids = {
+            row[0] for row in db.query(Ticket.assigned_technician_id).filter(
+                Ticket.assigned_technician_id != None
+            ).distinct()
+        }
+        technician_ids.update(row[0] for row in db.query(TechnicianStats.technician_id))
+        for technician_id in sorted(technician_ids):
+            TechStatsService.rebuild(db, technician_id, commit=False)
+        db.commit()
+        return sorted(technician_ids)
@@ -0,0 +1,314 @@
+"""
+Busca textual de tickets (título, descrição, local, tipo, equipamento e comentários)
+
+O índice fica numa tabela à parte, ticket_search, mantida por triggers do próprio banco
+(inserção/edição de tickets e comentários atualizam só a linha do ticket afetado):
+- PostgreSQL: tsvector com pesos (título > tipo/equipamento/local > descrição > comentários)
+  e índice GIN; ranking com ts_rank_cd e trechos com ts_headline;
+- SQLite: tabela virtual FTS5 (unicode61, sem acentos); ranking com bm25 e trechos com
+  highlight/snippet.
+Os objetos são criados (e populados a partir dos tickets existentes) logo após o
+create_all do startup e pela migração 007.
+"""
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Float, Integer, event, func, literal_column, select, table, column
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.models import Base, Ticket, Comment, StatusEnum, PriorityEnum
+
+# Configuração de texto do PostgreSQL (stemming em português)
+SEARCH_CONFIG = "portuguese"
+MAX_QUERY_TERMS = 8
+
+# Marcadores dos trechos destacados; trocados por <mark> depois de escapar o HTML
+_OPEN, _CLOSE = "\x02", "\x03"
+
+# Colunas da tabela FTS5 (a ordem define os índices usados em highlight/snippet e bm25)
+FTS_COLUMNS = ("title", "description", "location", "problem_type", "equipment_id", "comments")
+FTS_WEIGHTS = (10.0, 2.0, 3.0, 3.0, 3.0, 1.0)
+
+_SQLITE_COMMENTS = "(SELECT coalesce(group_concat(text, ' '), '') FROM comments WHERE ticket_id = {ref})"
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS ticket_search USING fts5("
+    + ", ".join(FTS_COLUMNS) + ", tokenize = 'unicode61 remove_diacritics 2')",
+    """CREATE TRIGGER IF NOT EXISTS ticket_search_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO ticket_search(rowid, title, description, location, problem_type, equipment_id, comments)
+        VALUES (new.id, new.title, new.description, new.location, new.problem_type, coalesce(new.equipment_id, ''), '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS ticket_search_update
+    AFTER UPDATE OF title, description, location, problem_type, equipment_id ON tickets BEGIN
+        UPDATE ticket_search SET title = new.title, description = new.description, location = new.location,
+            problem_type = new.problem_type, equipment_id = coalesce(new.equipment_id, '')
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS ticket_search_delete AFTER DELETE ON tickets BEGIN
+        DELETE FROM ticket_search WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_search_comment_insert AFTER INSERT ON comments BEGIN
+        UPDATE ticket_search SET comments = {_SQLITE_COMMENTS.format(ref="new.ticket_id")} WHERE rowid = new.ticket_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_search_comment_update AFTER UPDATE OF text, ticket_id ON comments BEGIN
+        UPDATE ticket_search SET comments = {_SQLITE_COMMENTS.format(ref="old.ticket_id")} WHERE rowid = old.ticket_id;
+        UPDATE ticket_search SET comments = {_SQLITE_COMMENTS.format(ref="new.ticket_id")} WHERE rowid = new.ticket_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS ticket_search_comment_delete AFTER DELETE ON comments BEGIN
+        UPDATE ticket_search SET comments = {_SQLITE_COMMENTS.format(ref="old.ticket_id")} WHERE rowid = old.ticket_id;
+    END""",
+]
+
+SQLITE_BACKFILL = f"""
+INSERT INTO ticket_search(rowid, title, description, location, problem_type, equipment_id, comments)
+SELECT t.id, t.title, t.description, t.location, t.problem_type, coalesce(t.equipment_id, ''),
+       {_SQLITE_COMMENTS.format(ref="t.id")}
+FROM tickets t
+"""
+
+_PG_DOCUMENT = f"""
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(t.title, '')), 'A') ||
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(t.problem_type, '') || ' ' || coalesce(t.equipment_id, '') || ' ' || coalesce(t.location, '')), 'B') ||
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(t.description, '')), 'C') ||
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce((SELECT string_agg(c.text, ' ') FROM comments c WHERE c.ticket_id = t.id), '')), 'D')
+"""
+
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS ticket_search (
+        ticket_id integer PRIMARY KEY REFERENCES tickets(id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_ticket_search_document ON ticket_search USING gin (document)",
+    f"""CREATE OR REPLACE FUNCTION ticket_search_refresh(tid integer) RETURNS void LANGUAGE sql AS $$
+        INSERT INTO ticket_search (ticket_id, document)
+        SELECT t.id, {_PG_DOCUMENT} FROM tickets t WHERE t.id = tid
+        ON CONFLICT (ticket_id) DO UPDATE SET document = EXCLUDED.document;
+    $$""",
+    """CREATE OR REPLACE FUNCTION ticket_search_ticket_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM ticket_search_refresh(NEW.id);
+        RETURN NULL;
+    END $$""",
+    """CREATE OR REPLACE FUNCTION ticket_search_comment_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM ticket_search_refresh(OLD.ticket_id);
+        END IF;
+        IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR OLD.ticket_id IS DISTINCT FROM NEW.ticket_id) THEN
+            PERFORM ticket_search_refresh(NEW.ticket_id);
+        END IF;
+        RETURN NULL;
+    END $$""",
+    "DROP TRIGGER IF EXISTS ticket_search_ticket ON tickets",
+    """CREATE TRIGGER ticket_search_ticket
+    AFTER INSERT OR UPDATE OF title, description, location, problem_type, equipment_id ON tickets
+    FOR EACH ROW EXECUTE FUNCTION ticket_search_ticket_trigger()""",
+    "DROP TRIGGER IF EXISTS ticket_search_comment ON comments",
+    """CREATE TRIGGER ticket_search_comment
+    AFTER INSERT OR UPDATE OF text, ticket_id OR DELETE ON comments
+    FOR EACH ROW EXECUTE FUNCTION ticket_search_comment_trigger()""",
+]
+
+POSTGRES_BACKFILL = f"""
+INSERT INTO ticket_search (ticket_id, document)
+SELECT t.id, {_PG_DOCUMENT} FROM tickets t
+ON CONFLICT (ticket_id) DO NOTHING
+"""
+
+
+def install_search_index(conn: Connection) -> bool:
+    """
+    Cria tabela, índice e triggers de busca se ainda não existirem (idempotente).
+    Na primeira criação indexa os tickets já existentes. Retorna False se o banco não tiver suporte.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ticket_search'"
+        ).first() is not None
+        ddl, backfill = SQLITE_DDL, SQLITE_BACKFILL
+    elif dialect == "postgresql":
+        exists = conn.exec_driver_sql("SELECT to_regclass('ticket_search')").scalar() is not None
+        ddl, backfill = POSTGRES_DDL, POSTGRES_BACKFILL
+    else:
+        return False
+
+    for statement in ddl:
+        conn.exec_driver_sql(statement)
+    if not exists:
+        conn.exec_driver_sql(backfill)
+    return True
+
+
+def rebuild_search_index(conn: Connection) -> None:
+    """Reindexa todos os tickets (após carga feita com os triggers desativados, por exemplo)"""
+    conn.exec_driver_sql("DELETE FROM ticket_search")
+    conn.exec_driver_sql(SQLITE_BACKFILL if conn.dialect.name == "sqlite" else POSTGRES_BACKFILL)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(target, connection, **kw):
+    try:
+        # Savepoint: uma falha aqui não pode desfazer as tabelas criadas pelo create_all
+        with connection.begin_nested():
+            install_search_index(connection)
+    except Exception as e:
+        # Ex.: SQLite compilado sem FTS5 ou usuário sem permissão para criar funções
+        print(f"⚠️ Índice de busca de tickets não instalado: {e}")
+
+
+def search_terms(q: str) -> List[str]:
+    """Palavras da consulta (só caracteres de palavra: nada de sintaxe do FTS chega ao banco)"""
+    return re.findall(r"\w+", q, re.UNICODE)[:MAX_QUERY_TERMS]
+
+
+def render_highlight(fragment: Optional[str]) -> Optional[str]:
+    """Escapa o texto do usuário e troca os marcadores por <mark>; None se não houve destaque"""
+    if not fragment or _OPEN not in fragment:
+        return None
+    return html.escape(fragment).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+class _SqliteBackend:
+    fts = table("ticket_search", column("rowid", Integer))
+    source = literal_column("ticket_search")
+
+    def __init__(self, terms: List[str]):
+        # Termos entre aspas (AND implícito); o último também casa como prefixo
+        self.query = " ".join(f'"{term}"' for term in terms) + "*"
+
+    def join(self):
+        return self.fts.join(Ticket, Ticket.id == self.fts.c.rowid)
+
+    def match(self):
+        return self.source.op("MATCH")(self.query)
+
+    def ticket_id(self):
+        return self.fts.c.rowid
+
+    def rank(self):
+        # bm25 é menor quanto melhor; negado para "maior = mais relevante" como no PostgreSQL
+        return -func.bm25(self.source, *FTS_WEIGHTS, type_=Float)
+
+    def highlights(self, db: Session, ticket_ids: List[int]) -> Dict[int, Dict[str, Optional[str]]]:
+        def col(name):
+            return FTS_COLUMNS.index(name)
+
+        rows = db.execute(select(
+            self.fts.c.rowid,
+            func.highlight(self.source, col("title"), _OPEN, _CLOSE),
+            func.snippet(self.source, col("description"), _OPEN, _CLOSE, "…", 24),
+            func.snippet(self.source, col("comments"), _OPEN, _CLOSE, "…", 16),
+        ).where(self.match(), self.fts.c.rowid.in_(ticket_ids)))
+        return {row[0]: {"title": row[1], "description": row[2], "comments": row[3]} for row in rows}
+
+
+class _PostgresBackend:
+    search = table("ticket_search", column("ticket_id", Integer), column("document"))
+
+    def __init__(self, terms: List[str]):
+        # Termos com AND; o último também casa como prefixo (busca enquanto digita)
+        self.tsquery = func.to_tsquery(SEARCH_CONFIG, " & ".join(terms) + ":*")
+
+    def join(self):
+        return self.search.join(Ticket, Ticket.id == self.search.c.ticket_id)
+
+    def match(self):
+        return self.search.c.document.op("@@")(self.tsquery)
+
+    def ticket_id(self):
+        return self.search.c.ticket_id
+
+    def rank(self):
+        return func.ts_rank_cd(self.search.c.document, self.tsquery)
+
+    def highlights(self, db: Session, ticket_ids: List[int]) -> Dict[int, Dict[str, Optional[str]]]:
+        options = f"StartSel={_OPEN}, StopSel={_CLOSE}"
+        comments = select(func.string_agg(Comment.text, " ")).where(Comment.ticket_id == Ticket.id).scalar_subquery()
+        rows = db.execute(select(
+            Ticket.id,
+            func.ts_headline(SEARCH_CONFIG, Ticket.title, self.tsquery, options + ", HighlightAll=true"),
+            func.ts_headline(SEARCH_CONFIG, Ticket.description, self.tsquery, options + ", MaxWords=24, MinWords=8"),
+            func.ts_headline(SEARCH_CONFIG, func.coalesce(comments, ""), self.tsquery, options + ", MaxWords=16, MinWords=6"),
+        ).where(Ticket.id.in_(ticket_ids)))
+        return {row[0]: {"title": row[1], "description": row[2], "comments": row[3]} for row in rows}
+
+
+BACKENDS = {"sqlite": _SqliteBackend, "postgresql": _PostgresBackend}
+FACETS = {"status": Ticket.status, "priority": Ticket.priority, "technician_id": Ticket.assigned_technician_id}
+
+
+class TicketSearchService:
+    @staticmethod
+    def is_supported(db: Session) -> bool:
+        return db.get_bind().dialect.name in BACKENDS
+
+    @staticmethod
+    def search(
+        db: Session,
+        q: str,
+        status: Optional[StatusEnum] = None,
+        priority: Optional[PriorityEnum] = None,
+        technician_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20,
+        with_facets: bool = True,
+    ) -> dict:
+        """
+        Busca por relevância com filtros. Retorna {"total", "hits": [(ticket, rank, highlights)], "facets"}.
+        Facetas contam os resultados aplicando os demais filtros (não o da própria faceta).
+        Custo: página de ids + trechos da página + tickets da página + total + uma query por faceta.
+        """
+        from app.services.ticket_service import TicketService
+
+        terms = search_terms(q)
+        if not terms:
+            return {"total": 0, "hits": [], "facets": {name: [] for name in FACETS} if with_facets else {}}
+        backend = BACKENDS[db.get_bind().dialect.name](terms)
+
+        filters = {
+            "status": Ticket.status == status if status is not None else None,
+            "priority": Ticket.priority == priority if priority is not None else None,
+            "technician_id": Ticket.assigned_technician_id == technician_id if technician_id is not None else None,
+        }
+
+        def where(exclude: Optional[str] = None) -> list:
+            return [backend.match()] + [
+                condition for name, condition in filters.items() if condition is not None and name != exclude
+            ]
+
+        rank = backend.rank().label("rank")
+        page: List[Tuple[int, float]] = db.execute(
+            select(backend.ticket_id(), rank).select_from(backend.join()).where(*where())
+            .order_by(rank.desc(), backend.ticket_id().desc()).offset(skip).limit(limit)
+        ).all()
+        ticket_ids = [ticket_id for ticket_id, _ in page]
+
+        hits = []
+        if ticket_ids:
+            highlights = backend.highlights(db, ticket_ids)
+            tickets = {ticket.id: ticket for ticket in TicketService.ticket_query(db).filter(Ticket.id.in_(ticket_ids))}
+            for ticket_id, score in page:
+                if ticket_id not in tickets:
+                    continue
+                fragments = {}
+                for field, fragment in highlights.get(ticket_id, {}).items():
+                    rendered = render_highlight(fragment)
+                    if rendered is not None:
+                        fragments[field] = rendered
+                hits.append((tickets[ticket_id], float(score or 0), fragments))
+
+        total = db.execute(select(func.count()).select_from(backend.join()).where(*where())).scalar() or 0
+
+        facets = {}
+        if with_facets:
+            for name, facet_column in FACETS.items():
+                rows = db.execute(
+                    select(facet_column, func.count()).select_from(backend.join())
+                    .where(*where(exclude=name)).group_by(facet_column).order_by(func.count().desc())
+                ).all()
+                facets[name] = [
+                    (value.value if hasattr(value, "value") else value, count) for value, count in rows
+                ]
+
+        return {"total": total, "hits": hits, "facets": facets}
@@ -1,78 +1,187 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from typing import Iterator, List, Optional, Tuple, Type
+from sqlalchemy.orm import Session, Query, joinedload, load_only, selectinload
+from sqlalchemy import and_, or_, insert, inspect, select, update
+from sqlalchemy.sql import Select
 from datetime import datetime
-from app.models import User, Ticket, Comment, TicketHistory, StatusEnum
+from pydantic import BaseModel
+from app.models import User, Ticket, Comment, TicketHistory, TicketAttachment, StatusEnum
+from app.services.tech_stats_service import TechStatsService, TicketSnapshot
+from app.services.pagination import paginate_query, stream_query
+from app.services.blob_store import BlobStore
+from app.services.unit_of_work import on_commit
 from app.schemas import (
-    TicketCreate, TicketUpdate, CommentCreate, TicketHistoryCreate
+    TicketCreate, TicketUpdate, CommentCreate, TicketHistoryCreate,
+    TicketResponse, TicketWithComments, TicketWithHistory, TicketSummaryBase, UserStub
 )
 
 class TicketService:
+    # Métodos de escrita só fazem flush: o commit é do chamador (ver app/services/unit_of_work.py)
+
+    # === QUERY BUILDER ===
+
+    @staticmethod
+    def ticket_load_options(schema: Type[BaseModel] = TicketResponse) -> list:
+        """Opções de eager loading para o schema de resposta informado.
+
+        Relações N:1 (user, assigned_technician) entram no mesmo SELECT via JOIN;
+        coleções (comments, history) são carregadas com um SELECT ... IN por relação,
+        de modo que uma página de tickets custa um número fixo de queries.
+        Schemas enxutos (TicketSummaryBase) selecionam só as colunas que declaram.
+        """
+        if issubclass(schema, TicketSummaryBase):
+            return TicketService.summary_load_options(schema)
+        options = [
+            joinedload(Ticket.user),
+            joinedload(Ticket.assigned_technician),
+            selectinload(Ticket.attachments),
+        ]
+        if issubclass(schema, (TicketWithComments, TicketWithHistory)):
+            options.append(selectinload(Ticket.comments))
+        if issubclass(schema, TicketWithHistory):
+            options.append(selectinload(Ticket.history))
+        return options
+
+    @staticmethod
+    def summary_load_options(schema: Type[BaseModel]) -> list:
+        """load_only com os campos do schema; usuários aninhados só com os campos de UserStub"""
+        fields = set(schema.model_fields)
+        column_names = {attr.key for attr in inspect(Ticket).column_attrs}
+        names = {"id"} | (fields & column_names)
+        if "user" in fields:
+            names.add("user_id")
+        if "assigned_technician" in fields:
+            names.add("assigned_technician_id")
+        options = [load_only(*(getattr(Ticket, name) for name in sorted(names)))]
+        stub_columns = [getattr(User, name) for name in UserStub.model_fields]
+        if "user" in fields:
+            options.append(joinedload(Ticket.user).load_only(*stub_columns))
+        if "assigned_technician" in fields:
+            options.append(joinedload(Ticket.assigned_technician).load_only(*stub_columns))
+        return options
+
+    @staticmethod
+    def ticket_query(db: Session, schema: Optional[Type[BaseModel]] = TicketResponse) -> Query:
+        """Query base de Ticket com o carregamento adequado ao schema (None = sem eager loading)"""
+        query = db.query(Ticket)
+        if schema is not None:
+            query = query.options(*TicketService.ticket_load_options(schema))
+        return query
+
+    @staticmethod
+    def ticket_select(schema: Type[BaseModel] = TicketResponse) -> Select:
+        """Como ticket_query, em estilo 2.0 (select), para as listagens com AsyncSession"""
+        return select(Ticket).options(*TicketService.ticket_load_options(schema))
+
+    # === CRITÉRIOS DAS LISTAGENS (compartilhados com app/services/async_services.py) ===
+
+    @staticmethod
+    def available_for_technician_criteria(technician_id: int):
+        """Atribuídos ao técnico + não atribuídos"""
+        return or_(
+            Ticket.assigned_technician_id == technician_id,
+            Ticket.assigned_technician_id == None
+        )
+
+    @staticmethod
+    def tech_queue_criteria():
+        """Abertos e não atribuídos (fila dos técnicos)"""
+        return and_(
+            Ticket.status == StatusEnum.open,
+            Ticket.assigned_technician_id == None
+        )
+
+    @staticmethod
+    def assigned_by_admin_criteria(technician_id: int):
+        """Atribuídos pelo admin ao técnico"""
+        return and_(
+            Ticket.assigned_technician_id == technician_id,
+            Ticket.assigned_by_admin == True
+        )
+
     @staticmethod
     def create_ticket(db: Session, ticket: TicketCreate, user_id: int) -> Ticket:
         """Cria um novo ticket"""
         # Remover campos que não existem no modelo Ticket
         ticket_data = ticket.dict()
         ticket_data.pop('username', None)  # Remove username se existir
+        attachments = ticket_data.pop('attachments', None) or []
         
         db_ticket = Ticket(
             **ticket_data,
             user_id=user_id
         )
+        db_ticket.attachments = [
+            TicketAttachment(
+                stored_filename=att["stored_filename"],
+                filename=att["filename"],
+                size=att["size"],
+                content_type=att["type"]
+            )
+            for att in attachments
+        ]
         db.add(db_ticket)
-        db.commit()
-        db.refresh(db_ticket)
+        db.flush()
         return db_ticket
 
     @staticmethod
-    def get_ticket_by_id(db: Session, ticket_id: int) -> Optional[Ticket]:
+    def get_ticket_by_id(db: Session, ticket_id: int, schema: Optional[Type[BaseModel]] = None) -> Optional[Ticket]:
         """Busca ticket por ID"""
-        return db.query(Ticket).filter(Ticket.id == ticket_id).first()
+        return TicketService.ticket_query(db, schema).filter(Ticket.id == ticket_id).first()
 
     @staticmethod
-    def get_tickets_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_tickets_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets de um usuário"""
-        return db.query(Ticket).filter(Ticket.user_id == user_id).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(Ticket.user_id == user_id)
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_tickets_by_technician(db: Session, technician_id: int, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_tickets_by_technician(db: Session, technician_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets atribuídos a um técnico"""
-        return db.query(Ticket).filter(Ticket.assigned_technician_id == technician_id).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(Ticket.assigned_technician_id == technician_id)
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_unassigned_tickets(db: Session, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_unassigned_tickets(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets não atribuídos (disponíveis para técnicos)"""
-        return db.query(Ticket).filter(Ticket.assigned_technician_id == None).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(Ticket.assigned_technician_id == None)
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_available_tickets_for_technician(db: Session, technician_id: int, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_available_tickets_for_technician(db: Session, technician_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets disponíveis para um técnico (atribuídos + não atribuídos)"""
-        return db.query(Ticket).filter(
-            or_(
-                Ticket.assigned_technician_id == technician_id,
-                Ticket.assigned_technician_id == None
-            )
-        ).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(TicketService.available_for_technician_criteria(technician_id))
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
     def assign_ticket_to_self(db: Session, ticket_id: int, technician_id: int) -> Optional[Ticket]:
-        """Permite que um técnico pegue um ticket não atribuído"""
-        ticket = TicketService.get_ticket_by_id(db, ticket_id)
-        if not ticket:
-            return None
-        
-        # Verificar se ticket não está atribuído
-        if ticket.assigned_technician_id is not None:
-            return None  # Ticket já atribuído
+        """
+        Permite que um técnico pegue um ticket não atribuído
+
+        A checagem "não atribuído" e a atribuição são um único UPDATE condicional: com
+        pedidos simultâneos só um encontra assigned_technician_id IS NULL e vence.
+        """
+        claimed = db.execute(
+            update(Ticket)
+            .where(Ticket.id == ticket_id, Ticket.assigned_technician_id.is_(None))
+            .values(
+                assigned_technician_id=technician_id,
+                status=StatusEnum.in_progress,
+                assigned_by_admin=False  # Auto-atribuído pelo técnico
+            )
+            .returning(Ticket.created_at)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if claimed is None:
+            return None  # Ticket inexistente ou já atribuído
         
-        # Atribuir ao técnico
-        ticket.assigned_technician_id = technician_id
-        ticket.status = StatusEnum.in_progress
-        ticket.assigned_by_admin = False  # Auto-atribuído pelo técnico
-        db.commit()
-        db.refresh(ticket)
+        # Antes: sem técnico (garantido pelo WHERE), então só o novo técnico é contabilizado
+        TechStatsService.record_change(
+            db,
+            TicketSnapshot(None, None, claimed.created_at),
+            TicketSnapshot(technician_id, StatusEnum.in_progress, claimed.created_at)
+        )
         
-        # Adicionar ao histórico
+        # Histórico na mesma transação
         TicketService.create_ticket_history(
             db, 
             TicketHistoryCreate(
@@ -82,32 +191,41 @@ class TicketService:
             ticket_id, 
             f"Técnico ID {technician_id}"
         )
-        return ticket
+        return TicketService.get_ticket_by_id(db, ticket_id, schema=TicketResponse)
 
     @staticmethod
-    def get_all_tickets(db: Session, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_all_tickets(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca todos os tickets"""
-        return db.query(Ticket).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema)
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_tickets_by_status(db: Session, status, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def stream_all_tickets(db: Session, schema: Type[BaseModel] = TicketResponse) -> Iterator[List[Ticket]]:
+        """Todos os tickets em lotes (ordem de id), para exportação em streaming"""
+        statement = select(Ticket).options(*TicketService.ticket_load_options(schema)).order_by(Ticket.id)
+        yield from stream_query(db, statement)
+
+    @staticmethod
+    def get_tickets_by_status(db: Session, status, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets por status"""
         # Converter string para Enum se necessário
         if isinstance(status, str):
             status = StatusEnum[status.replace("-", "_")]
-        return db.query(Ticket).filter(Ticket.status == status).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(Ticket.status == status)
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
     def update_ticket(db: Session, ticket_id: int, ticket_update: dict) -> Optional[Ticket]:
         """Atualiza um ticket"""
         db_ticket = TicketService.get_ticket_by_id(db, ticket_id)
         if db_ticket:
+            before = TechStatsService.snapshot(db_ticket)
             for field, value in ticket_update.items():
                 if value is not None:
                     setattr(db_ticket, field, value)
             db_ticket.updated_at = datetime.utcnow()
-            db.commit()
-            db.refresh(db_ticket)
+            TechStatsService.record_change(db, before, TechStatsService.snapshot(db_ticket))
+            db.flush()
         return db_ticket
 
     @staticmethod
@@ -115,8 +233,16 @@ class TicketService:
         """Deleta um ticket"""
         db_ticket = TicketService.get_ticket_by_id(db, ticket_id)
         if db_ticket:
+            # Liberar as referências dos anexos deduplicados
+            blob_hashes = [att.sha256 for att in db_ticket.attachments if att.sha256]
+            for sha256 in blob_hashes:
+                BlobStore.release(db, sha256)
+            TechStatsService.record_change(db, TechStatsService.snapshot(db_ticket), TechStatsService.snapshot(None))
             db.delete(db_ticket)
-            db.commit()
+            db.flush()
+            # Arquivos só podem sumir depois que a remoção for confirmada
+            for sha256 in set(blob_hashes):
+                on_commit(db, BlobStore.purge_unreferenced, db, sha256)
             return True
         return False
 
@@ -125,13 +251,13 @@ class TicketService:
         """Atribui ticket a um técnico"""
         ticket = TicketService.get_ticket_by_id(db, ticket_id)
         if ticket:
+            before = TechStatsService.snapshot(ticket)
             ticket.assigned_technician_id = technician_id
             ticket.status = StatusEnum.in_progress
             ticket.assigned_by_admin = assigned_by_admin
-            db.commit()
-            db.refresh(ticket)
+            TechStatsService.record_change(db, before, TechStatsService.snapshot(ticket))
             
-            # Adicionar ao histórico
+            # Adicionar ao histórico (mesma transação)
             action = "admin_assigned" if assigned_by_admin else "assigned"
             description = f"Ticket atribuído pelo admin ao técnico ID {technician_id}" if assigned_by_admin else f"Ticket atribuído ao técnico ID {technician_id}"
             
@@ -146,6 +272,50 @@ class TicketService:
             )
         return ticket
 
+    @staticmethod
+    def bulk_update_tickets(db: Session, ticket_ids: List[int], values: dict, action: str, description: str,
+                            technician_name: str) -> Tuple[List[int], List[int]]:
+        """
+        Aplica `values` a vários tickets com um único UPDATE ... WHERE id IN (...) e grava o
+        histórico com um único INSERT (executemany). Retorna (ids atualizados, ids inexistentes).
+        `values` usa os enums do modelo (ex.: status=StatusEnum.closed); não faz commit.
+        """
+        requested = list(dict.fromkeys(ticket_ids))
+        # Estado anterior numa só leitura (contadores dos técnicos e ids inexistentes)
+        rows = db.query(
+            Ticket.id, Ticket.assigned_technician_id, Ticket.status, Ticket.created_at
+        ).filter(Ticket.id.in_(requested)).with_for_update().all()
+        found = {row.id: row for row in rows}
+        updated_ids = [ticket_id for ticket_id in requested if ticket_id in found]
+        missing_ids = [ticket_id for ticket_id in requested if ticket_id not in found]
+        if not updated_ids:
+            return updated_ids, missing_ids
+
+        db.execute(
+            update(Ticket).where(Ticket.id.in_(updated_ids)).values(**values, updated_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False}
+        )
+
+        changes = []
+        for ticket_id in updated_ids:
+            before = TechStatsService.snapshot(found[ticket_id])
+            after = before._replace(
+                technician_id=values.get("assigned_technician_id", before.technician_id),
+                status=values.get("status", before.status)
+            )
+            changes.append((before, after))
+        TechStatsService.record_changes(db, changes)
+
+        now = datetime.utcnow()
+        db.execute(insert(TicketHistory), [
+            {"ticket_id": ticket_id, "action": action, "description": description,
+             "technician_name": technician_name, "timestamp": now}
+            for ticket_id in updated_ids
+        ])
+        # Objetos Ticket já carregados nesta sessão não refletem o UPDATE em massa
+        db.expire_all()
+        return updated_ids, missing_ids
+
     # Funções de Comentário
     @staticmethod
     def create_comment(db: Session, comment: CommentCreate, ticket_id: int, author: str) -> Comment:
@@ -156,8 +326,7 @@ class TicketService:
             author=author
         )
         db.add(db_comment)
-        db.commit()
-        db.refresh(db_comment)
+        db.flush()
         return db_comment
 
     @staticmethod
@@ -171,7 +340,7 @@ class TicketService:
         db_comment = db.query(Comment).filter(Comment.id == comment_id).first()
         if db_comment:
             db.delete(db_comment)
-            db.commit()
+            db.flush()
             return True
         return False
 
@@ -185,8 +354,7 @@ class TicketService:
             technician_name=technician_name
         )
         db.add(db_history)
-        db.commit()
-        db.refresh(db_history)
+        db.flush()
         return db_history
 
     @staticmethod
@@ -230,79 +398,44 @@ class TicketService:
     # Funções de Estatísticas para Dashboard
     @staticmethod
     def get_tech_dashboard_stats(db: Session, technician_id: int) -> dict:
-        """Obtém estatísticas do dashboard do técnico"""
-        total_tickets = db.query(Ticket).filter(Ticket.assigned_technician_id == technician_id).count()
-        pending_tickets = db.query(Ticket).filter(
-            and_(Ticket.assigned_technician_id == technician_id, Ticket.status == StatusEnum.pending)
-        ).count()
-        in_progress_tickets = db.query(Ticket).filter(
-            and_(Ticket.assigned_technician_id == technician_id, Ticket.status == StatusEnum.in_progress)
-        ).count()
-        resolved_tickets = db.query(Ticket).filter(
-            and_(Ticket.assigned_technician_id == technician_id, Ticket.status == StatusEnum.resolved)
-        ).count()
-        
-        # Tickets em atraso (SLA vencido)
-        overdue_tickets = db.query(Ticket).filter(
-            and_(
-                Ticket.assigned_technician_id == technician_id,
-                Ticket.sla_deadline < datetime.utcnow(),
-                Ticket.status.in_([StatusEnum.pending, StatusEnum.in_progress])
-            )
-        ).count()
-        
-        # Tempo médio de resolução (simplificado)
-        avg_resolution_time = 0.0  # Implementar cálculo real baseado no histórico
-        
-        return {
-            "total_tickets": total_tickets,
-            "pending_tickets": pending_tickets,
-            "in_progress_tickets": in_progress_tickets,
-            "resolved_tickets": resolved_tickets,
-            "overdue_tickets": overdue_tickets,
-            "avg_resolution_time": avg_resolution_time
-        }
+        """Obtém estatísticas do dashboard do técnico (contadores materializados)"""
+        return TechStatsService.get_stats(db, technician_id)
 
     # === NOVOS MÉTODOS PARA O SISTEMA DE ADMIN ===
     
     @staticmethod
-    def get_open_tickets_for_admin(db: Session, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_open_tickets_for_admin(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets abertos não atribuídos para o admin"""
-        return db.query(Ticket).filter(
+        query = TicketService.ticket_query(db, schema).filter(
             and_(
                 Ticket.status == StatusEnum.open,
                 Ticket.assigned_technician_id == None
             )
-        ).offset(skip).limit(limit).all()
+        )
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_tickets_assigned_by_admin(db: Session, technician_id: int, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_tickets_assigned_by_admin(db: Session, technician_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets atribuídos pelo admin para um técnico específico"""
-        return db.query(Ticket).filter(
-            and_(
-                Ticket.assigned_technician_id == technician_id,
-                Ticket.assigned_by_admin == True
-            )
-        ).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(TicketService.assigned_by_admin_criteria(technician_id))
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_technician_assigned_tickets(db: Session, technician_id: int, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_technician_assigned_tickets(db: Session, technician_id: int, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca todos os tickets atribuídos a um técnico (admin + auto-atribuídos)"""
-        return db.query(Ticket).filter(Ticket.assigned_technician_id == technician_id).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(Ticket.assigned_technician_id == technician_id)
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_available_tickets_for_tech_queue(db: Session, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_available_tickets_for_tech_queue(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca tickets disponíveis na fila para técnicos pegarem"""
-        return db.query(Ticket).filter(
-            and_(
-                Ticket.status == StatusEnum.open,
-                Ticket.assigned_technician_id == None
-            )
-        ).offset(skip).limit(limit).all()
+        query = TicketService.ticket_query(db, schema).filter(TicketService.tech_queue_criteria())
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
 
     @staticmethod
-    def get_all_assigned_tickets(db: Session, skip: int = 0, limit: int = 100) -> List[Ticket]:
+    def get_all_assigned_tickets(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None, schema: Type[BaseModel] = TicketResponse) -> List[Ticket]:
         """Busca todos os tickets que foram atribuídos a técnicos"""
-        return db.query(Ticket).filter(
+        query = TicketService.ticket_query(db, schema).filter(
             Ticket.assigned_technician_id != None
-        ).offset(skip).limit(limit).all()
+        )
+        return paginate_query(query, Ticket.id, skip, limit, after_id)
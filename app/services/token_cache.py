@@ -0,0 +1,10 @@
+"""
+Cache de tokens JWT já verificados
+
+A chave é o SHA-256 do token (o token em si não fica em memória) e a entrada expira no
+"exp" do próprio token, então um token vencido nunca é aceito pelo cache.
+"""
+from app.services.auth_service import TOKEN_CACHE_MAX_TTL_SECONDS, TOKEN_CACHE_SIZE
+from app.services.ttl_cache import TTLCache
+
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_MAX_TTL_SECONDS)
@@ -0,0 +1,36 @@
+"""
+Unidade de trabalho por requisição
+
+Os serviços de ticket só fazem flush (os INSERT/UPDATE vão para a transação aberta e os
+ids ficam disponíveis); o controller delimita a requisição com `unit_of_work(db)`, que
+faz um único commit no final ou rollback em qualquer erro (inclusive HTTPException).
+
+Efeitos que só podem acontecer depois de confirmados no banco (ex.: apagar arquivos
+físicos) são agendados com `on_commit` e executados após o commit.
+"""
+from contextlib import contextmanager
+from typing import Callable
+from sqlalchemy.orm import Session
+
+_ON_COMMIT_KEY = "on_commit"
+
+
+def on_commit(db: Session, fn: Callable, *args) -> None:
+    """Agenda `fn(*args)` para depois do commit da unidade de trabalho"""
+    db.info.setdefault(_ON_COMMIT_KEY, []).append((fn, args))
+
+
+@contextmanager
+def unit_of_work(db: Session):
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        db.info.pop(_ON_COMMIT_KEY, None)
+        raise
+    for fn, args in db.info.pop(_ON_COMMIT_KEY, []):
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"⚠️ Erro em tarefa pós-commit {getattr(fn, '__name__', fn)}: {e}")
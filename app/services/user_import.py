@@ -0,0 +1,175 @@
+"""
+Importação de usuários em massa (CSV ou JSON)
+
+Substitui centenas de chamadas a /register e /tech-register (duas consultas de
+existência, um bcrypt e um commit cada) por:
+- uma consulta de existência para todos os usernames e emails do arquivo;
+- hash das senhas em lote no pool de bcrypt (password_hasher.hash_many);
+- INSERT em lotes de USER_IMPORT_BATCH_SIZE (executemany), um commit por lote.
+O resultado de cada linha é devolvido em NDJSON à medida que os lotes são gravados.
+"""
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import User, RoleEnum
+from app.schemas import UserCreate
+from app.services.auth_service import get_int_env
+from app.services.password_hasher import password_hasher
+
+USER_IMPORT_BATCH_SIZE = get_int_env("USER_IMPORT_BATCH_SIZE", 500)
+USER_IMPORT_MAX_ROWS = get_int_env("USER_IMPORT_MAX_ROWS", 20000)
+
+# Campos de lista no CSV usam ";" como separador (ex.: specialty=redes;hardware)
+CSV_LIST_FIELDS = {"specialty"}
+
+
+class UserImportError(Exception):
+    """Arquivo de importação ilegível (o controller responde 400)"""
+
+
+def parse_import_rows(body: bytes, content_type: str) -> List[dict]:
+    """Converte o corpo (CSV com cabeçalho ou array JSON) em uma lista de dicts"""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise UserImportError("Arquivo deve estar em UTF-8")
+
+    if "json" in content_type:
+        try:
+            rows = json.loads(text)
+        except ValueError as e:
+            raise UserImportError(f"JSON inválido: {e}")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise UserImportError("JSON deve ser um array de objetos")
+    else:
+        rows = []
+        for row in csv.DictReader(io.StringIO(text)):
+            cleaned = {key.strip(): (value.strip() if value is not None else None)
+                       for key, value in row.items() if key}
+            cleaned = {key: value for key, value in cleaned.items() if value not in (None, "")}
+            for field in CSV_LIST_FIELDS & cleaned.keys():
+                cleaned[field] = [item.strip() for item in cleaned[field].split(";") if item.strip()]
+            rows.append(cleaned)
+
+    if len(rows) > USER_IMPORT_MAX_ROWS:
+        raise UserImportError(f"Máximo de {USER_IMPORT_MAX_ROWS} linhas por importação")
+    return rows
+
+
+def find_existing(db: Session, usernames: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """Usernames e emails já cadastrados, numa única consulta"""
+    usernames, emails = list(usernames), list(emails)
+    conditions = [User.username.in_(usernames)]
+    if emails:
+        conditions.append(User.email.in_(emails))
+    rows = db.query(User.username, User.email).filter(or_(*conditions)).all()
+    return {row.username for row in rows}, {row.email for row in rows if row.email}
+
+
+def _user_values(user: UserCreate, hashed_password: str, approve: bool) -> dict:
+    role = RoleEnum(user.role.value)
+    return {
+        "username": user.username,
+        "email": user.email,
+        "full_name": user.full_name,
+        "hashed_password": hashed_password,
+        "role": role,
+        "is_active": True,
+        # Mesma regra de UserService.create_user; approve=True aprova técnicos/admins importados
+        "is_approved": approve or role == RoleEnum.servidor,
+        "employee_id": user.employee_id,
+        "department": user.department,
+        "specialty": user.specialty,
+        "phone": user.phone,
+        "emergency_contact": user.emergency_contact,
+        "certifications": user.certifications,
+        "experience_years": user.experience_years,
+        "availability": user.availability,
+        "notes": user.notes,
+    }
+
+
+def _insert_batch(db: Session, batch: List[Tuple[int, UserCreate]], hashes: List[str], approve: bool) -> Dict[int, dict]:
+    """Insere o lote com um executemany; em conflito (cadastro concorrente) cai para linha a linha"""
+    values = [_user_values(user, hashed, approve) for (_, user), hashed in zip(batch, hashes)]
+    try:
+        db.execute(insert(User), values)
+        db.commit()
+        return {row: {"status": "created"} for row, _ in batch}
+    except IntegrityError:
+        db.rollback()
+
+    results = {}
+    for (row, _), value in zip(batch, values):
+        try:
+            db.execute(insert(User), [value])
+            db.commit()
+            results[row] = {"status": "created"}
+        except IntegrityError:
+            db.rollback()
+            results[row] = {"status": "exists", "detail": "Username ou email já está em uso"}
+    return results
+
+
+def import_users(session_factory: Callable[[], Session], rows: List[dict], approve: bool = False) -> Iterator[str]:
+    """
+    Importa as linhas e gera uma linha NDJSON por usuário:
+    {"row": n, "username": ..., "status": "created" | "exists" | "duplicate" | "invalid", "detail": ...}
+    Usa a própria sessão: o gerador é consumido depois que a rota já retornou.
+    """
+    valid: List[Tuple[int, UserCreate]] = []
+    seen_usernames: Set[str] = set()
+    seen_emails: Set[str] = set()
+
+    def line(row: int, username: Optional[str], status: str, detail: Optional[str] = None) -> str:
+        result = {"row": row, "username": username, "status": status}
+        if detail:
+            result["detail"] = detail
+        return json.dumps(result, ensure_ascii=False) + "\n"
+
+    pending_lines = []
+    for row, data in enumerate(rows, start=1):
+        try:
+            user = UserCreate(**data)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            pending_lines.append(line(row, data.get("username"), "invalid", errors))
+            continue
+        if user.username in seen_usernames or (user.email and user.email in seen_emails):
+            pending_lines.append(line(row, user.username, "duplicate", "Repetido no arquivo"))
+            continue
+        seen_usernames.add(user.username)
+        if user.email:
+            seen_emails.add(user.email)
+        valid.append((row, user))
+
+    db = session_factory()
+    try:
+        existing_usernames, existing_emails = find_existing(db, seen_usernames, seen_emails)
+        to_create = []
+        for row, user in valid:
+            if user.username in existing_usernames:
+                pending_lines.append(line(row, user.username, "exists", "Username já está em uso"))
+            elif user.email and user.email in existing_emails:
+                pending_lines.append(line(row, user.username, "exists", "Email já está em uso"))
+            else:
+                to_create.append((row, user))
+        # Rejeições saem primeiro; depois um bloco de linhas por lote gravado
+        if pending_lines:
+            yield "".join(pending_lines)
+
+        for start in range(0, len(to_create), USER_IMPORT_BATCH_SIZE):
+            batch = to_create[start:start + USER_IMPORT_BATCH_SIZE]
+            hashes = password_hasher.hash_many([user.password for _, user in batch])
+            results = _insert_batch(db, batch, hashes, approve)
+            yield "".join(
+                line(row, user.username, results[row]["status"], results[row].get("detail"))
+                for row, user in batch
+            )
+    finally:
+        db.close()
@@ -1,15 +1,18 @@
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 from app.models import User
 from app.schemas import UserCreate, UserUpdate
 from app.services.auth_service import AuthService
+from app.services.pagination import paginate_query, stream_query
+from app.services.principal_cache import principal_cache
 
 class UserService:
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
-        """Cria um novo usuário"""
-        hashed_password = AuthService.get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Cria um novo usuário (hashed_password: hash já calculado pelo chamador, ex.: rotas async)"""
+        if hashed_password is None:
+            hashed_password = AuthService.get_password_hash(user.password)
         db_user = User(
             username=user.username,
             email=user.email,
@@ -51,6 +54,16 @@ class UserService:
         """Busca usuário por ID"""
         return db.query(User).filter(User.id == user_id).first()
 
+    @staticmethod
+    def get_all_users(db: Session, skip: int = 0, limit: Optional[int] = None, after_id: Optional[int] = None) -> List[User]:
+        """Busca todos os usuários (limit=None retorna todos)"""
+        return paginate_query(db.query(User), User.id, skip, limit, after_id)
+
+    @staticmethod
+    def stream_all_users(db: Session) -> Iterator[List[User]]:
+        """Todos os usuários em lotes (ordem de id), para listagens em streaming"""
+        yield from stream_query(db, select(User).order_by(User.id))
+
     @staticmethod
     def get_users_by_role(db: Session, role: str, skip: int = 0, limit: int = 100) -> List[User]:
         """Busca usuários por role"""
@@ -73,6 +86,7 @@ class UserService:
                 technician.is_approved = True
                 db.commit()
                 db.refresh(technician)
+                principal_cache.invalidate(technician_id)
         return technician
 
     @staticmethod
@@ -86,6 +100,7 @@ class UserService:
                     setattr(db_user, field, value)
             db.commit()
             db.refresh(db_user)
+            principal_cache.invalidate(user_id)
         return db_user
 
     @staticmethod
@@ -96,6 +111,7 @@ class UserService:
             db_user.hashed_password = new_hashed_password
             db.commit()
             db.refresh(db_user)
+            principal_cache.invalidate(user_id)
         return db_user
 
     @staticmethod
@@ -128,6 +144,7 @@ class UserService:
             db_user.is_active = False
             db.commit()
             db.refresh(db_user)
+            principal_cache.invalidate(user_id)
         return db_user
 
     @staticmethod
@@ -138,4 +155,5 @@ class UserService:
             db_user.is_active = True
             db.commit()
             db.refresh(db_user)
+            principal_cache.invalidate(user_id)
         return db_user
@@ -42,16 +42,20 @@ if not IS_DOCKER and ENVIRONMENT == "development":
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+import hmac
 import traceback
 import logging
-import time
 from app.dependencies.database import Base, engine
+from app.services.http_cache import CachedStaticFiles
+from app.services.metrics import request_metrics
+from app.services.request_metrics import MetricsMiddleware
+from app.services.structured_logging import RequestContextMiddleware, setup_logging
+from app.services.avatar_images import shutdown_executor
+from app.services.password_hasher import PasswordHashQueueFull, password_hasher
 from app.routes import (
     auth_router,
     user_router,
@@ -65,23 +69,24 @@ from app.routes import (
 # Carregar variáveis de ambiente
 load_dotenv()
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configurar logging: JSON com request_id, escrito por uma thread em segundo plano
+# (LOG_LEVEL, LOG_FORMAT, LOG_INFO_SAMPLE_PERCENT; ver app/services/structured_logging.py)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Configurar FastAPI - desabilitar Swagger por padrão para evitar 502
 # O Swagger pode ser reabilitado definindo ENABLE_SWAGGER=true
 ENABLE_SWAGGER = os.getenv("ENABLE_SWAGGER", "false").lower() == "true"
 
+# Respostas JSON renderizadas com orjson (datetime/enum nativos) em vez de json.dumps.
+# Listagens usam schema_response/stream_json_array (app/schemas/responses.py).
 try:
     if ENABLE_SWAGGER:
         logger.info("✅ Swagger habilitado")
         app = FastAPI(
             title="Sistema de Tickets - Prefeitura", 
             version="1.0.0",
+            default_response_class=ORJSONResponse,
             docs_url="/docs",
             redoc_url="/redoc",
             openapi_url="/openapi.json"
@@ -91,6 +96,7 @@ try:
         app = FastAPI(
             title="Sistema de Tickets - Prefeitura", 
             version="1.0.0",
+            default_response_class=ORJSONResponse,
             docs_url=None,  # Desabilitar Swagger
             redoc_url=None,  # Desabilitar ReDoc
             openapi_url=None  # Desabilitar OpenAPI
@@ -101,7 +107,8 @@ except Exception as e:
     # Criar app básico se houver erro
     app = FastAPI(
         title="Sistema de Tickets - Prefeitura", 
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=ORJSONResponse
     )
 
 # Configuração de CORS (deve vir antes dos outros middlewares)
@@ -158,44 +165,20 @@ else:
         allow_headers=["*"],
     )
 
-# Middleware de logging de requisições
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log da requisição com mais detalhes
-        logger.info(f"📥 {request.method} {request.url.path} - Client: {request.client.host if request.client else 'unknown'}")
-        
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-            logger.info(f"📤 {request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
-            
-            # Log de warning se a requisição demorar muito
-            if process_time > 5.0:
-                logger.warning(f"⚠️ Requisição lenta: {request.method} {request.url.path} levou {process_time:.3f}s")
-            
-            return response
-        except Exception as e:
-            process_time = time.time() - start_time
-            logger.error(f"❌ {request.method} {request.url.path} - ERRO após {process_time:.3f}s: {e}")
-            logger.error(f"📍 Traceback: {traceback.format_exc()}")
-            raise
-
-app.add_middleware(LoggingMiddleware)
+# Métricas por rota (latência, status, tamanho, em andamento), expostas em /metrics
+app.add_middleware(MetricsMiddleware)
+# request_id (X-Request-ID) e log de acesso; fica por fora para valer em toda a requisição
+app.add_middleware(RequestContextMiddleware)
 
 # Middleware de tratamento de erros global
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Captura todos os erros não tratados"""
-    logger.error(f"❌ Erro não tratado: {exc}", exc_info=True)
-    logger.error(f"📍 Path: {request.url.path}")
-    logger.error(f"📍 Method: {request.method}")
+    # Um único registro com o traceback (formatado uma vez) e o contexto da requisição
+    logger.error("❌ Erro não tratado: %s", exc, exc_info=exc,
+                 extra={"path": request.url.path, "method": request.method})
     
-    # Log do traceback completo
-    logger.error(f"📍 Traceback: {traceback.format_exc()}")
-    
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Erro interno do servidor",
@@ -207,19 +190,30 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Trata erros HTTP"""
-    logger.warning(f"⚠️ HTTP Exception: {exc.status_code} - {exc.detail}")
-    return JSONResponse(
+    logger.warning("⚠️ HTTP Exception: %s - %s", exc.status_code, exc.detail, extra={"path": request.url.path})
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail}
     )
 
+@app.exception_handler(PasswordHashQueueFull)
+async def password_hash_queue_full_handler(request: Request, exc: PasswordHashQueueFull):
+    """Fila de bcrypt cheia: pede para o cliente tentar de novo em instantes"""
+    logger.warning("⚠️ Fila de hash de senha cheia: %s", request.url.path)
+    return ORJSONResponse(
+        status_code=429,
+        content={"detail": "Muitas requisições de autenticação, tente novamente em instantes"},
+        headers={"Retry-After": "1"}
+    )
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Trata erros de validação"""
-    logger.warning(f"⚠️ Validação falhou: {exc.errors()}")
-    return JSONResponse(
+    errors = exc.errors()
+    logger.warning("⚠️ Validação falhou: %s", errors, extra={"path": request.url.path})
+    return ORJSONResponse(
         status_code=422,
-        content={"detail": exc.errors()}
+        content={"detail": errors}
     )
 
 # Inicializa o banco ao iniciar o app (usando startup event)
@@ -242,6 +236,12 @@ async def startup_event():
     
     logger.info("🌐 Servidor pronto para receber requisições!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Evento executado ao encerrar o servidor"""
+    shutdown_executor()
+    password_hasher.shutdown()
+
 # Root endpoint (definir primeiro para garantir que sempre funcione)
 @app.get("/")
 def root():
@@ -268,7 +268,7 @@ async def get_openapi_schema():
         logger.error(f"❌ Erro ao gerar schema OpenAPI: {e}")
         logger.error(f"📍 Traceback: {traceback.format_exc()}")
         # Retornar schema mínimo em caso de erro
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=200,  # Retornar 200 mesmo com erro para evitar 502
             content={
                 "openapi": "3.1.0",
@@ -323,6 +323,19 @@ def health_check():
         "message": "Server is running"
     }
 
+# Métricas no formato do Prometheus. Com METRICS_TOKEN definido, exige
+# "Authorization: Bearer <token>" (configure o mesmo token no scrape).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    """Métricas HTTP do processo (cada worker expõe as suas)"""
+    if METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+            return PlainTextResponse("Não autorizado\n", status_code=401)
+    return PlainTextResponse(request_metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Endpoint de teste simples (sem banco de dados)
 @app.get("/test")
 def test_endpoint():
@@ -382,7 +395,7 @@ except Exception as e:
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
 STATIC_DIR.mkdir(parents=True, exist_ok=True)
-app.mount('/static', StaticFiles(directory=str(STATIC_DIR)), name='static')
+app.mount('/static', CachedStaticFiles(directory=str(STATIC_DIR)), name='static')
 
 # Rodar servidor diretamente
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Reprocessa os avatares existentes: WebP sem metadados (EXIF/GPS) + miniaturas
+
+- Avatares que ainda são o arquivo enviado (qualquer extensão que não .webp, inclusive os
+  legados static/avatars/<uuid>.<ext>) são regravados como <user_id>-<sha256>.webp pelo
+  mesmo pipeline do upload; users.avatar_url é atualizado e o original é apagado.
+- Gera as miniaturas ausentes em paralelo num pool de processos.
+- --force reprocessa todos, inclusive .webp enviados antes do pipeline remover metadados.
+- Avatar que não decodifica como imagem é apenas reportado.
+
+Uso: python scripts/backfill_avatar_thumbnails.py [--force] [--workers 4]
+"""
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from app.dependencies.database import SessionLocal, engine
+from app.models import Base, User
+from app.models.models import AVATAR_FILENAME, AVATAR_THUMBNAIL_SIZES
+from app.controllers.avatar_controller import AVATAR_DIR, avatar_filename
+from app.services.avatar_images import render_avatar, thumbnail_path, InvalidImageError
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backfill(force: bool, workers: int) -> bool:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    converted = missing = failed = 0
+    pending = []
+    try:
+        users = db.query(User).filter(User.avatar_url != None).order_by(User.id).all()
+        for user in users:
+            path = Path(user.avatar_url.lstrip("/"))
+            if not path.exists():
+                missing += 1
+                print(f"⚠️ Usuário {user.id}: arquivo ausente {path}")
+                continue
+            if AVATAR_FILENAME.match(path.name):
+                sha256 = path.stem.split("-", 1)[1]
+            else:
+                sha256 = hash_file(path)
+            dest = AVATAR_DIR / avatar_filename(user.id, sha256, ".webp")
+            if force or path != dest or not all(thumbnail_path(dest, size).exists() for size in AVATAR_THUMBNAIL_SIZES):
+                pending.append((user, path, dest))
+
+        with ProcessPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = {
+                executor.submit(render_avatar, str(path), str(dest)): (user, path, dest)
+                for user, path, dest in pending
+            }
+            for future in as_completed(futures):
+                user, path, dest = futures[future]
+                try:
+                    future.result()
+                except InvalidImageError as e:
+                    failed += 1
+                    print(f"⚠️ Usuário {user.id}: imagem inválida ({e})")
+                    continue
+                if path != dest:
+                    user.avatar_url = f"/static/avatars/{dest.name}"
+                    db.commit()
+                    # Original com metadados: removido só depois que a URL nova foi gravada
+                    path.unlink(missing_ok=True)
+                    converted += 1
+
+        print(f"✅ {len(pending) - failed} avatar(es) processado(s), {converted} convertido(s) para WebP, "
+              f"{missing} ausente(s), {failed} inválido(s)")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao gerar miniaturas: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    sys.exit(0 if backfill(args.force, args.workers) else 1)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Script para copiar os anexos do JSON legado (tickets.attachments) para a tabela ticket_attachments
+
+Idempotente: anexos já presentes (mesmo stored_filename) são ignorados.
+
+Uso: python scripts/backfill_ticket_attachments.py
+"""
+import sys
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from app.dependencies.database import SessionLocal, engine
+from app.models import Base
+from app.services.attachment_service import AttachmentService
+
+
+def backfill_ticket_attachments() -> bool:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        created = AttachmentService.backfill_from_json(db)
+        print(f"✅ {created} anexo(s) copiado(s) para ticket_attachments")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao copiar anexos: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if backfill_ticket_attachments() else 1)
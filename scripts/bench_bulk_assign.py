@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N atribuições individuais x uma chamada em massa (/admin/tickets/bulk)
+
+Roda os controllers em processo sobre um SQLite em arquivo temporário (commits reais em
+disco) e mede tempo, statements SQL e COMMITs de:
+- N chamadas a AdminController.assign_ticket_to_technician (uma sessão por "requisição");
+- uma chamada a AdminController.bulk_update_tickets com os mesmos N tickets.
+O custo de HTTP das N requisições individuais não entra na conta (só favorece o modo antigo).
+
+Uso: python scripts/bench_bulk_assign.py [--tickets 500]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, Ticket, TicketHistory, RoleEnum, StatusEnum
+from app.schemas import TicketBulkRequest, TicketBulkOperation
+from app.controllers import AdminController
+
+ADMIN_ID, TECH_ID = 1, 2
+
+
+def setup(path: Path, n_tickets: int):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        User(id=ADMIN_ID, username="admin", full_name="Admin", role=RoleEnum.admin, is_active=True, is_approved=True),
+        User(id=TECH_ID, username="tecnico", full_name="Técnico", role=RoleEnum.technician, is_active=True, is_approved=True),
+    ])
+    db.add_all([
+        Ticket(title=f"Ticket {i}", description="Descrição", problem_type="hardware", location="Sala 1",
+               status=StatusEnum.open, user_id=ADMIN_ID)
+        for i in range(n_tickets)
+    ])
+    db.commit()
+    ticket_ids = [row[0] for row in db.query(Ticket.id).order_by(Ticket.id)]
+    db.close()
+    return engine, SessionLocal, ticket_ids
+
+
+def measure(engine, fn):
+    """Executa fn() e retorna (segundos, statements, commits)"""
+    counters = {"statements": 0, "commits": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counters["statements"] += 1
+
+    def on_commit(conn):
+        counters["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "commit", on_commit)
+    start = time.perf_counter()
+    try:
+        fn()
+    finally:
+        elapsed = time.perf_counter() - start
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine, "commit", on_commit)
+    return elapsed, counters["statements"], counters["commits"]
+
+
+def check(SessionLocal, n_tickets: int):
+    """Confere que todos os tickets ficaram atribuídos e com uma linha de histórico"""
+    db = SessionLocal()
+    try:
+        assigned = db.query(func.count(Ticket.id)).filter(Ticket.assigned_technician_id == TECH_ID).scalar()
+        history = db.query(func.count(TicketHistory.id)).scalar()
+    finally:
+        db.close()
+    return assigned == n_tickets and history == n_tickets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, SessionLocal, ticket_ids = setup(Path(tmp) / "individual.db", args.tickets)
+
+        def individual():
+            for ticket_id in ticket_ids:
+                db = SessionLocal()
+                try:
+                    AdminController.assign_ticket_to_technician(db, ticket_id, TECH_ID)
+                finally:
+                    db.close()
+
+        single = measure(engine, individual)
+        single_ok = check(SessionLocal, args.tickets)
+        engine.dispose()
+
+        engine, SessionLocal, ticket_ids = setup(Path(tmp) / "bulk.db", args.tickets)
+
+        def bulk():
+            db = SessionLocal()
+            try:
+                admin = db.get(User, ADMIN_ID)
+                request = TicketBulkRequest(operation=TicketBulkOperation.assign, ticket_ids=ticket_ids, technician_id=TECH_ID)
+                AdminController.bulk_update_tickets(db, request, admin)
+            finally:
+                db.close()
+
+        batch = measure(engine, bulk)
+        bulk_ok = check(SessionLocal, args.tickets)
+        engine.dispose()
+
+    print(f"Atribuição de {args.tickets} tickets")
+    print(f"{'modo':<14} {'tempo':>9} {'statements':>11} {'commits':>8}")
+    for label, (elapsed, statements, commits), ok in (("individual", single, single_ok), ("bulk", batch, bulk_ok)):
+        print(f"{label:<14} {elapsed * 1000:>7.0f}ms {statements:>11} {commits:>8}{'' if ok else '  ❌ resultado incorreto'}")
+    print(f"bulk {single[0] / batch[0]:.1f}x mais rápido")
+    return 0 if single_ok and bulk_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Rajada de logins x latência de uma rota comum, sem servidor nem rede
+
+Reproduz, dentro do processo, o cenário de início de turno: `--logins` POST /login
+simultâneos enquanto uma sonda chama repetidamente uma rota síncrona sem autenticação
+(que precisa de uma thread do threadpool do Starlette, ~40 no total). Compara:
+- "login sync": rota `def` com verify bloqueante (como era), limite de espera workers * 8;
+- "login async": rota `async def` com await verify_async (como está agora).
+No primeiro caso as threads presas esperando bcrypt atrasam a sonda; no segundo ela não
+deveria sentir a rajada. Para medir contra um servidor de verdade use bench_login_burst.py.
+
+Uso: python scripts/bench_hasher_starvation.py [--logins 200] [--workers 4] [--rounds 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * fraction) - 1, 0)] * 1000 if values else 0.0
+
+
+def make_app(hasher, hashed: str):
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+    from app.services.password_hasher import PasswordHashQueueFull
+
+    app = FastAPI()
+
+    @app.exception_handler(PasswordHashQueueFull)
+    async def queue_full(request, exc):
+        return JSONResponse(status_code=429, content={"detail": "fila cheia"})
+
+    @app.post("/login-sync")
+    def login_sync():
+        return {"ok": hasher.verify("segredo", hashed)}
+
+    @app.post("/login-async")
+    async def login_async():
+        return {"ok": await hasher.verify_async("segredo", hashed)}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    return app
+
+
+async def call(app, method: str, path: str) -> int:
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def burst(app, login_path: str, n_logins: int):
+    statuses, probe_latencies = Counter(), []
+    done = asyncio.Event()
+
+    async def login():
+        statuses[await call(app, "POST", login_path)] += 1
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await call(app, "GET", "/health")
+            probe_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(0.3)
+    baseline = list(probe_latencies)
+    probe_latencies.clear()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(n_logins)))
+    wall = time.perf_counter() - start
+    done.set()
+    await prober
+    return wall, statuses, baseline, probe_latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=10, help="BCRYPT_ROUNDS do hash de teste")
+    args = parser.parse_args()
+
+    os.environ.setdefault("BCRYPT_ROUNDS", str(args.rounds))
+    from app.services.password_hasher import PasswordHasher
+
+    scenarios = {
+        # Antes: rota sync e até workers * 8 threads esperando bcrypt
+        "login sync": ("/login-sync", PasswordHasher(args.workers, args.workers * 8, "process", args.workers * 8)),
+        # Agora: rota async; a espera não segura thread
+        "login async": ("/login-async", PasswordHasher(args.workers, args.workers * 8, "process")),
+    }
+    hashed = scenarios["login sync"][1].hash("segredo")
+
+    print(f"{args.logins} logins simultâneos, {args.workers} workers de bcrypt (BCRYPT_ROUNDS={os.environ['BCRYPT_ROUNDS']})")
+    for label, (path, hasher) in scenarios.items():
+        hasher.verify("segredo", hashed)  # sobe os processos do pool antes de medir
+        wall, statuses, baseline, probes = asyncio.run(burst(make_app(hasher, hashed), path, args.logins))
+        hasher.shutdown()
+        print(f"  {label:<12} {wall:5.1f}s  status {dict(statuses)}")
+        print(f"    sonda GET /health: sem carga p50 {percentile(baseline, 0.5):.1f}ms | durante a rajada "
+              f"p50 {statistics.median(probes) * 1000 if probes else 0.0:.1f}ms  p95 {percentile(probes, 0.95):.1f}ms  "
+              f"máx {percentile(probes, 1.0):.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
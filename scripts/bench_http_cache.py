@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark de bytes transferidos num reload típico do dashboard
+
+Simula um navegador com cache HTTP (respeita Cache-Control, envia If-None-Match) carregando
+uma página com N avatares e M anexos, e depois recarregando. Compara:
+
+- antes: StaticFiles padrão nos avatares (nome aleatório, sem Cache-Control) e FileResponse
+  simples no download de anexos (sem ETag pelo hash, sem 304, sem Range);
+- depois: CachedStaticFiles (avatar endereçado por conteúdo = imutável) e cached_file_response
+  (ETag forte, 304 e Range).
+
+Também mede a retomada de um download de PDF interrompido na metade.
+
+Uso: python scripts/bench_http_cache.py [--avatars 30] [--attachments 5] [--pdf-mb 8]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Mount, Route
+from app.services.http_cache import CachedStaticFiles, cached_file_response, strong_etag
+
+
+async def asgi_get(app, path: str, headers: dict) -> tuple:
+    """GET in-process: retorna (status, headers, bytes do corpo, bytes de cabeçalho)"""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+    messages = []
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    body = sum(len(m.get("body", b"")) for m in messages if m["type"] == "http.response.body")
+    response_headers = {k.decode(): v.decode() for k, v in start["headers"]}
+    header_bytes = sum(len(k) + len(v) + 4 for k, v in start["headers"]) + 17
+    return start["status"], response_headers, body, header_bytes
+
+
+class Browser:
+    """Cache HTTP mínimo: frescor por max-age e revalidação por ETag"""
+
+    def __init__(self):
+        self.cache = {}
+        self.requests = 0
+        self.bytes = 0
+
+    async def get(self, app, path: str):
+        entry = self.cache.get(path)
+        if entry and "max-age=31536000" in entry.get("cache-control", ""):
+            return  # Fresco: nem faz a requisição
+        headers = {"if-none-match": entry["etag"]} if entry and "etag" in entry else {}
+        status, response_headers, body, header_bytes = await asgi_get(app, path, headers)
+        self.requests += 1
+        self.bytes += body + header_bytes
+        if status == 200:
+            self.cache[path] = response_headers
+
+
+def build_apps(static_dir: Path, attachments: dict):
+    async def old_download(request: Request):
+        name = request.path_params["name"]
+        return FileResponse(static_dir / "attachments" / name, filename=name)
+
+    async def new_download(request: Request):
+        name = request.path_params["name"]
+        return cached_file_response(
+            request, static_dir / "attachments" / name, etag=strong_etag(attachments[name]), filename=name
+        )
+
+    before = Starlette(routes=[
+        Route("/download/{name}", old_download),
+        Mount("/static", StaticFiles(directory=str(static_dir))),
+    ])
+    after = Starlette(routes=[
+        Route("/download/{name}", new_download),
+        Mount("/static", CachedStaticFiles(directory=str(static_dir))),
+    ])
+    return before, after
+
+
+async def page_load(browser: Browser, app, avatar_urls, attachment_urls):
+    for url in avatar_urls + attachment_urls:
+        await browser.get(app, url)
+
+
+async def resume_bytes(app, url: str, size: int) -> int:
+    """Bytes para concluir um download interrompido na metade (Range quando suportado)"""
+    status, headers, body, header_bytes = await asgi_get(app, url, {"range": f"bytes={size // 2}-"})
+    return body + header_bytes
+
+
+async def main_async(avatars: int, attachments: int, pdf_mb: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        static_dir = Path(tmp)
+        (static_dir / "avatars").mkdir()
+        (static_dir / "attachments").mkdir()
+
+        old_avatar_urls, new_avatar_urls = [], []
+        for user_id in range(1, avatars + 1):
+            content = os.urandom(40 * 1024)
+            sha256 = hashlib.sha256(content).hexdigest()
+            (static_dir / "avatars" / f"old{user_id}.jpg").write_bytes(content)
+            (static_dir / "avatars" / f"{user_id}-{sha256}.jpg").write_bytes(content)
+            old_avatar_urls.append(f"/static/avatars/old{user_id}.jpg")
+            new_avatar_urls.append(f"/static/avatars/{user_id}-{sha256}.jpg")
+
+        hashes = {}
+        for i in range(attachments):
+            content = os.urandom(pdf_mb * 1024 * 1024 if i == 0 else 300 * 1024)
+            name = f"anexo{i}.pdf"
+            (static_dir / "attachments" / name).write_bytes(content)
+            hashes[name] = hashlib.sha256(content).hexdigest()
+        attachment_urls = [f"/download/{name}" for name in hashes]
+
+        before, after = build_apps(static_dir, hashes)
+        results = {}
+        for label, app, avatar_urls in (("antes", before, old_avatar_urls), ("depois", after, new_avatar_urls)):
+            browser = Browser()
+            await page_load(browser, app, avatar_urls, attachment_urls)
+            cold = browser.bytes
+            browser.bytes = browser.requests = 0
+            await page_load(browser, app, avatar_urls, attachment_urls)
+            resume = await resume_bytes(app, attachment_urls[0], pdf_mb * 1024 * 1024)
+            results[label] = (cold, browser.bytes, browser.requests, resume)
+
+        print(f"{avatars} avatares (40KB), {attachments} anexos (1 PDF de {pdf_mb}MB)")
+        print(f"{'':8} {'1ª carga':>12} {'reload':>12} {'reqs reload':>12} {'retomada PDF':>14}")
+        for label, (cold, reload, requests, resume) in results.items():
+            print(f"{label:8} {cold / 1024:>10.0f}KB {reload / 1024:>10.1f}KB {requests:>12} {resume / 1024:>12.0f}KB")
+        saved = results["antes"][1] - results["depois"][1]
+        print(f"Economia no reload: {saved / 1024:.0f}KB "
+              f"({saved / max(results['antes'][1], 1) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--avatars", type=int, default=30)
+    parser.add_argument("--attachments", type=int, default=5)
+    parser.add_argument("--pdf-mb", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.avatars, args.attachments, args.pdf_mb))
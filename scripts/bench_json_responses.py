@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Renderização de respostas JSON: JSONResponse x ORJSONResponse, lista x streaming
+
+1) Conteúdo de rotas sem schema_response (dicts com datetime/enum, ex.: exception handlers e
+   rotas que devolvem dicts): tempo de render com JSONResponse (json.dumps) e com
+   ORJSONResponse (classe padrão do app).
+2) /admin/usuarios sem limite com `--users` usuários num SQLite em arquivo: memória de pico
+   (tracemalloc) e tempo de schema_response(lista inteira) x stream_json_array (lotes do
+   cursor). As duas saídas precisam ser o mesmo JSON.
+
+Uso: python scripts/bench_json_responses.py [--users 50000] [--iterations 200]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, RoleEnum, StatusEnum
+from app.schemas import UserResponse, schema_response
+from app.services.user_service import UserService
+from app.controllers import AdminController
+import app.dependencies.database as database
+
+
+def per_call_ms(fn, iterations: int) -> float:
+    fn()  # aquecimento
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def bench_render(iterations: int):
+    now = datetime.utcnow()
+    content = jsonable_encoder([
+        {"id": i, "status": StatusEnum.in_progress, "title": f"Ticket {i}", "created_at": now - timedelta(minutes=i),
+         "tags": ["hardware", "rede"], "assigned_by_admin": i % 2 == 0}
+        for i in range(1000)
+    ])
+    results = {
+        "JSONResponse": per_call_ms(lambda: JSONResponse(content).body, iterations),
+        "ORJSONResponse": per_call_ms(lambda: ORJSONResponse(content).body, iterations),
+    }
+    assert json.loads(JSONResponse(content).body) == json.loads(ORJSONResponse(content).body)
+    print(f"Render de 1000 itens ({iterations} iterações)")
+    for label, ms in results.items():
+        print(f"  {label:<15} {ms:7.3f}ms")
+
+
+def measure(fn):
+    """Executa fn() e retorna (resultado, segundos, pico de memória em MiB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def bench_stream(n_users: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'users.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User), [
+                {"username": f"usuario{i}", "email": f"usuario{i}@prefeitura.gov.br", "full_name": f"Usuário {i}",
+                 "role": RoleEnum.servidor, "is_active": True, "is_approved": True, "department": "Secretaria",
+                 "notes": "Observações. " * 10}
+                for i in range(n_users)
+            ])
+        SessionLocal = sessionmaker(bind=engine)
+        database.SessionLocal = SessionLocal  # o streaming abre a própria sessão
+
+        def full_list():
+            db = SessionLocal()
+            try:
+                return schema_response([UserResponse.from_orm(u) for u in UserService.get_all_users(db)]).body
+            finally:
+                db.close()
+
+        async def consume(response):
+            return b"".join([chunk async for chunk in response.body_iterator])
+
+        def streamed():
+            import asyncio
+            return asyncio.run(consume(AdminController.stream_all_users()))
+
+        before, before_s, before_mib = measure(full_list)
+        after, after_s, after_mib = measure(streamed)
+        assert json.loads(before) == json.loads(after), "lista e streaming deveriam gerar o mesmo JSON"
+        engine.dispose()
+
+    print(f"/admin/usuarios com {n_users} usuários ({len(before) / 2**20:.1f} MiB de JSON)")
+    print(f"  lista      {before_s * 1000:8.0f}ms  pico {before_mib:7.1f} MiB")
+    print(f"  streaming  {after_s * 1000:8.0f}ms  pico {after_mib:7.1f} MiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    bench_render(args.iterations)
+    bench_stream(args.users)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
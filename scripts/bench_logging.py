@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Custo de logging por requisição: basicConfig síncrono x fila (QueueHandler/QueueListener)
+
+Simula o que uma requisição logava antes (duas linhas INFO com f-string e emoji no
+LoggingMiddleware) e o que loga agora (uma linha de acesso estruturada com request_id),
+com a saída num arquivo de verdade. Mede só o tempo gasto na thread da "requisição":
+- antes: basicConfig + StreamHandler, escrita síncrona;
+- fila: setup_logging (JSON formatado e escrito pela thread do QueueListener);
+- fila com LOG_INFO_SAMPLE_PERCENT=10.
+Também mede um erro (traceback), formatado três vezes antes e uma agora.
+
+Uso: python scripts/bench_logging.py [--requests 20000]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import traceback
+import uuid
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from app.services.structured_logging import request_id_var, setup_logging, stop_logging
+
+logger = logging.getLogger("bench")
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def legacy_request(i: int):
+    path, client = f"/tickets/{i}", "127.0.0.1"
+    logger.info(f"📥 GET {path} - Client: {client}")
+    logger.info(f"📤 GET {path} - 200 - {0.012:.3f}s")
+
+
+def structured_request(i: int):
+    request_id_var.set(uuid.uuid4().hex)
+    logger.info("request", extra={"method": "GET", "route": "/tickets/{ticket_id}", "status": 200, "duration_ms": 12.0})
+
+
+def legacy_error(exc: Exception):
+    logger.error(f"❌ Erro não tratado: {exc}", exc_info=True)
+    logger.error(f"📍 Path: /tickets/1")
+    logger.error(f"📍 Method: GET")
+    logger.error(f"📍 Traceback: {traceback.format_exc()}")
+
+
+def structured_error(exc: Exception):
+    logger.error("❌ Erro não tratado: %s", exc, exc_info=exc, extra={"path": "/tickets/1", "method": "GET"})
+
+
+def per_call_us(fn, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1_000_000
+
+
+def error_us(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        try:
+            raise ValueError("falha simulada")
+        except ValueError as exc:
+            fn(exc)
+    return (time.perf_counter() - start) / n * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    n, n_errors = args.requests, max(args.requests // 20, 1)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "antes.log"), "w") as stream:
+            reset_root()
+            logging.basicConfig(level=logging.INFO, stream=stream,
+                                format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', force=True)
+            results["antes"] = (per_call_us(legacy_request, n), error_us(legacy_error, n_errors))
+            reset_root()
+
+        for label, percent in (("fila", 100), ("fila 10%", 10)):
+            with open(os.path.join(tmp, f"{percent}.log"), "w") as stream:
+                setup_logging(level="INFO", log_format="json", sample_percent=percent, stream=stream)
+                request_us = per_call_us(structured_request, n)
+                results[label] = (request_us, error_us(structured_error, n_errors))
+                stop_logging()  # esvazia a fila antes de fechar o arquivo
+                reset_root()
+
+    print(f"Logging por requisição ({n} requisições, {n_errors} erros; tempo na thread da requisição)")
+    for label, (request_us, err_us) in results.items():
+        print(f"  {label:<9} {request_us:7.1f}µs/requisição  {err_us:8.1f}µs/erro")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Rajada de logins x latência das demais rotas
+
+Dispara `--logins` POST /login simultâneos (início de turno) e, durante a rajada, mede a
+latência de uma rota comum (`--probe`, padrão /health, que é `def` e disputa o threadpool
+com as demais rotas síncronas). Com /login async e o pool dedicado de bcrypt a sonda deve
+continuar rápida; logins acima de PASSWORD_HASH_MAX_PENDING recebem 429.
+Versão sem servidor (comparando rota sync x async): scripts/bench_hasher_starvation.py.
+
+Uso:
+    python scripts/bench_login_burst.py http://127.0.0.1:8000 --username joao --password segredo \\
+        --logins 200 --concurrency 100 [--probe /admin/tickets?limit=20 --token <JWT>]
+"""
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * fraction) - 1, 0)] * 1000 if values else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base_url")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--probe", default="/health")
+    parser.add_argument("--token", default=None, help="JWT para a rota de sonda")
+    args = parser.parse_args()
+
+    base = args.base_url.rstrip("/")
+    probe_headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    statuses, login_latencies, probe_latencies = Counter(), [], []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login(_):
+        start = time.perf_counter()
+        try:
+            code = requests.post(f"{base}/login", json={"username": args.username, "password": args.password}, timeout=60).status_code
+        except requests.RequestException:
+            code = "erro"
+        with lock:
+            statuses[code] += 1
+            login_latencies.append(time.perf_counter() - start)
+
+    def probe():
+        session = requests.Session()
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                session.get(f"{base}{args.probe}", headers=probe_headers, timeout=60)
+            except requests.RequestException:
+                pass
+            probe_latencies.append(time.perf_counter() - start)
+            time.sleep(0.02)
+
+    # Linha de base da sonda sem carga
+    prober = threading.Thread(target=probe)
+    prober.start()
+    time.sleep(1)
+    baseline = list(probe_latencies)
+    probe_latencies.clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(login, range(args.logins)))
+    wall = time.perf_counter() - start
+    done.set()
+    prober.join()
+
+    print(f"{args.logins} logins em {wall:.1f}s — status: {dict(statuses)}")
+    print(f"login  p50 {statistics.median(login_latencies) * 1000:.0f}ms  p95 {percentile(login_latencies, 0.95):.0f}ms")
+    print(f"sonda {args.probe}: sem carga p50 {percentile(baseline, 0.5):.0f}ms | "
+          f"durante a rajada p50 {percentile(probe_latencies, 0.5):.0f}ms  p95 {percentile(probe_latencies, 0.95):.0f}ms  "
+          f"máx {percentile(probe_latencies, 1.0):.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
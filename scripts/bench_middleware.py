@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Custo por requisição do middleware: LoggingMiddleware (BaseHTTPMiddleware) x MetricsMiddleware
+
+Chama o app ASGI direto (sem servidor nem rede) com uma rota trivial, para que a diferença
+medida seja só a do middleware. O LoggingMiddleware antigo é reproduzido aqui, com o
+logging indo para um handler nulo (o custo real de escrever no stderr fica de fora).
+
+Uso: python scripts/bench_middleware.py [--requests 20000]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.services.metrics import RequestMetrics
+from app.services.request_metrics import MetricsMiddleware
+
+logger = logging.getLogger("bench_middleware")
+logger.addHandler(logging.NullHandler())
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+class LoggingMiddleware(BaseHTTPMiddleware):
+    """Como estava em main.py"""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        logger.info(f"📥 {request.method} {request.url.path} - Client: {request.client.host if request.client else 'unknown'}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(f"📤 {request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
+        if process_time > 5.0:
+            logger.warning(f"⚠️ Requisição lenta: {request.method} {request.url.path} levou {process_time:.3f}s")
+        return response
+
+
+def make_app(middleware=None, **options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/tickets/{ticket_id}")
+    def get_ticket(ticket_id: int):
+        return {"id": ticket_id, "title": "Computador não liga", "status": "open"}
+
+    if middleware is not None:
+        app.add_middleware(middleware, **options)
+    return app
+
+
+async def run(app, n_requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/tickets/{i}", "raw_path": f"/tickets/{i}".encode(),
+            "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+
+    for i in range(200):  # aquecimento
+        await app(scope(i), receive, send)
+    start = time.perf_counter()
+    for i in range(n_requests):
+        await app(scope(i), receive, send)
+    return (time.perf_counter() - start) / n_requests * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    metrics = RequestMetrics()
+    apps = {
+        "sem middleware": make_app(),
+        "LoggingMiddleware": make_app(LoggingMiddleware),
+        "MetricsMiddleware": make_app(MetricsMiddleware, metrics=metrics),
+    }
+    results = {label: asyncio.run(run(app, args.requests)) for label, app in apps.items()}
+
+    print(f"{args.requests} requisições GET /tickets/{{ticket_id}}")
+    base = results["sem middleware"]
+    for label, us in results.items():
+        print(f"  {label:<18} {us:7.1f}µs/req  (+{us - base:6.1f}µs)")
+    assert 'route="/tickets/{ticket_id}"' in metrics.render_prometheus(), "a rota deveria aparecer pelo template"
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
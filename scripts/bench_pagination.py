@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark de paginação: offset (skip/limit) vs keyset (cursor) na página 1 e na página 500
+
+Uso: python scripts/bench_pagination.py [--tickets 60000] [--page-size 100] [--db sqlite:///./bench_pagination.db]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, Ticket, RoleEnum, StatusEnum, PriorityEnum
+from app.services.ticket_service import TicketService
+
+
+def seed(engine, n_tickets: int):
+    """Insere usuários e tickets em lote (apenas se a tabela estiver vazia)"""
+    with engine.begin() as conn:
+        if conn.execute(Ticket.__table__.select().limit(1)).first():
+            return
+        conn.execute(insert(User.__table__), [
+            {"id": 1, "username": "servidor", "full_name": "Servidor", "role": RoleEnum.servidor,
+             "is_active": True, "is_approved": True, "created_at": datetime.utcnow()},
+        ])
+        now = datetime.utcnow()
+        batch = []
+        for i in range(n_tickets):
+            batch.append({
+                "title": f"Ticket {i}", "description": "Descrição", "problem_type": "hardware",
+                "location": "Sala 1", "priority": PriorityEnum.medium, "status": StatusEnum.open,
+                "created_at": now, "updated_at": now, "user_id": 1, "assigned_by_admin": False,
+            })
+            if len(batch) == 10000:
+                conn.execute(insert(Ticket.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Ticket.__table__), batch)
+
+
+def timed(fn, repeat: int = 5) -> float:
+    """Melhor tempo (ms) entre `repeat` execuções"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=60000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--page", type=int, default=500)
+    parser.add_argument("--db", default="sqlite:///./bench_pagination.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.tickets)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    size = args.page_size
+    skip = (args.page - 1) * size
+    # Cursor da página N = id do último item da página N-1
+    after_id = TicketService.get_all_tickets(db, skip - 1, 1)[0].id
+
+    def offset_page(page_skip):
+        db.expunge_all()
+        TicketService.get_all_tickets(db, page_skip, size)
+
+    def cursor_page(page_after_id):
+        db.expunge_all()
+        TicketService.get_all_tickets(db, 0, size, page_after_id)
+
+    results = [
+        ("offset", 1, timed(lambda: offset_page(0))),
+        ("offset", args.page, timed(lambda: offset_page(skip))),
+        ("cursor", 1, timed(lambda: cursor_page(None))),
+        ("cursor", args.page, timed(lambda: cursor_page(after_id))),
+    ]
+    db.close()
+
+    print(f"{'modo':<8} {'página':>7} {'ms':>9}")
+    for mode, page, ms in results:
+        print(f"{mode:<8} {page:>7} {ms:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
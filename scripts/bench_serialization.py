@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Custo de serialização de uma página de /admin/tickets?limit=100 (antes x depois)
+
+Mede só a etapa ORM -> JSON para 100 tickets já carregados (com usuário e técnico):
+- antes: TicketResponse.from_orm com o email revalidado em cada usuário aninhado, seguido do
+  caminho do FastAPI para response_model (model_dump -> nova validação -> serialização -> json.dumps);
+- depois: TicketResponse.from_orm uma vez (schemas de resposta sem validador de email) e
+  schema_response (pydantic-core direto para JSON).
+
+Uso: python scripts/bench_serialization.py [--iterations 200]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from email_validator import validate_email
+from pydantic import TypeAdapter, field_validator
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, User, Ticket, RoleEnum, StatusEnum
+from app.schemas import TicketResponse, UserResponse, schema_response
+from app.services.ticket_service import TicketService
+
+PAGE_SIZE = 100
+
+
+class LegacyUserResponse(UserResponse):
+    """UserResponse como era antes: herdava o validador de email de UserBase"""
+
+    @field_validator("email")
+    @classmethod
+    def validate_email_relaxed(cls, value: Optional[str]) -> Optional[str]:
+        if value is None or value == "":
+            return None
+        return validate_email(value, check_deliverability=False).normalized
+
+
+class LegacyTicketResponse(TicketResponse):
+    user: LegacyUserResponse
+    assigned_technician: Optional[LegacyUserResponse] = None
+
+
+def seed(db):
+    users = [
+        User(id=i, username=f"usuario{i}", email=f"usuario{i}@prefeitura.gov.br", full_name=f"Usuário {i}",
+             role=RoleEnum.technician if i % 5 == 0 else RoleEnum.servidor, is_active=True, is_approved=True)
+        for i in range(1, 51)
+    ]
+    db.add_all(users)
+    db.add_all([
+        Ticket(title=f"Ticket {i}", description="Descrição do problema", problem_type="hardware", location="Sala 1",
+               status=StatusEnum.in_progress, user_id=1 + i % 50, assigned_technician_id=5 * (1 + i % 10))
+        for i in range(PAGE_SIZE)
+    ])
+    db.commit()
+
+
+def per_call_ms(fn, iterations: int) -> float:
+    fn()  # aquecimento
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db)
+    tickets = TicketService.get_all_tickets(db, 0, PAGE_SIZE)
+    legacy_adapter = TypeAdapter(List[LegacyTicketResponse])
+
+    def before():
+        # Rota: from_orm; FastAPI: model_dump -> validate(response_model) -> serialize -> json.dumps
+        content = [LegacyTicketResponse.from_orm(ticket) for ticket in tickets]
+        dumped = [item.model_dump(by_alias=True) for item in content]
+        validated = legacy_adapter.validate_python(dumped)
+        return json.dumps(legacy_adapter.dump_python(validated, mode="json"), ensure_ascii=False).encode()
+
+    def after():
+        return schema_response([TicketResponse.from_orm(ticket) for ticket in tickets]).body
+
+    assert json.loads(before()) == json.loads(after()), "as duas serializações deveriam gerar o mesmo JSON"
+
+    results = {"antes": per_call_ms(before, args.iterations), "depois": per_call_ms(after, args.iterations)}
+    db.close()
+
+    print(f"Serialização de {len(tickets)} tickets ({args.iterations} iterações)")
+    for label, ms in results.items():
+        print(f"  {label:<7} {ms:7.2f}ms/página")
+    print(f"  {results['antes'] / results['depois']:.1f}x mais rápido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Listagem /tech/tickets com e sem ?fields= (payload, colunas selecionadas e latência)
+
+Carrega `--tickets` tickets de técnicos com perfil completo (certificações, observações,
+especialidades) num SQLite em memória e mede, para uma página de `--limit` tickets do
+técnico, a consulta + serialização (schema_response) em três modos:
+- completo: TicketResponse, o padrão (usuários inteiros aninhados);
+- summary: ?fields=summary (TicketSummary, usuários em id/full_name/avatar_url);
+- esparso: ?fields=id,title,status,priority,assigned_technician.
+
+Uso: python scripts/bench_ticket_fields.py [--tickets 5000] [--limit 100] [--iterations 200]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, User, Ticket, RoleEnum, StatusEnum
+from app.schemas import TicketResponse, schema_response
+from app.dependencies.fields import TicketFields
+from app.services.ticket_service import TicketService
+
+TECH_ID = 2
+MODES = {
+    "completo": None,
+    "summary": "summary",
+    "esparso": "id,title,status,priority,assigned_technician",
+}
+
+
+def seed(engine, n_tickets: int):
+    db = sessionmaker(bind=engine)()
+    profile = dict(
+        role=RoleEnum.technician, is_active=True, is_approved=True, department="Informática",
+        specialty=["hardware", "rede", "impressoras", "telefonia"], phone="(11) 5555-0000",
+        emergency_contact="Contato de emergência - (11) 5555-0001",
+        certifications="CompTIA A+, CCNA, ITIL v4 Foundation, LPIC-1. " * 8,
+        experience_years=8, availability="Seg-Sex 8h-17h", notes="Observações do gestor sobre o técnico. " * 20,
+    )
+    db.add_all([
+        User(id=1, username="servidor", email="servidor@prefeitura.gov.br", full_name="Servidor Municipal", **profile),
+        User(id=TECH_ID, username="tecnico", email="tecnico@prefeitura.gov.br", full_name="Técnico de Campo",
+             avatar_url="/uploads/avatars/tecnico.webp", **profile),
+    ])
+    db.commit()
+    db.execute(insert(Ticket), [
+        {"title": f"Computador não liga - estação {i}", "description": "Descrição detalhada do problema. " * 15,
+         "problem_type": "hardware", "location": f"Sala {i % 300}", "status": StatusEnum.in_progress,
+         "user_id": 1, "assigned_technician_id": TECH_ID}
+        for i in range(n_tickets)
+    ])
+    db.commit()
+    db.close()
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * fraction) - 1, 0)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    seed(engine, args.tickets)
+    SessionLocal = sessionmaker(bind=engine)
+
+    selected = {"columns": 0}
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def count_columns(conn, cursor, statement, parameters, context, executemany):
+        if cursor.description:
+            selected["columns"] += len(cursor.description)
+
+    def request(fields):
+        # Mesmo caminho da rota: dependency -> serviço com o schema -> schema_response
+        schema = TicketFields(fields).resolve(TicketResponse)
+        db = SessionLocal()
+        try:
+            tickets = TicketService.get_technician_assigned_tickets(db, TECH_ID, 0, args.limit, schema=schema)
+            return schema_response([schema.from_orm(ticket) for ticket in tickets]).body
+        finally:
+            db.close()
+
+    print(f"GET /tech/tickets/assigned?limit={args.limit} ({args.iterations} iterações)")
+    baseline = None
+    for label, fields in MODES.items():
+        selected["columns"] = 0
+        body = request(fields)
+        columns = selected["columns"]
+        latencies = []
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            request(fields)
+            latencies.append((time.perf_counter() - start) * 1000)
+        p95 = percentile(latencies, 0.95)
+        baseline = baseline or (len(body), p95)
+        print(f"  {label:<9} {len(body) / 1024:8.1f} KiB ({len(body) / baseline[0]:4.0%})  "
+              f"{columns:3d} colunas  p50 {percentile(latencies, 0.5):6.2f}ms  p95 {p95:6.2f}ms ({p95 / baseline[1]:4.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
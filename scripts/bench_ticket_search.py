@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca de tickets (GET /tickets/search) com muitos tickets
+
+Gera `--tickets` tickets sintéticos (vocabulário com distribuição de Zipf, 10% com
+comentários) num SQLite em arquivo temporário, ou no banco de `--database-url`
+(PostgreSQL de teste), com o índice mantido pelos triggers durante a carga. Depois mede a
+latência de TicketSearchService.search (página + trechos + total + facetas) para consultas
+de 1 a 3 termos, com e sem filtro.
+
+Uso: python scripts/bench_ticket_search.py [--tickets 1000000] [--queries 200] [--target-ms 50]
+     python scripts/bench_ticket_search.py --database-url postgresql://.../bench
+Falha (exit 1) se o p95 passar de --target-ms.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, insert, func
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, Ticket, Comment, RoleEnum, StatusEnum, PriorityEnum
+from app.services.ticket_search import TicketSearchService
+
+SYLLABLES = ["ba", "ca", "da", "fe", "ga", "li", "ma", "no", "pe", "ra", "si", "ta", "vo", "xu", "ze", "tri", "pro", "con"]
+PROBLEM_TYPES = ["hardware", "software", "rede", "impressora", "telefonia", "acesso", "email"]
+BATCH = 10000
+
+
+def make_vocabulary(rng: random.Random, size: int):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    # Zipf: a palavra de posição k aparece com peso 1/k
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def load(engine, n_tickets: int, rng: random.Random, words, weights):
+    SessionLocal = sessionmaker(bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        User(id=1, username="servidor", full_name="Servidor", role=RoleEnum.servidor, is_active=True, is_approved=True),
+        *[User(id=i, username=f"tecnico{i}", full_name=f"Técnico {i}", role=RoleEnum.technician, is_active=True, is_approved=True)
+          for i in range(2, 22)],
+    ])
+    db.commit()
+    db.close()
+
+    statuses, priorities = list(StatusEnum), list(PriorityEnum)
+    next_id = 1
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for offset in range(0, n_tickets, BATCH):
+            tickets, comments = [], []
+            for _ in range(min(BATCH, n_tickets - offset)):
+                status = rng.choice(statuses)
+                tickets.append({
+                    "id": next_id,
+                    "title": " ".join(rng.choices(words, weights, k=rng.randint(3, 6))),
+                    "description": " ".join(rng.choices(words, weights, k=rng.randint(15, 40))),
+                    "problem_type": rng.choice(PROBLEM_TYPES),
+                    "location": f"Sala {rng.randint(1, 300)}",
+                    "equipment_id": f"EQ-{rng.randint(1, 99999):05d}" if rng.random() < 0.3 else None,
+                    "status": status,
+                    "priority": rng.choice(priorities),
+                    "user_id": 1,
+                    "assigned_technician_id": None if status == StatusEnum.open else rng.randint(2, 21),
+                })
+                if rng.random() < 0.1:
+                    comments.append({
+                        "ticket_id": next_id, "author": "Técnico",
+                        "text": " ".join(rng.choices(words, weights, k=rng.randint(5, 20))),
+                    })
+                next_id += 1
+            conn.execute(insert(Ticket), tickets)
+            if comments:
+                conn.execute(insert(Comment), comments)
+            print(f"\r  carregados {offset + len(tickets)}/{n_tickets}", end="", flush=True)
+    print(f"\n  carga + indexação: {time.perf_counter() - start:.0f}s")
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * fraction) - 1, 0)] if values else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    parser.add_argument("--database-url", default=None, help="banco de teste (vazio = SQLite temporário)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    words, weights = make_vocabulary(rng, args.vocabulary)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{Path(tmp) / 'search.db'}"
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            # ticket_search não está no metadata e referencia tickets
+            conn.exec_driver_sql("DROP TABLE IF EXISTS ticket_search")
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)  # instala tabela/triggers de busca (after_create)
+        print(f"Carregando {args.tickets} tickets em {engine.dialect.name}...")
+        load(engine, args.tickets, rng, words, weights)
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                conn.exec_driver_sql("ANALYZE")
+
+        SessionLocal = sessionmaker(bind=engine)
+        # Consultas: termos sorteados uniformemente do vocabulário (não só as palavras mais comuns)
+        queries = []
+        for i in range(args.queries):
+            terms = rng.sample(words, rng.choice([1, 1, 2, 3]))
+            if i % 4 == 3:
+                terms[-1] = terms[-1][:3]  # prefixo (busca enquanto digita)
+            queries.append((" ".join(terms), rng.choice([None, StatusEnum.open, StatusEnum.in_progress])))
+
+        results = {"com facetas": ([], True), "sem facetas": ([], False)}
+        totals = []
+        for label, (latencies, with_facets) in results.items():
+            for q, status in queries:
+                db = SessionLocal()
+                try:
+                    start = time.perf_counter()
+                    result = TicketSearchService.search(db, q, status=status, limit=20, with_facets=with_facets)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                finally:
+                    db.close()
+                if with_facets:
+                    totals.append(result["total"])
+
+        db = SessionLocal()
+        indexed = db.query(func.count(Ticket.id)).scalar()
+        db.close()
+        if not args.database_url:
+            engine.dispose()
+
+    print(f"{indexed} tickets, {args.queries} consultas (resultados por consulta: mediana {statistics.median(totals):.0f}, "
+          f"máx {max(totals)})")
+    ok = True
+    for label, (latencies, _) in results.items():
+        p95 = percentile(latencies, 0.95)
+        ok = ok and (label != "com facetas" or p95 <= args.target_ms)
+        print(f"  {label:<12} p50 {percentile(latencies, 0.5):6.1f}ms  p95 {p95:6.1f}ms  "
+              f"p99 {percentile(latencies, 0.99):6.1f}ms  máx {max(latencies):6.1f}ms")
+    if not ok:
+        print(f"❌ p95 acima de {args.target_ms:.0f}ms")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark do custo de decodificar o token por requisição
+
+Compara, para o mesmo token HS256:
+- python-jose (implementação anterior de decode_token);
+- PyJWT (JWT_BACKEND=pyjwt), se instalado;
+- AuthService.decode_token com o cache de tokens verificados (caso comum: o mesmo token
+  apresentado centenas de vezes na sessão).
+
+Uso: python scripts/bench_token_decode.py [--iterations 20000]
+"""
+import argparse
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from jose import jwt as jose_jwt
+from app.services.auth_service import AuthService, SECRET_KEY, ALGORITHM
+
+
+def per_call_us(fn, iterations: int) -> float:
+    fn()  # aquecimento
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = AuthService.create_access_token({"sub": "bench", "user_id": 1}, expires_delta=timedelta(minutes=30))
+    results = {
+        "python-jose": per_call_us(lambda: jose_jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]), args.iterations),
+    }
+    try:
+        import jwt as pyjwt
+        results["PyJWT"] = per_call_us(lambda: pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]), args.iterations)
+    except ImportError:
+        print("ℹ️ PyJWT não instalado (pip install PyJWT) — backend alternativo não medido")
+    results["decode_token (cache)"] = per_call_us(lambda: AuthService.decode_token(token), args.iterations)
+
+    baseline = results["python-jose"]
+    print(f"Decodificação por requisição ({args.iterations} iterações)")
+    for label, us in results.items():
+        print(f"  {label:22} {us:8.1f}µs  ({baseline / us:5.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência do event loop durante uploads concorrentes
+
+Compara a gravação antiga (shutil.copyfileobj síncrono dentro da rota async) com
+save_upload (streaming em chunks, escrita no threadpool). Um "ticker" mede o atraso
+do event loop enquanto N uploads de 10MB são gravados ao mesmo tempo.
+
+Uso: python scripts/bench_upload_event_loop.py [--uploads 8] [--size-mb 10]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from fastapi import UploadFile
+from app.services.file_storage import save_upload
+
+TICK = 0.001
+
+
+def make_upload(size: int) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(os.urandom(size))
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename="anexo.pdf", size=size)
+
+
+async def blocking_write(upload: UploadFile, dest: Path, max_size: int):
+    # Implementação anterior dos controllers
+    with dest.open("wb") as buffer:
+        shutil.copyfileobj(upload.file, buffer)
+
+
+async def measure(writer, uploads: int, size: int, out_dir: Path) -> dict:
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    files = [make_upload(size) for _ in range(uploads)]
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        writer(f, out_dir / f"upload_{i}.bin", size + 1) for i, f in enumerate(files)
+    ))
+    wall = time.perf_counter() - start
+    done.set()
+    await tick_task
+    for f in files:
+        await f.close()
+
+    lags.sort()
+    return {
+        "wall": wall * 1000,
+        "p50": statistics.median(lags) * 1000,
+        "p99": lags[max(int(len(lags) * 0.99) - 1, 0)] * 1000,
+        "max": lags[-1] * 1000,
+    }
+
+
+async def main_async(uploads: int, size_mb: int):
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        print(f"{uploads} uploads concorrentes de {size_mb}MB — atraso do event loop (ms)")
+        print(f"{'modo':<12} {'total':>9} {'p50':>8} {'p99':>8} {'max':>8}")
+        for name, writer in (("bloqueante", blocking_write), ("streaming", save_upload)):
+            r = await measure(writer, uploads, size, out_dir)
+            print(f"{name:<12} {r['wall']:>9.1f} {r['p50']:>8.2f} {r['p99']:>8.2f} {r['max']:>8.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.uploads, args.size_mb))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark da importação em massa de usuários x cadastro um a um
+
+Roda em processo sobre um SQLite em arquivo temporário:
+- cadastro individual (check_user_exists + create_user, um commit por usuário) para uma
+  amostra de `--baseline` usuários, extrapolado para `--users`;
+- import_users com `--users` linhas CSV (consulta de existência única, hash em lote no pool
+  de bcrypt, INSERT em lotes).
+O custo do bcrypt depende de BCRYPT_ROUNDS e PASSWORD_HASH_WORKERS (mesmas variáveis do servidor).
+
+Uso: python scripts/bench_user_import.py [--users 10000] [--baseline 100]
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User
+from app.schemas import UserCreate
+from app.services.password_hasher import password_hasher
+from app.services.user_import import import_users, parse_import_rows
+from app.services.user_service import UserService
+
+
+def make_csv(n: int, prefix: str) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["username", "email", "full_name", "password", "role", "department"])
+    for i in range(n):
+        writer.writerow([f"{prefix}{i}", f"{prefix}{i}@example.com", f"Usuário {i}", f"senha-{i}", "servidor", "TI"])
+    return out.getvalue().encode()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--baseline", type=int, default=100, help="amostra do cadastro individual")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'import.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        # Aquecimento do pool de processos (fora da medição)
+        password_hasher.hash_many(["aquecimento"] * password_hasher.workers, chunksize=1)
+
+        start = time.perf_counter()
+        for i in range(args.baseline):
+            db = SessionLocal()
+            try:
+                user = UserCreate(username=f"individual{i}", email=f"individual{i}@example.com",
+                                  full_name=f"Usuário {i}", password=f"senha-{i}")
+                exists, _ = UserService.check_user_exists(db, user.username, user.email)
+                if not exists:
+                    UserService.create_user(db, user)
+            finally:
+                db.close()
+        baseline = (time.perf_counter() - start) / max(args.baseline, 1)
+
+        rows = parse_import_rows(make_csv(args.users, "lote"), "text/csv")
+        statuses = Counter()
+        first_line = None
+        start = time.perf_counter()
+        for chunk in import_users(SessionLocal, rows):
+            if first_line is None:
+                first_line = time.perf_counter() - start
+            for line in chunk.splitlines():
+                statuses[json.loads(line)["status"]] += 1
+        elapsed = time.perf_counter() - start
+
+        db = SessionLocal()
+        total = db.query(func.count(User.id)).scalar()
+        db.close()
+        engine.dispose()
+    password_hasher.shutdown()
+
+    print(f"{args.users} usuários ({password_hasher.workers} workers de bcrypt)")
+    print(f"  individual (estimado) {baseline * args.users:8.1f}s  ({baseline * 1000:.1f}ms/usuário, amostra de {args.baseline})")
+    print(f"  importação em massa   {elapsed:8.1f}s  (primeira linha em {first_line * 1000:.0f}ms) — {dict(statuses)}")
+    ok = statuses["created"] == args.users and total == args.users + args.baseline
+    if not ok:
+        print("❌ Nem todos os usuários foram criados")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
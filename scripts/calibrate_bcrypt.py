@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Calibra o custo do bcrypt (BCRYPT_ROUNDS) para esta máquina
+
+Mede a verificação de senha em cada custo e escolhe o maior custo cuja mediana fica
+dentro do alvo (padrão 100ms). Cada custo +1 dobra o tempo, então a busca para assim
+que a mediana passa do dobro do alvo.
+
+Uso: python scripts/calibrate_bcrypt.py [--target-ms 100] [--samples 5] [--min-rounds 10]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from passlib.hash import bcrypt
+from app.services.auth_service import BCRYPT_ROUNDS
+
+PASSWORD = "calibracao-bcrypt-senha"
+
+
+def measure(rounds: int, samples: int) -> float:
+    """Mediana (ms) de verify com o custo informado"""
+    hashed = bcrypt.using(rounds=rounds).hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.verify(PASSWORD, hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def calibrate(target_ms: float, samples: int, min_rounds: int) -> int:
+    chosen = min_rounds
+    print(f"Alvo: {target_ms:.0f}ms por verificação (custo atual: {BCRYPT_ROUNDS})")
+    for rounds in range(min_rounds, 32):
+        median = measure(rounds, samples)
+        marker = ""
+        if median <= target_ms:
+            chosen = rounds
+            marker = " ✓"
+        print(f"  rounds={rounds:2d}  {median:8.1f}ms{marker}")
+        if median > target_ms * 2:
+            break
+    return chosen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target-ms", type=float, default=100)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--min-rounds", type=int, default=10, help="custo mínimo aceito mesmo se passar do alvo")
+    args = parser.parse_args()
+    rounds = calibrate(args.target_ms, args.samples, args.min_rounds)
+    print(f"\n✅ Recomendado: BCRYPT_ROUNDS={rounds}")
+    if rounds != BCRYPT_ROUNDS:
+        print("   Defina a variável e reinicie; os hashes serão atualizados nos próximos logins.")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Conta os COMMITs e statements SQL emitidos por cada mutação de ticket (controller)
+
+Cada requisição de escrita deve fechar exatamente uma transação: os serviços só fazem
+flush e o controller confirma tudo com `unit_of_work`.
+
+Uso: python scripts/count_commits.py
+Falha (exit 1) se alguma mutação fizer zero ou mais de um commit.
+"""
+import sys
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, User, Ticket, Comment, RoleEnum, StatusEnum, PriorityEnum
+from app.schemas import (
+    TicketCreate, TicketUpdate, CommentCreate, TicketHistoryCreate, TicketBulkRequest, TicketBulkOperation
+)
+from app.controllers import TicketController, TechController, AdminController
+
+USER_ID, TECH_ID = 1, 2
+
+# (endpoint, chamada ao controller)
+MUTATIONS = [
+    ("POST /tickets", lambda db, user, tech: TicketController.create_ticket(db, TicketCreate(
+        title="Novo", description="Descrição", problem_type="hardware", location="Sala 2"), user)),
+    ("PUT /tickets/{id}", lambda db, user, tech: TicketController.update_ticket(
+        db, 1, TicketUpdate(priority=PriorityEnum.high, status=StatusEnum.in_progress), user)),
+    ("POST /tickets/{id}/comments", lambda db, user, tech: TicketController.add_comment(
+        db, 1, CommentCreate(text="Comentário"), user)),
+    ("DELETE /tickets/comments/{id}", lambda db, user, tech: TicketController.delete_comment(db, 1, user)),
+    ("POST /tech/tickets/{id}/take", lambda db, user, tech: TechController.take_ticket(db, 2, tech)),
+    ("PUT /tech/tickets/{id}/status", lambda db, user, tech: TechController.update_ticket_status(
+        db, 2, {"status": StatusEnum.resolved}, tech)),
+    ("POST /tech/tickets/{id}/history", lambda db, user, tech: TechController.add_ticket_history(
+        db, 2, TicketHistoryCreate(action="note", description="Observação", time_spent=10), tech)),
+    ("POST /admin/tickets/{id}/assign", lambda db, user, tech: AdminController.assign_ticket_to_technician(db, 3, TECH_ID)),
+    ("POST /admin/tickets/bulk", lambda db, user, tech: AdminController.bulk_update_tickets(db, TicketBulkRequest(
+        operation=TicketBulkOperation.close, ticket_ids=[1, 2, 3]), user)),
+    ("DELETE /tickets/{id}", lambda db, user, tech: TicketController.delete_ticket(db, 4, user)),
+]
+
+
+def seed(db, n_tickets: int = 5):
+    """Popula o banco com um servidor, um técnico e tickets abertos"""
+    db.add_all([
+        User(id=USER_ID, username="servidor", full_name="Servidor", role=RoleEnum.servidor, is_active=True, is_approved=True),
+        User(id=TECH_ID, username="tecnico", full_name="Técnico", role=RoleEnum.technician, is_active=True, is_approved=True),
+    ])
+    for i in range(n_tickets):
+        ticket = Ticket(
+            title=f"Ticket {i}", description="Descrição", problem_type="hardware", location="Sala 1",
+            status=StatusEnum.open, user_id=USER_ID,
+        )
+        ticket.comments = [Comment(text="Comentário", author="Servidor")]
+        db.add(ticket)
+    db.commit()
+
+
+def run(engine, session_factory, mutation):
+    """Executa a mutação numa sessão nova e retorna (commits, statements)"""
+    commits, statements = [], []
+
+    def on_commit(conn):
+        commits.append(1)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "commit", on_commit)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    db = session_factory()
+    try:
+        user = db.get(User, USER_ID)
+        tech = db.get(User, TECH_ID)
+        # Só conta o que a requisição faz, não o carregamento dos usuários
+        commits.clear()
+        statements.clear()
+        mutation(db, user, tech)
+    finally:
+        db.close()
+        event.remove(engine, "commit", on_commit)
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(commits), len(statements)
+
+
+def main() -> int:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    seed(db)
+    db.close()
+
+    ok = True
+    print(f"{'endpoint':<36} {'commits':>8} {'statements':>11}")
+    for name, mutation in MUTATIONS:
+        commits, statements = run(engine, SessionLocal, mutation)
+        flag = "" if commits == 1 else "  ❌"
+        ok = ok and commits == 1
+        print(f"{name:<36} {commits:>8} {statements:>11}{flag}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Conta as queries SQL emitidas por cada listagem de tickets (serviço + serialização)
+
+Uso: python scripts/count_ticket_queries.py
+Falha (exit 1) se alguma listagem emitir um número de queries que cresce com o tamanho da página.
+"""
+import sys
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base, User, Ticket, Comment, TicketHistory, RoleEnum, StatusEnum
+from app.schemas import TicketResponse, TicketWithComments, TicketWithHistory
+from app.services.ticket_service import TicketService
+
+TECH_ID = 2
+
+# (endpoint, função de listagem, schema de resposta)
+LISTINGS = [
+    ("GET /tickets/me/{username}", lambda db, limit, s: TicketService.get_tickets_by_user(db, 1, 0, limit, schema=s), TicketWithComments),
+    ("GET /admin/tickets", lambda db, limit, s: TicketService.get_all_tickets(db, 0, limit, schema=s), TicketResponse),
+    ("GET /admin/tickets/open", lambda db, limit, s: TicketService.get_open_tickets_for_admin(db, 0, limit, schema=s), TicketResponse),
+    ("GET /admin/tickets/assigned", lambda db, limit, s: TicketService.get_all_assigned_tickets(db, 0, limit, schema=s), TicketResponse),
+    ("GET /tech/tickets", lambda db, limit, s: TicketService.get_available_tickets_for_technician(db, TECH_ID, 0, limit, schema=s), TicketResponse),
+    ("GET /tech/tickets/assigned", lambda db, limit, s: TicketService.get_technician_assigned_tickets(db, TECH_ID, 0, limit, schema=s), TicketResponse),
+    ("GET /tech/tickets/available", lambda db, limit, s: TicketService.get_available_tickets_for_tech_queue(db, 0, limit, schema=s), TicketResponse),
+    ("GET /tech/tickets/admin-assigned", lambda db, limit, s: TicketService.get_tickets_assigned_by_admin(db, TECH_ID, 0, limit, schema=s), TicketResponse),
+]
+
+
+def seed(db, n_tickets: int = 300):
+    """Popula o banco com usuários, tickets, comentários e histórico"""
+    db.add_all([
+        User(id=1, username="servidor", full_name="Servidor", role=RoleEnum.servidor, is_active=True, is_approved=True),
+        User(id=TECH_ID, username="tecnico", full_name="Técnico", role=RoleEnum.technician, is_active=True, is_approved=True),
+    ])
+    for i in range(n_tickets):
+        assigned = i % 2 == 0
+        ticket = Ticket(
+            title=f"Ticket {i}", description="Descrição", problem_type="hardware", location="Sala 1",
+            status=StatusEnum.in_progress if assigned else StatusEnum.open,
+            user_id=1, assigned_technician_id=TECH_ID if assigned else None,
+            assigned_by_admin=assigned and i % 4 == 0,
+        )
+        ticket.comments = [Comment(text="Comentário", author="Servidor") for _ in range(2)]
+        ticket.history = [TicketHistory(action="created", description="Criado", technician_name="Sistema")]
+        db.add(ticket)
+    db.commit()
+
+
+def count_queries(engine, session_factory, listing, schema, limit: int) -> int:
+    """Executa a listagem + serialização numa sessão nova e retorna o número de SELECTs"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    db = session_factory()
+    try:
+        [schema.from_orm(ticket) for ticket in listing(db, limit, schema)]
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def main() -> int:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = SessionLocal()
+    seed(db)
+    db.close()
+
+    ok = True
+    print(f"{'endpoint':<36} {'limit=10':>9} {'limit=100':>10}")
+    for name, listing, schema in LISTINGS:
+        small = count_queries(engine, SessionLocal, listing, schema, 10)
+        large = count_queries(engine, SessionLocal, listing, schema, 100)
+        flag = "" if small == large else "  ❌ N+1"
+        ok = ok and small == large
+        print(f"{name:<36} {small:>9} {large:>10}{flag}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Migra static/attachments para o blob store endereçado por conteúdo
+
+- Re-hasheia cada arquivo legado (static/attachments/<uuid>.<ext>) referenciado por tickets,
+  move o conteúdo para static/attachments/blobs/<aa>/<bb>/<sha256> (duplicatas viram um só
+  arquivo) e grava o sha256 em ticket_attachments.
+- Recalcula ref_count de todos os blobs a partir dos anexos e remove blobs sem referência.
+- Lista arquivos legados que nenhum ticket referencia (remova com --delete-orphans).
+
+Uso: python scripts/dedup_attachments.py [--dry-run] [--delete-orphans]
+"""
+import argparse
+import hashlib
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from app.dependencies.database import SessionLocal, engine
+from app.models import Base, TicketAttachment, AttachmentBlob
+from app.services.attachment_service import AttachmentService
+from app.services.blob_store import ATTACHMENT_DIR, BlobStore
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def migrate(dry_run: bool, delete_orphans: bool) -> bool:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    referenced = set()
+    refs = Counter()
+    sizes = {}
+    moved = duplicates = missing = 0
+    try:
+        # Anexos ainda só no JSON legado entram na tabela antes da migração dos arquivos
+        if not dry_run:
+            AttachmentService.backfill_from_json(db)
+        attachment_ids = [row[0] for row in db.query(TicketAttachment.id).order_by(TicketAttachment.id)]
+        for attachment_id in attachment_ids:
+            att = db.get(TicketAttachment, attachment_id)
+            stored_filename = att.stored_filename
+            referenced.add(stored_filename)
+            sha256 = att.sha256
+            if sha256 and BlobStore.blob_path(sha256).exists():
+                refs[sha256] += 1
+                sizes.setdefault(sha256, att.size or BlobStore.blob_path(sha256).stat().st_size)
+                continue
+
+            legacy = ATTACHMENT_DIR / stored_filename
+            if not legacy.exists():
+                missing += 1
+                print(f"⚠️ Ticket {att.ticket_id}: arquivo ausente {legacy}")
+                continue
+
+            sha256 = hash_file(legacy)
+            size = legacy.stat().st_size
+            if sha256 in sizes or BlobStore.blob_path(sha256).exists():
+                duplicates += 1
+            moved += 1
+            if not dry_run:
+                BlobStore.place_file(legacy, sha256)
+                att.sha256 = sha256
+                att.size = size
+                db.commit()
+            refs[sha256] += 1
+            sizes[sha256] = size
+
+        # Recontagem das referências (idempotente; corrige contadores divergentes)
+        if not dry_run:
+            existing = {blob.sha256: blob for blob in db.query(AttachmentBlob)}
+            for sha256, count in refs.items():
+                blob = existing.pop(sha256, None) or AttachmentBlob(sha256=sha256, size=sizes[sha256])
+                blob.ref_count = count
+                db.add(blob)
+            for blob in existing.values():
+                blob.ref_count = 0
+            db.commit()
+            for sha256 in list(existing):
+                BlobStore.purge_unreferenced(db, sha256)
+
+        # Arquivos legados que nenhum ticket referencia
+        orphans = [
+            path for path in ATTACHMENT_DIR.iterdir()
+            if path.is_file() and not path.name.startswith(".") and path.name not in referenced
+        ]
+        for path in orphans:
+            print(f"🗑️ Órfão: {path}")
+            if delete_orphans and not dry_run:
+                path.unlink()
+
+        prefix = "(dry-run) " if dry_run else ""
+        print(f"✅ {prefix}{moved} arquivo(s) migrado(s), {duplicates} duplicata(s) removida(s), "
+              f"{len(refs)} blob(s) referenciado(s), {missing} ausente(s), {len(orphans)} órfão(s)")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao migrar anexos: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--delete-orphans", action="store_true")
+    args = parser.parse_args()
+    sys.exit(0 if migrate(args.dry_run, args.delete_orphans) else 1)
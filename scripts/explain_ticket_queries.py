@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Roda EXPLAIN nas queries do TicketService contra um banco populado e mostra os índices usados
+
+Uso:
+    python scripts/explain_ticket_queries.py                                   # SQLite local, 1M tickets
+    python scripts/explain_ticket_queries.py --db postgresql://... --tickets 1000000
+
+O banco é populado apenas se a tabela de tickets estiver vazia. As queries são capturadas
+executando os próprios métodos do serviço, então o plano reflete exatamente o SQL da aplicação.
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, Ticket, Comment, TicketHistory, RoleEnum, StatusEnum, PriorityEnum
+from app.services.ticket_service import TicketService
+from app.services.tech_stats_service import TechStatsService
+
+N_TECHNICIANS = 50
+TECH_ID = 2
+
+
+def seed(engine, n_tickets: int):
+    """Popula usuários, tickets, comentários e histórico em lote"""
+    with engine.begin() as conn:
+        if conn.execute(Ticket.__table__.select().limit(1)).first():
+            return
+        now = datetime.utcnow()
+        users = [{"id": 1, "username": "servidor", "full_name": "Servidor", "role": RoleEnum.servidor,
+                  "is_active": True, "is_approved": True, "created_at": now}]
+        users += [{"id": TECH_ID + i, "username": f"tecnico{i}", "full_name": f"Técnico {i}",
+                   "role": RoleEnum.technician, "is_active": True, "is_approved": True, "created_at": now}
+                  for i in range(N_TECHNICIANS)]
+        conn.execute(insert(User.__table__), users)
+
+        rng = random.Random(42)
+        statuses = [StatusEnum.pending, StatusEnum.in_progress, StatusEnum.resolved, StatusEnum.closed]
+        batch, comments, history = [], [], []
+        for ticket_id in range(1, n_tickets + 1):
+            assigned = rng.random() > 0.05
+            batch.append({
+                "id": ticket_id, "title": f"Ticket {ticket_id}", "description": "Descrição",
+                "problem_type": "hardware", "location": "Sala 1", "priority": PriorityEnum.medium,
+                "status": rng.choice(statuses) if assigned else StatusEnum.open,
+                "created_at": now, "updated_at": now, "user_id": 1,
+                "assigned_technician_id": TECH_ID + rng.randrange(N_TECHNICIANS) if assigned else None,
+                "assigned_by_admin": assigned and rng.random() < 0.5,
+                "sla_deadline": now + timedelta(hours=rng.randint(-72, 72)),
+            })
+            comments.append({"ticket_id": ticket_id, "text": "Comentário", "author": "Servidor", "created_at": now})
+            history.append({"ticket_id": ticket_id, "action": "created", "description": "Criado",
+                            "technician_name": "Sistema", "timestamp": now})
+            if len(batch) == 20000:
+                conn.execute(insert(Ticket.__table__), batch)
+                conn.execute(insert(Comment.__table__), comments)
+                conn.execute(insert(TicketHistory.__table__), history)
+                batch, comments, history = [], [], []
+        if batch:
+            conn.execute(insert(Ticket.__table__), batch)
+            conn.execute(insert(Comment.__table__), comments)
+            conn.execute(insert(TicketHistory.__table__), history)
+    # Atualiza estatísticas para o planejador escolher os índices
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+# (nome, chamada do serviço)
+QUERIES = [
+    ("get_tickets_by_user", lambda db: TicketService.get_tickets_by_user(db, 1, 0, 100)),
+    ("get_tickets_by_technician", lambda db: TicketService.get_tickets_by_technician(db, TECH_ID, 0, 100)),
+    ("get_available_tickets_for_technician", lambda db: TicketService.get_available_tickets_for_technician(db, TECH_ID, 0, 100)),
+    ("get_tickets_by_status", lambda db: TicketService.get_tickets_by_status(db, StatusEnum.pending, 0, 100)),
+    ("get_open_tickets_for_admin", lambda db: TicketService.get_open_tickets_for_admin(db, 0, 100)),
+    ("get_tickets_assigned_by_admin", lambda db: TicketService.get_tickets_assigned_by_admin(db, TECH_ID, 0, 100)),
+    ("get_available_tickets_for_tech_queue", lambda db: TicketService.get_available_tickets_for_tech_queue(db, 0, 100)),
+    ("get_all_assigned_tickets", lambda db: TicketService.get_all_assigned_tickets(db, 0, 100)),
+    ("get_comments_by_ticket", lambda db: TicketService.get_comments_by_ticket(db, 1)),
+    ("get_ticket_history", lambda db: TicketService.get_ticket_history(db, 1)),
+    ("tech_stats rebuild", lambda db: TechStatsService.rebuild(db, TECH_ID, commit=False)),
+]
+
+
+def capture(engine, session_factory, call):
+    """Executa a chamada e retorna as queries (statement, parâmetros) emitidas"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    db = session_factory()
+    try:
+        call(db)
+        db.rollback()
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def explain(engine, statement, parameters):
+    """Roda o EXPLAIN do dialeto com os mesmos parâmetros da query"""
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        raw.close()
+    return [str(row[-1]) for row in rows]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--db", default="sqlite:///./explain_tickets.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db)
+    Base.metadata.create_all(bind=engine)
+    print(f"🔧 Populando banco ({args.tickets} tickets, se vazio)...")
+    seed(engine, args.tickets)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    full_scans = 0
+    for name, call in QUERIES:
+        print(f"\n=== {name}")
+        for statement, parameters in capture(engine, SessionLocal, call):
+            plan = explain(engine, statement, parameters)
+            for line in plan:
+                print(f"    {line}")
+            # Varredura completa de tickets sem índice indica índice faltando
+            if any(("SCAN tickets" in line and "INDEX" not in line) or "Seq Scan on tickets" in line for line in plan):
+                full_scans += 1
+                print("    ⚠️ varredura completa em tickets")
+
+    print(f"\n{'✅' if not full_scans else '⚠️'} {full_scans} query(s) com varredura completa em tickets")
+    return 0 if not full_scans else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Teste de carga simples: vazão (req/s) e latência de endpoints sob concorrência
+
+Uso:
+    python scripts/load_test.py http://127.0.0.1:8000/admin/tickets?limit=20 \\
+        --concurrency 64 --requests 2000 --token <JWT>
+
+Para comparar sync vs async, rode o mesmo comando contra um servidor com um único
+worker (uvicorn main:app --workers 1) nesta versão e na versão anterior da rota,
+ou passe várias URLs (ex.: /admin/tickets, async, e /admin/servidores, sync).
+
+Comparação sem servidor, no banco de DATABASE_URL, da listagem de /tech/tickets por três
+caminhos (mesma consulta, mesma serialização):
+    python scripts/load_test.py --compare --username <técnico> --concurrency 64 --requests 2000
+- sync: rota `def` com get_current_user + get_db (threadpool);
+- run_sync: rota async com o serviço síncrono via AsyncSession.run_sync (como era);
+- nativo: rota async com get_async_current_user + AsyncTicketService (select + await).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+# Adicionar o diretório do projeto ao Python path (modo --compare)
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+
+def run(url: str, concurrency: int, total: int, headers: dict) -> dict:
+    """Dispara `total` requisições com `concurrency` clientes simultâneos"""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def one(_):
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = session.get(url, headers=headers, timeout=30).status_code < 500
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    return summarize(latencies, wall, errors)
+
+
+def summarize(latencies: list, wall: float, errors: int) -> dict:
+    latencies.sort()
+    return {
+        "rps": len(latencies) / wall,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000,
+        "errors": errors,
+    }
+
+
+def make_compare_app(limit: int):
+    """App só com as três variantes da listagem de /tech/tickets"""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.dependencies import get_async_current_user, get_async_db, get_current_user, get_db
+    from app.schemas import TicketResponse
+    from app.services.async_services import AsyncTicketService, _async_method
+    from app.services.ticket_service import TicketService
+
+    app = FastAPI()
+    legacy = _async_method(TicketService.get_available_tickets_for_technician).__func__
+
+    @app.get("/sync")
+    def sync_route(current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+        tickets = TicketService.get_available_tickets_for_technician(db, current_user.id, 0, limit)
+        return [TicketResponse.from_orm(ticket) for ticket in tickets]
+
+    @app.get("/run_sync")
+    async def run_sync_route(current_user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+        tickets = await legacy(db, current_user.id, 0, limit)
+        return [TicketResponse.from_orm(ticket) for ticket in tickets]
+
+    @app.get("/nativo")
+    async def native_route(current_user=Depends(get_async_current_user), db: AsyncSession = Depends(get_async_db)):
+        tickets = await AsyncTicketService.get_available_tickets_for_technician(db, current_user.id, 0, limit)
+        return [TicketResponse.from_orm(ticket) for ticket in tickets]
+
+    return app
+
+
+async def run_in_process(app, path: str, concurrency: int, total: int, headers: dict) -> dict:
+    """Como run(), chamando o app ASGI direto com `concurrency` tarefas simultâneas"""
+    latencies, errors = [], 0
+    raw_headers = [(b"host", b"bench")] + [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    remaining = iter(range(total))
+
+    async def one() -> bool:
+        status = 0
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": raw_headers,
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+        return status < 400
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            ok = await one()
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def compare(username: str, concurrency: int, total: int, limit: int) -> int:
+    from app.dependencies.database import SessionLocal
+    from app.services.auth_service import AuthService
+    from app.services.user_service import UserService
+
+    with SessionLocal() as db:
+        user = UserService.get_user_by_username(db, username)
+        if user is None:
+            print(f"❌ Usuário {username} não encontrado")
+            return 1
+        token = AuthService.create_access_token(data={"sub": user.username, "user_id": user.id})
+    headers = {"Authorization": f"Bearer {token}"}
+    app = make_compare_app(limit)
+
+    async def run_all() -> dict:
+        results = {}
+        for path in ("/sync", "/run_sync", "/nativo"):
+            await run_in_process(app, path, concurrency, min(total, 50), headers)  # aquecimento
+            results[path] = await run_in_process(app, path, concurrency, total, headers)
+        return results
+
+    print(f"GET /tech/tickets?limit={limit} em processo ({total} requisições, {concurrency} simultâneas)")
+    print(f"{'caminho':<12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'erros':>6}")
+    for path, result in asyncio.run(run_all()).items():
+        print(f"{path.lstrip('/'):<12} {result['rps']:>8.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['errors']:>6}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("urls", nargs="*")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--token", default=None, help="JWT para rotas autenticadas")
+    parser.add_argument("--compare", action="store_true", help="sync x run_sync x nativo, sem servidor")
+    parser.add_argument("--username", default=None, help="técnico usado no --compare")
+    parser.add_argument("--limit", type=int, default=20, help="tamanho da página no --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        if not args.username:
+            parser.error("--compare requer --username")
+        return compare(args.username, args.concurrency, args.requests, args.limit)
+    if not args.urls:
+        parser.error("informe ao menos uma URL (ou use --compare)")
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    print(f"{'url':<50} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'erros':>6}")
+    for url in args.urls:
+        result = run(url, args.concurrency, args.requests, headers)
+        print(f"{url:<50} {result['rps']:>8.1f} {result['p50']:>8.1f} {result['p95']:>8.1f} {result['errors']:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Teste de concorrência: N técnicos tentando pegar o mesmo ticket ao mesmo tempo
+
+Dispara `--parallel` POST /tech/tickets/{id}/take simultâneos (liberados juntos por uma
+barreira) e verifica que exatamente um recebe 200 e os demais 400. Passe vários tokens
+para simular técnicos diferentes (são usados em rodízio).
+
+Uso:
+    python scripts/race_take_ticket.py http://127.0.0.1:8000 --ticket-id 42 \\
+        --token <JWT_TECNICO_1> --token <JWT_TECNICO_2> [--parallel 50]
+
+O ticket precisa estar sem técnico atribuído. Sai com código 1 se houver 0 ou 2+ vencedores.
+"""
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base_url")
+    parser.add_argument("--ticket-id", type=int, required=True)
+    parser.add_argument("--token", action="append", required=True, help="JWT de técnico (repita para vários)")
+    parser.add_argument("--parallel", type=int, default=50)
+    args = parser.parse_args()
+
+    url = f"{args.base_url.rstrip('/')}/tech/tickets/{args.ticket_id}/take"
+    barrier = threading.Barrier(args.parallel)
+    winners = []
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def take(i: int):
+        token = args.token[i % len(args.token)]
+        session = requests.Session()
+        barrier.wait()
+        response = session.post(url, headers={"Authorization": f"Bearer {token}"}, timeout=60)
+        with lock:
+            statuses[response.status_code] += 1
+            if response.status_code == 200:
+                winners.append(response.json().get("assigned_technician_id"))
+
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        list(pool.map(take, range(args.parallel)))
+
+    print(f"{args.parallel} tentativas simultâneas — status: {dict(statuses)}")
+    if len(winners) != 1:
+        print(f"❌ Esperado exatamente 1 vencedor, obtido {len(winners)}")
+        return 1
+    print(f"✅ Um único vencedor (técnico {winners[0]})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script para recalcular os contadores do dashboard dos técnicos (tabela technician_stats)
+
+Os contadores são mantidos de forma incremental pelo TicketService. O tempo médio de
+resolução pode se afastar do valor recalculado quando um ticket resolvido é editado e
+depois reaberto ou transferido: o desconto usa o updated_at do ticket, não o momento
+exato da resolução registrado no histórico. Rodar este script zera essa diferença.
+
+Uso:
+    python scripts/rebuild_tech_stats.py              # todos os técnicos
+    python scripts/rebuild_tech_stats.py 12 15        # apenas os técnicos informados
+"""
+import sys
+from pathlib import Path
+
+# Adicionar o diretório do projeto ao Python path
+project_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_dir))
+
+from app.dependencies.database import SessionLocal, engine
+from app.models import Base
+from app.services.tech_stats_service import TechStatsService
+
+
+def rebuild_tech_stats(technician_ids) -> bool:
+    """Recalcula os contadores a partir de tickets e ticket_history"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if technician_ids:
+            for technician_id in technician_ids:
+                TechStatsService.rebuild(db, technician_id, commit=False)
+            db.commit()
+            rebuilt = technician_ids
+        else:
+            rebuilt = TechStatsService.rebuild_all(db)
+        print(f"✅ Contadores recalculados para {len(rebuilt)} técnico(s)")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao recalcular contadores: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    ids = [int(arg) for arg in sys.argv[1:]]
+    sys.exit(0 if rebuild_tech_stats(ids) else 1)